@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Prompt render-latency benchmark for the prompts written by ShellCustomizer.
+
+Builds a synthetic git repository with many files and some uncommitted
+changes, then times how long each prompt takes to be ready in it: the old
+git branch | sed and vcs_info prompts, the zero-fork git-aware prompts and,
+for zsh, the async prompt (time until it is drawn and time until the
+background git status arrives). Fails if a generated prompt needs longer
+than the budget to be drawn.
+
+    python benchmarks/bench_prompt.py [--files N] [--renders N] [--budget MS] [--repo DIR]
+"""
+import os
+import sys
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.prompt_generator import git_prompt, zsh_async_prompt  # noqa: E402
+
+# Time limit given to the opt-in dirty-state check, in seconds
+DIRTY_TIMEOUT = 0.3
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+               GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+
+# The prompts the customizer installed before the generator existed
+LEGACY_BASH_PROMPT = r"""
+parse_git_branch() {
+    git branch 2> /dev/null | sed -e '/^[^*]/d' -e 's/* \(.*\)/ (\1)/'
+}
+PS1='\u@\h:\w$(parse_git_branch)\$ '
+"""
+
+LEGACY_ZSH_PROMPT = r"""
+autoload -Uz vcs_info
+precmd() { vcs_info }
+zstyle ':vcs_info:git:*' formats '%F{yellow}(%b)%f '
+setopt PROMPT_SUBST
+PROMPT='%F{green}%n@%m%f:%F{blue}%~%f ${vcs_info_msg_0_}$ '
+"""
+
+# One render: run the prompt hooks, then expand the prompt
+BASH_RENDER = 'eval "${PROMPT_COMMAND:-:}"; x=${PS1@P}'
+ZSH_RENDER = ('for f in precmd $precmd_functions; do (( $+functions[$f] )) && $f; done 2>/dev/null; '
+              'x=${(%)PROMPT}')
+ZSH_WORKER = 'x=$(__lc_git_status_worker "$PWD")'
+
+
+def make_repository(path, files):
+    """
+    Create a repository with the given number of committed files spread over
+    nested directories, then modify, stage and add a few files.
+    """
+    os.makedirs(path, exist_ok=True)
+    for index in range(files):
+        directory = os.path.join(path, f"src{index % 50}", f"pkg{index % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{index}.txt"), 'w') as f:
+            f.write(f"line {index}\n")
+
+    def git(*args):
+        subprocess.run(['git', *args], cwd=path, env=GIT_ENV, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    git('init', '-q', '-b', 'main')
+    git('add', '-A')
+    git('commit', '-q', '-m', 'synthetic tree')
+
+    for index in range(0, min(files, 200), 10):
+        with open(os.path.join(path, f"src{index % 50}", f"pkg{index % 7}", f"file{index}.txt"), 'a') as f:
+            f.write("changed\n")
+    git('add', os.path.join("src0", "pkg0", "file0.txt"))
+    for index in range(20):
+        with open(os.path.join(path, f"untracked{index}.txt"), 'w') as f:
+            f.write("new\n")
+
+
+def time_renders(shell, prompt_code, render, repo, renders):
+    """
+    Source prompt_code in shell, then time renders runs of render inside
+    repo. Returns the samples in milliseconds.
+    """
+    timestamp = 'zmodload zsh/datetime; ' if shell == 'zsh' else ''
+    script = (f"{timestamp}{prompt_code}\n"
+              f"cd '{repo}' || exit 1\n"
+              f"{render}\n"
+              f"for i in {{1..{renders}}}; do\n"
+              f"    s=$EPOCHREALTIME; {render}; e=$EPOCHREALTIME\n"
+              f"    echo \"$s $e\"\n"
+              f"done\n")
+    command = ['bash', '--norc', '--noprofile', '-c', script] if shell == 'bash' else ['zsh', '-f', '-c', script]
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            universal_newlines=True, env=GIT_ENV).stdout
+
+    samples = []
+    for line in output.splitlines():
+        start, _, end = line.replace(',', '.').partition(' ')
+        try:
+            samples.append((float(end) - float(start)) * 1000)
+        except ValueError:
+            continue
+    return samples
+
+
+def report(name, samples):
+    if not samples:
+        print(f"{name:<44} no samples (shell error)")
+        return None
+    median = statistics.median(samples)
+    p90 = sorted(samples)[int(len(samples) * 0.9) - 1] if len(samples) >= 10 else max(samples)
+    print(f"{name:<44} median {median:7.2f} ms   p90 {p90:7.2f} ms")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=20000, help='files in the synthetic repository (default: 20000)')
+    parser.add_argument('--renders', type=int, default=50, help='prompt renders per variant (default: 50)')
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('PROMPT_BUDGET_MS', 20)),
+                        help='maximum median time before a generated prompt is drawn, in ms (default: 20)')
+    parser.add_argument('--repo', help='reuse or create the synthetic repository here instead of a temporary one')
+    args = parser.parse_args()
+
+    if not shutil.which('git'):
+        print("SKIP: git is not installed")
+        return 0
+
+    with tempfile.TemporaryDirectory() as workdir:
+        repo = args.repo or os.path.join(workdir, 'repo')
+        if not os.path.isdir(os.path.join(repo, '.git')):
+            print(f"creating a repository with {args.files} files in {repo}...")
+            make_repository(repo, args.files)
+        deep = os.path.join(repo, 'src1', 'pkg1')
+
+        failed = False
+        checked = []
+
+        print(f"\nbash ({args.renders} renders each):")
+        report("legacy: git branch | sed", time_renders('bash', LEGACY_BASH_PROMPT, BASH_RENDER, deep, args.renders))
+        checked.append(report("git-aware, branch only", time_renders('bash', git_prompt('bash', 0), BASH_RENDER,
+                                                                    deep, args.renders)))
+        report("git-aware, with dirty check", time_renders('bash', git_prompt('bash', DIRTY_TIMEOUT), BASH_RENDER,
+                                                           deep, args.renders))
+
+        if shutil.which('zsh'):
+            async_prompt = zsh_async_prompt()
+            print(f"\nzsh ({args.renders} renders each):")
+            report("legacy: vcs_info", time_renders('zsh', LEGACY_ZSH_PROMPT, ZSH_RENDER, deep, args.renders))
+            checked.append(report("git-aware, branch only", time_renders('zsh', git_prompt('zsh', 0), ZSH_RENDER,
+                                                                        deep, args.renders)))
+            checked.append(report("async: prompt drawn", time_renders('zsh', async_prompt, ZSH_RENDER,
+                                                                     deep, args.renders)))
+            report("async: git status segment ready", time_renders('zsh', async_prompt, ZSH_WORKER,
+                                                                   deep, args.renders))
+        else:
+            print("\nzsh is not installed: skipping the zsh prompts")
+
+    for median in checked:
+        if median is None or median > args.budget:
+            failed = True
+
+    if failed:
+        print(f"\nFAIL: a generated prompt took longer than {args.budget:.0f} ms to draw")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
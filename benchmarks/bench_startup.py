@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for linux_customizer.py.
+
+Starts the program, lets it draw the main menu and exit, and fails if the
+median cold-start time is over budget. Also checks that no customizer
+module is imported before it is used.
+
+    python benchmarks/bench_startup.py [--runs N] [--budget MS]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported when their menu is opened
+LAZY_MODULES = [
+    'modules.desktop_customizer',
+    'modules.shell_customizer',
+    'modules.color_customizer',
+    'modules.terminal_customizer',
+    'modules.font_customizer',
+    'modules.theme_manager',
+    'curses',
+    'asyncio',
+]
+
+
+def time_startup(home):
+    """
+    Run the program until it exits from the main menu and return the
+    elapsed wall time in milliseconds.
+    """
+    env = dict(os.environ, HOME=home, XDG_CACHE_HOME=os.path.join(home, '.cache'), TERM='dumb')
+    start = time.perf_counter()
+    # Enter skips the missing-dependency prompt, 0 exits the main menu
+    subprocess.run([sys.executable, os.path.join(ROOT, 'linux_customizer.py')],
+                   input='\n0\n', stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   universal_newlines=True, env=env, cwd=ROOT)
+    return (time.perf_counter() - start) * 1000
+
+
+def eager_imports():
+    """
+    Return the lazy modules that are imported by 'import linux_customizer'.
+    """
+    code = ("import sys, linux_customizer; "
+            f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE,
+                            universal_newlines=True, cwd=ROOT).stdout
+    return output.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='number of runs (default: 10)')
+    parser.add_argument('--budget', type=float, default=float(os.environ.get('STARTUP_BUDGET_MS', 200)),
+                        help='maximum median startup time in ms (default: 200)')
+    args = parser.parse_args()
+
+    failed = False
+
+    eager = eager_imports()
+    if eager:
+        print(f"FAIL: imported at startup: {', '.join(eager)}")
+        failed = True
+
+    with tempfile.TemporaryDirectory() as home:
+        # The first run creates the config file and caches
+        time_startup(home)
+        samples = [time_startup(home) for _ in range(args.runs)]
+
+    median = statistics.median(samples)
+    print(f"startup: median {median:.1f} ms, min {min(samples):.1f} ms, "
+          f"max {max(samples):.1f} ms over {args.runs} runs (budget {args.budget:.0f} ms)")
+
+    if median > args.budget:
+        print("FAIL: median startup time is over budget")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,28 +2,265 @@
 
 import os
 import sys
+import json
 import time
-import curses
-from colorama import init, Fore, Back, Style
-import subprocess
-from pathlib import Path
-import platform
+import argparse
+import importlib
+from colorama import init, Fore, Style
 
 # Import modules
 from modules.ascii_art import display_banner, display_submenu_banner
 from modules.config_manager import ConfigManager
-from modules.desktop_customizer import DesktopCustomizer
-from modules.shell_customizer import ShellCustomizer
-from modules.color_customizer import ColorCustomizer
-from modules.terminal_customizer import TerminalCustomizer
-from modules.font_customizer import FontCustomizer
-from modules.theme_manager import ThemeManager
-from modules.utils import clear_screen, is_linux, check_dependencies, execute_command, show_success, show_error
+from modules.utils import (
+    clear_screen, is_linux, check_dependencies, execute_command, show_success, show_error, show_warning,
+    set_interactive, set_durable_writes
+)
 
-def main():
+# Config sections and the customizer that applies them
+SECTION_CUSTOMIZERS = {
+    'desktop': 'desktop',
+    'shell': 'shell',
+    'colors': 'color',
+    'terminal': 'terminal',
+    'fonts': 'font',
+}
+
+# Customizer modules are imported and constructed on first use
+CUSTOMIZERS = {
+    'desktop': ('modules.desktop_customizer', 'DesktopCustomizer'),
+    'shell': ('modules.shell_customizer', 'ShellCustomizer'),
+    'color': ('modules.color_customizer', 'ColorCustomizer'),
+    'terminal': ('modules.terminal_customizer', 'TerminalCustomizer'),
+    'font': ('modules.font_customizer', 'FontCustomizer'),
+    'theme': ('modules.theme_manager', 'ThemeManager'),
+}
+
+class CustomizerLoader:
+    """
+    Import and construct customizers lazily, keeping one instance of each.
+    """
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self._instances = {}
+    
+    def get(self, name):
+        """
+        Return the customizer registered under name, creating it if needed.
+        """
+        if name not in self._instances:
+            module_name, class_name = CUSTOMIZERS[name]
+            module = importlib.import_module(module_name)
+            self._instances[name] = getattr(module, class_name)(self.config_manager)
+        return self._instances[name]
+
+def get_config_manager():
+    """
+    Create the config manager for the user's configuration file.
+    """
+    config_dir = os.path.expanduser("~/.config/linux_customizer")
+    os.makedirs(config_dir, exist_ok=True)
+    config_file = os.path.join(config_dir, "config.ini")
+    return ConfigManager(config_file)
+
+def build_parser():
+    """
+    Build the command-line parser. Without a command the interactive menus start.
+    """
+    parser = argparse.ArgumentParser(
+        prog="linux_customizer.py",
+        description="Linux Customizer. Run without a command for the interactive menus."
+    )
+    parser.add_argument('--no-fsync', action='store_true',
+                        help="don't fsync written files (faster bulk provisioning, less durable)")
+    
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    
+    apply_theme = subparsers.add_parser('apply-theme', help="apply a saved theme")
+    apply_theme.add_argument('name', help="theme name")
+    
+    subparsers.add_parser('apply', help="apply the current settings")
+    
+    get_value = subparsers.add_parser('get', help="print a configuration value")
+    get_value.add_argument('key', metavar='SECTION.KEY', help="e.g. terminal.font")
+    
+    set_value = subparsers.add_parser('set', help="set a configuration value")
+    set_value.add_argument('key', metavar='SECTION.KEY', help="e.g. terminal.font")
+    set_value.add_argument('value', help="new value")
+    set_value.add_argument('--apply', action='store_true', help="apply the section's settings afterwards")
+    
+    list_fonts = subparsers.add_parser('list-fonts', help="list installed font families")
+    list_fonts.add_argument('--category', choices=['monospace', 'serif', 'sans-serif', 'display'],
+                            help="only list fonts in this category")
+    list_fonts.add_argument('--search', metavar='QUERY', help="fuzzy search by name, style, foundry or file")
+    list_fonts.add_argument('--json', action='store_true', help="print JSON")
+    
+    list_themes = subparsers.add_parser('list-themes', help="list saved themes")
+    list_themes.add_argument('--json', action='store_true', help="print JSON")
+    
+    import_shell = subparsers.add_parser('import-shell', help="import aliases and environment variables into the rc file")
+    import_shell.add_argument('file', help="file with alias/export lines, or - for stdin")
+    import_shell.add_argument('--only', choices=['aliases', 'env'], help="only import one kind")
+    
+    export_shell = subparsers.add_parser('export-shell', help="print the rc file's aliases and environment variables")
+    export_shell.add_argument('--only', choices=['aliases', 'env'], help="only export one kind")
+    
+    profile_shell = subparsers.add_parser('profile-shell', help="rank the rc file's sections by startup time")
+    profile_shell.add_argument('--runs', type=int, default=10, help="number of shell startups to average (default 10)")
+    profile_shell.add_argument('--json', action='store_true', help="print JSON")
+    
+    return parser
+
+def split_key(key):
+    """
+    Split a SECTION.KEY argument.
+    """
+    section, _, option = key.partition('.')
+    if not section or not option:
+        raise ValueError(f"Invalid key '{key}', expected SECTION.KEY (e.g. terminal.font)")
+    return section, option
+
+def run_cli(args):
+    """
+    Run a single command without any prompts. Returns the exit status.
+    """
+    config_manager = get_config_manager()
+    customizers = CustomizerLoader(config_manager)
+    
+    if args.command == 'apply-theme':
+        return 0 if customizers.get('theme').apply_theme(args.name) else 1
+    
+    if args.command == 'apply':
+        applied = apply_all_settings(customizers.get('desktop'), customizers.get('shell'), customizers.get('color'),
+                                     customizers.get('terminal'), customizers.get('font'))
+        return 0 if applied else 1
+    
+    if args.command == 'get':
+        section, option = split_key(args.key)
+        value = config_manager.get_value(section, option)
+        if value is None:
+            show_error(f"'{args.key}' is not set.")
+            return 1
+        print(value)
+        return 0
+    
+    if args.command == 'set':
+        section, option = split_key(args.key)
+        if not config_manager.set_value(section, option, args.value):
+            return 1
+        
+        if args.apply:
+            if section not in SECTION_CUSTOMIZERS:
+                show_error(f"Settings in section '{section}' cannot be applied.")
+                return 1
+            return 0 if customizers.get(SECTION_CUSTOMIZERS[section]).apply_settings() else 1
+        return 0
+    
+    if args.command == 'list-fonts':
+        from modules.font_catalog import get_font_catalog
+        
+        catalog = get_font_catalog()
+        if args.search:
+            families = catalog.search(args.search)
+        else:
+            families = catalog.families()
+        if args.category:
+            families = [family for family in families
+                        if any(font.category == args.category for font in catalog.get_family(family))]
+        
+        if args.json:
+            fonts = []
+            for family in families:
+                entries = catalog.get_family(family)
+                fonts.append({
+                    'family': family,
+                    'category': entries[0].category,
+                    'styles': sorted({font.style for font in entries}),
+                    'files': sorted({font.file for font in entries}),
+                })
+            print(json.dumps(fonts, indent=2))
+        else:
+            for family in families:
+                print(family)
+        return 0
+    
+    if args.command == 'list-themes':
+        themes = []
+        for name in sorted(config_manager.list_themes()):
+            theme_data = config_manager.load_theme(name) or {}
+            themes.append({
+                'name': name,
+                'description': theme_data.get('description', ''),
+                'created_at': theme_data.get('created_at', ''),
+                'desktop_env': theme_data.get('desktop_env', ''),
+            })
+        
+        if args.json:
+            print(json.dumps(themes, indent=2))
+        else:
+            for theme in themes:
+                print(f"{theme['name']}\t{theme['description']}")
+        return 0
+    
+    if args.command in ('import-shell', 'export-shell'):
+        from modules.rc_file import ALIASES, ENV_VARS
+        
+        kinds = {'aliases': (ALIASES,), 'env': (ENV_VARS,)}.get(args.only, (ALIASES, ENV_VARS))
+        shell = customizers.get('shell')
+        
+        if args.command == 'export-shell':
+            shell.export_definitions(sys.stdout, kinds)
+            return 0
+        
+        if args.file == '-':
+            return 0 if shell.import_definitions(sys.stdin, kinds) else 1
+        try:
+            with open(args.file, 'r') as f:
+                return 0 if shell.import_definitions(f, kinds) else 1
+        except OSError as e:
+            show_error(f"Cannot read {args.file}: {e.strerror}")
+            return 1
+    
+    if args.command == 'profile-shell':
+        if args.runs < 1:
+            raise ValueError("--runs must be at least 1")
+        
+        if not args.json:
+            return 0 if customizers.get('shell').profile_startup(args.runs) else 1
+        
+        from modules.shell_profiler import profile_startup, ranked_sections, slowest_lines, mean
+        
+        shell = customizers.get('shell')
+        result = profile_startup(shell.shell_type, shell.rc_file, args.runs)
+        print(json.dumps({
+            'shell': result.shell,
+            'rc_file': result.rc_file,
+            'runs': result.runs,
+            'startup_ms': {'mean': mean(result.wall), 'min': min(result.wall)},
+            'sections': [{'section': section, 'mean_ms': ms} for section, ms in ranked_sections(result)],
+            'lines': [{'line': number, 'mean_ms': ms, 'text': text} for number, ms, text in slowest_lines(result)],
+        }, indent=2))
+        return 0
+    
+    return 1
+
+def main(argv=None):
     if not is_linux():
         print(f"{Fore.RED}Error: This tool is designed for Linux systems only.{Style.RESET_ALL}")
         sys.exit(1)
+    
+    args = build_parser().parse_args(argv)
+    
+    if args.no_fsync:
+        set_durable_writes(False)
+    
+    if args.command:
+        # Scripted use: no menus, prompts, spinners or screen clears
+        set_interactive(False)
+        try:
+            sys.exit(run_cli(args))
+        except ValueError as e:
+            show_error(str(e))
+            sys.exit(2)
         
     # Initialize colorama
     init(autoreset=True)
@@ -32,18 +269,10 @@ def main():
     check_dependencies()
     
     # Initialize config manager
-    config_dir = os.path.expanduser("~/.config/linux_customizer")
-    os.makedirs(config_dir, exist_ok=True)
-    config_file = os.path.join(config_dir, "config.ini")
-    config_manager = ConfigManager(config_file)
+    config_manager = get_config_manager()
     
-    # Initialize modules
-    desktop_customizer = DesktopCustomizer(config_manager)
-    shell_customizer = ShellCustomizer(config_manager)
-    color_customizer = ColorCustomizer(config_manager)
-    terminal_customizer = TerminalCustomizer(config_manager)
-    font_customizer = FontCustomizer(config_manager)
-    theme_manager = ThemeManager(config_manager)
+    # Initialize modules on first use
+    customizers = CustomizerLoader(config_manager)
     
     # Main program loop
     while True:
@@ -70,20 +299,20 @@ def main():
             choice = int(choice)
             
             if choice == 1:
-                desktop_customizer.show_menu()
+                customizers.get('desktop').show_menu()
             elif choice == 2:
-                shell_customizer.show_menu()
+                customizers.get('shell').show_menu()
             elif choice == 3:
-                color_customizer.show_menu()
+                customizers.get('color').show_menu()
             elif choice == 4:
-                terminal_customizer.show_menu()
+                customizers.get('terminal').show_menu()
             elif choice == 5:
-                font_customizer.show_menu()
+                customizers.get('font').show_menu()
             elif choice == 6:
-                theme_manager.show_menu()
+                customizers.get('theme').show_menu()
             elif choice == 7:
-                apply_all_settings(desktop_customizer, shell_customizer, color_customizer, 
-                                  terminal_customizer, font_customizer)
+                apply_all_settings(customizers.get('desktop'), customizers.get('shell'), customizers.get('color'), 
+                                  customizers.get('terminal'), customizers.get('font'))
             elif choice == 8:
                 show_system_info()
             elif choice == 0:
@@ -103,14 +332,38 @@ def apply_all_settings(desktop, shell, color, terminal, font):
     
     print(f"{Fore.YELLOW}Applying all customization settings...{Style.RESET_ALL}")
     
-    # Apply settings from each module
-    desktop.apply_settings()
-    shell.apply_settings()
-    color.apply_settings()
-    terminal.apply_settings()
-    font.apply_settings()
+    from modules.scheduler import Section, run_sections
+    
+    # Sections run concurrently unless they write the same settings
+    sections = [
+        Section(name, customizer.apply_resources(), customizer.apply_settings)
+        for name, customizer in [('Desktop', desktop), ('Shell', shell), ('Colors', color),
+                                 ('Terminal', terminal), ('Fonts', font)]
+    ]
+    
+    start = time.monotonic()
+    results = run_sections(sections)
+    elapsed = time.monotonic() - start
+    
+    # Each section's output is printed in one piece, in the usual order
+    for result in results:
+        sys.stdout.write(result.output)
+    
+    print(f"\n{Fore.CYAN}Summary:{Style.RESET_ALL}")
+    for result in results:
+        if result.ok:
+            print(f"{Fore.GREEN}  ✓ {result.name:<10}{result.duration:6.2f} s{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.RED}  ✗ {result.name:<10}{result.duration:6.2f} s  {result.error or 'see above'}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}  {elapsed:.2f} s total, {sum(result.duration for result in results):.2f} s of section time{Style.RESET_ALL}")
+    
+    failed = [result.name for result in results if not result.ok]
+    if failed:
+        show_warning(f"Some settings were not applied: {', '.join(failed)}")
+        return False
     
     show_success("All settings have been applied!")
+    return True
 
 def show_system_info():
     clear_screen()
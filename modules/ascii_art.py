@@ -1,13 +1,103 @@
-import pyfiglet
+import os
+import json
+import importlib.util
+from functools import lru_cache
 from colorama import Fore, Style
 
+from modules.utils import atomic_write, get_cache_dir, is_interactive
+
+# Banners drawn by the application, rendered together on a cold cache so
+# that later runs never need to import pyfiglet
+APP_BANNERS = [
+    ("Linux Customizer", "slant"),
+    ("Desktop Customizer", "small"),
+    ("Shell Customizer", "small"),
+    ("Color Customizer", "small"),
+    ("Terminal Customizer", "small"),
+    ("Font Customizer", "small"),
+    ("Theme Manager", "small"),
+    ("Applying Settings", "small"),
+    ("System Information", "small"),
+]
+
+_banner_cache = None
+
+def get_banner_cache_file():
+    """
+    Return the path of the on-disk banner cache.
+    """
+    return os.path.join(get_cache_dir(), "banners.json")
+
+def get_pyfiglet_stamp():
+    """
+    Identify the installed pyfiglet release without importing it, using the
+    location and modification time of the package.
+    """
+    spec = importlib.util.find_spec("pyfiglet")
+    if spec is None or not spec.origin:
+        return None
+    try:
+        return f"{spec.origin}:{os.stat(spec.origin).st_mtime_ns}"
+    except OSError:
+        return spec.origin
+
+def _load_banner_cache():
+    """
+    Read the on-disk banner cache, discarding it if pyfiglet changed.
+    """
+    global _banner_cache
+    if _banner_cache is None:
+        stamp = get_pyfiglet_stamp()
+        _banner_cache = {'pyfiglet': stamp, 'banners': {}}
+        try:
+            with open(get_banner_cache_file(), 'r') as f:
+                data = json.load(f)
+            if data.get('pyfiglet') == stamp:
+                _banner_cache['banners'] = data.get('banners', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+    return _banner_cache
+
+@lru_cache(maxsize=64)
+def render_banner(text, font):
+    """
+    Render text with a FIGlet font, using the in-memory and on-disk caches.
+    On a miss every application banner is rendered and saved at once.
+    """
+    cache = _load_banner_cache()
+    key = f"{font}:{text}"
+    
+    if key not in cache['banners']:
+        import pyfiglet  # Imported only on a cache miss; loading it is slow
+        
+        for banner_text, banner_font in APP_BANNERS + [(text, font)]:
+            banner_key = f"{banner_font}:{banner_text}"
+            if banner_key not in cache['banners']:
+                cache['banners'][banner_key] = pyfiglet.figlet_format(banner_text, font=banner_font)
+        
+        try:
+            os.makedirs(os.path.dirname(get_banner_cache_file()), exist_ok=True)
+            atomic_write(get_banner_cache_file(), json.dumps(cache), durable=False)
+        except OSError:
+            pass
+    
+    return cache['banners'][key]
+
+@lru_cache(maxsize=64)
+def _format_banner(text, font, color):
+    """
+    Build the complete colored banner block so a redraw is a single write.
+    """
+    return f"{color}{render_banner(text, font)}{Style.RESET_ALL}"
+
 def display_banner(text):
     """
     Display an ASCII art banner with the given text.
     """
-    banner = pyfiglet.figlet_format(text, font="slant")
-    colored_banner = f"{Fore.MAGENTA}{banner}{Style.RESET_ALL}"
-    print(colored_banner)
+    if not is_interactive():
+        return
+    
+    print(_format_banner(text, "slant", Fore.MAGENTA))
     print(f"{Fore.CYAN}A comprehensive system customization tool for Linux{Style.RESET_ALL}")
     print(f"{Fore.CYAN}{'=' * 60}{Style.RESET_ALL}")
 
@@ -15,15 +105,19 @@ def display_submenu_banner(text):
     """
     Display a smaller ASCII art banner for submenus.
     """
-    banner = pyfiglet.figlet_format(text, font="small")
-    colored_banner = f"{Fore.BLUE}{banner}{Style.RESET_ALL}"
-    print(colored_banner)
+    if not is_interactive():
+        return
+    
+    print(_format_banner(text, "small", Fore.BLUE))
     print(f"{Fore.CYAN}{'=' * 60}{Style.RESET_ALL}")
 
 def display_category_title(text):
     """
     Display a category title with decoration.
     """
+    if not is_interactive():
+        return
+    
     print(f"\n{Fore.YELLOW}▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}▓▓▓▓▓▓▓▓▓ {Fore.WHITE}{text} {Fore.YELLOW}▓▓▓▓▓▓▓▓▓{Style.RESET_ALL}")
     print(f"{Fore.YELLOW}▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓▓{Style.RESET_ALL}")
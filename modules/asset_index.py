@@ -0,0 +1,233 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.utils import atomic_write, get_cache_dir
+
+# Bump when the cached record format changes
+CACHE_VERSION = 2
+
+# Directories are scanned concurrently so that slow (e.g. NFS) roots overlap
+MAX_SCAN_WORKERS = 8
+
+
+def get_cache_file():
+    """
+    Return the path of the on-disk asset index.
+    """
+    return os.path.join(get_cache_dir(), "assets.json")
+
+
+def scan_directory(directory, mtime):
+    """
+    List a directory with os.scandir, using the file type reported by the
+    directory entry instead of a stat call per entry. Cursor themes are
+    filled in separately by AssetIndex.scan_many().
+    """
+    dirs, files = [], []
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            if is_dir:
+                dirs.append(entry.name)
+            else:
+                files.append(entry.name)
+
+    return {'mtime': mtime, 'dirs': dirs, 'files': files, 'cursors': [], 'themes': {}}
+
+
+def has_cursors(directory):
+    """
+    Check if a theme directory contains cursors.
+    """
+    return os.path.isdir(os.path.join(directory, 'cursors'))
+
+
+def stat_directory(directory):
+    """
+    Return the mtime of a directory, or None if it does not exist.
+    """
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+class AssetIndex:
+    """
+    Persistent index of theme, icon, cursor and wallpaper directories.
+
+    Each directory's listing is cached with its mtime; a directory is only
+    listed again when its mtime changes, so an unchanged directory costs a
+    single stat call. Cursor listings also stat each subdirectory: whether
+    it is a cursor theme is cached with its own mtime, since adding its
+    cursors/ directory does not change the mtime of the root.
+    """
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file or get_cache_file()
+        self._records = None
+        self._dirty = False
+
+    def _load(self):
+        """
+        Read the index from disk on first use.
+        """
+        if self._records is not None:
+            return
+
+        self._records = {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            if data.get('version') == CACHE_VERSION:
+                self._records = data.get('directories', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def save(self):
+        """
+        Persist the index if it changed. Failing to write it is not fatal.
+        """
+        if not self._dirty:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            data = {'version': CACHE_VERSION, 'directories': self._records}
+            atomic_write(self.cache_file, json.dumps(data), durable=False)
+            self._dirty = False
+        except OSError:
+            pass
+
+    def _refresh(self, directory, cached):
+        """
+        Stat a directory and list it again if it changed since the cached
+        record. Returns (record, changed); record is None if the directory
+        does not exist. Runs in a worker thread and does not touch the index.
+        """
+        mtime = stat_directory(directory)
+        if mtime is None:
+            return None, cached is not None
+
+        if cached is not None and cached.get('mtime') == mtime:
+            return cached, False
+
+        try:
+            record = scan_directory(directory, mtime)
+        except OSError as e:
+            return {'error': str(e), 'dirs': [], 'files': [], 'cursors': [], 'themes': {}}, False
+
+        # Keep the cursor checks of the subdirectories that did not change
+        if cached is not None:
+            record['themes'] = dict(cached.get('themes', {}))
+        return record, True
+
+    def _find_cursor_themes(self, pool, directories, refreshed):
+        """
+        Stat the subdirectories of the scanned roots and check the ones whose
+        mtime changed for a cursors/ directory. Updates refreshed in place,
+        marking the roots whose cursor themes changed.
+        """
+        subdirs = [(index, name, os.path.join(directories[index], name))
+                   for index, (record, _) in enumerate(refreshed)
+                   if record is not None for name in record['dirs']]
+        mtimes = list(pool.map(stat_directory, [path for _, _, path in subdirs]))
+        stale = [(index, name, path, mtime) for (index, name, path), mtime in zip(subdirs, mtimes)
+                 if refreshed[index][0]['themes'].get(name, [None])[0] != mtime]
+        found = pool.map(has_cursors, [path for _, _, path, _ in stale])
+
+        for (index, name, _, mtime), is_cursor_theme in zip(stale, found):
+            record, _ = refreshed[index]
+            record['themes'][name] = [mtime, is_cursor_theme]
+            refreshed[index] = (record, True)
+
+    def scan_many(self, directories, max_workers=MAX_SCAN_WORKERS, cursors=False):
+        """
+        Scan several directories concurrently and persist the index once.
+        Returns {directory: record} for the directories that exist; a
+        directory that could not be read has an 'error' entry. Records only
+        list their cursor themes up to date when cursors is True.
+        """
+        self._load()
+        directories = list(dict.fromkeys(directories))
+
+        # Threads are started on demand, so small scans stay cheap
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Stat every root and list the changed ones in parallel
+            refreshed = list(pool.map(lambda d: self._refresh(d, self._records.get(d)), directories))
+
+            if cursors:
+                self._find_cursor_themes(pool, directories, refreshed)
+
+        records = {}
+        for directory, (record, is_changed) in zip(directories, refreshed):
+            if is_changed and record is not None:
+                # Drop the subdirectories that are gone
+                themes = {name: record['themes'][name] for name in record['dirs'] if name in record['themes']}
+                record['themes'] = themes
+                record['cursors'] = [name for name in record['dirs'] if name in themes and themes[name][1]]
+
+            if is_changed:
+                self._dirty = True
+                if record is None:
+                    self._records.pop(directory, None)
+                else:
+                    self._records[directory] = record
+
+            if record is not None:
+                records[directory] = record
+
+        self.save()
+        return records
+
+    def scan(self, directory):
+        """
+        Return the record for a directory, re-listing it only if it changed.
+        Returns None if the directory does not exist.
+        """
+        return self.scan_many([directory]).get(directory)
+
+    def subdirectories(self, directory):
+        """
+        Return the names of the subdirectories of a directory.
+        """
+        record = self.scan_many([directory]).get(directory)
+        return list(record['dirs']) if record else []
+
+    def files(self, directory, extensions=None):
+        """
+        Return the names of the files in a directory, optionally filtered by
+        a tuple of lowercase extensions.
+        """
+        record = self.scan_many([directory]).get(directory)
+        if not record:
+            return []
+        if extensions is None:
+            return list(record['files'])
+        return [name for name in record['files'] if name.lower().endswith(extensions)]
+
+    def cursor_themes(self, directory):
+        """
+        Return the names of the cursor themes in an icon directory.
+        """
+        record = self.scan_many([directory], cursors=True).get(directory)
+        return list(record['cursors']) if record else []
+
+
+_index = None
+
+
+def get_asset_index():
+    """
+    Return the asset index shared by the whole session.
+    """
+    global _index
+    if _index is None:
+        _index = AssetIndex()
+    return _index
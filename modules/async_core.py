@@ -0,0 +1,86 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.executor import CommandResult, split_command
+
+# Seconds between spinner frames while waiting on a long operation
+TICK_INTERVAL = 0.1
+
+
+def run(coroutine):
+    """
+    Run a coroutine to completion from synchronous code and return its
+    result. If the calling thread already runs an event loop, the coroutine
+    gets its own loop in a helper thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coroutine).result()
+
+
+async def run_command_async(command, input=None):
+    """
+    Async counterpart of executor.run_command: run a single command without
+    raising and return a CommandResult. Simple commands are executed from
+    their argv; only commands that use shell syntax go through /bin/sh.
+    """
+    argv = split_command(command)
+    start = time.monotonic()
+    pipes = dict(stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+                 stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+    try:
+        if argv is None:
+            process = await asyncio.create_subprocess_shell(command, **pipes)
+        else:
+            process = await asyncio.create_subprocess_exec(*argv, **pipes)
+        stdout, stderr = await process.communicate(input.encode() if input is not None else None)
+        returncode = process.returncode
+        stdout, stderr = stdout.decode(errors='replace'), stderr.decode(errors='replace')
+    except OSError as e:
+        # Mirror the shell's "command not found" exit status
+        returncode, stdout, stderr = 127, '', str(e)
+
+    return CommandResult(command, returncode, stdout, stderr, time.monotonic() - start)
+
+
+async def run_chains(chains, max_concurrency, on_result=None):
+    """
+    Run chains of (index, command, input) entries. Commands within a chain
+    run one after another; at most max_concurrency commands are in flight
+    at once. on_result(command, result) is called as each command finishes.
+    Returns {index: CommandResult}.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results = {}
+
+    async def run_chain(chain):
+        for index, command, input in chain:
+            async with semaphore:
+                result = await run_command_async(command, input)
+            results[index] = result
+            if on_result is not None:
+                on_result(command, result)
+
+    await asyncio.gather(*(run_chain(chain) for chain in chains))
+    return results
+
+
+async def with_spinner(awaitable, progress):
+    """
+    Await something slow while ticking a Progress spinner, so the user can
+    see the tool is still working.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while not task.done():
+            progress.tick()
+            await asyncio.wait([task], timeout=TICK_INTERVAL)
+        return task.result()
+    finally:
+        progress.finish()
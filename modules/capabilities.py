@@ -0,0 +1,248 @@
+import os
+import re
+import shutil
+import threading
+from collections import namedtuple
+from xml.etree import ElementTree
+
+from modules.executor import run_command
+
+# gsettings subcommands whose second argument is a schema
+SCHEMA_SUBCOMMANDS = ('get', 'set', 'reset', 'range', 'writable', 'list-keys', 'list-recursively')
+
+SCHEMA_ID = re.compile(r'<schema\b[^>]*\bid\s*=\s*["\']([^"\']+)["\']')
+
+# Schema inheritance deeper than this is treated as a cycle
+MAX_EXTENDS_DEPTH = 16
+
+# A schema key: its GVariant type string and the values allowed for enum
+# and choices keys, or None for keys of any value
+SchemaKey = namedtuple('SchemaKey', ['type', 'choices'])
+
+
+def get_schema_dirs():
+    """
+    Return the directories gsettings loads schemas from, in lookup order.
+    """
+    dirs = [d for d in os.environ.get('GSETTINGS_SCHEMA_DIR', '').split(os.pathsep) if d]
+
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser("~/.local/share")
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or "/usr/local/share:/usr/share"
+    for data_dir in [data_home] + data_dirs.split(os.pathsep):
+        if data_dir:
+            dirs.append(os.path.join(data_dir, 'glib-2.0', 'schemas'))
+
+    return dirs
+
+
+class Capabilities:
+    """
+    Registry of what this system can do, probed once and kept in memory.
+
+    Executables are resolved in-process against PATH and cached until PATH
+    changes. Installed gsettings schemas are found in a single pass over the
+    schema source files, so checking for a schema costs no process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._path = None
+        self._commands = {}
+        self._schemas = None
+        self._schema_key = None
+        self._keys = None
+        self._keys_key = None
+
+    def has_command(self, command):
+        """
+        Check if an executable is available in PATH.
+        """
+        with self._lock:
+            path = os.environ.get('PATH', os.defpath)
+            if path != self._path:
+                self._path = path
+                self._commands = {}
+
+            if command not in self._commands:
+                self._commands[command] = shutil.which(command, path=path) is not None
+            return self._commands[command]
+
+    def missing_commands(self, commands):
+        """
+        Return the commands that are not available.
+        """
+        return [command for command in commands if not self.has_command(command)]
+
+    def _schema_key_now(self):
+        """
+        Return the schema directories with their mtimes; the key changes when
+        schemas are installed or removed.
+        """
+        key = []
+        for directory in get_schema_dirs():
+            try:
+                key.append((directory, os.stat(directory).st_mtime_ns))
+            except OSError:
+                continue
+        return key
+
+    def _probe_schemas(self, key):
+        """
+        Collect the ids of every installed schema from the .gschema.xml
+        files. Falls back to asking gsettings if no source files are
+        installed.
+        """
+        schemas = set()
+        for directory, _ in key:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+
+            for name in names:
+                if not name.endswith('.gschema.xml'):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), 'r', errors='replace') as f:
+                        schemas.update(SCHEMA_ID.findall(f.read()))
+                except OSError:
+                    continue
+
+        if not schemas and self.has_command('gsettings'):
+            for command in (['gsettings', 'list-schemas'], ['gsettings', 'list-relocatable-schemas']):
+                result = run_command(command)
+                if result.returncode == 0:
+                    schemas.update(line.strip() for line in result.stdout.splitlines() if line.strip())
+
+        return schemas
+
+    def schemas(self):
+        """
+        Return the set of installed gsettings schema ids.
+        """
+        with self._lock:
+            key = self._schema_key_now()
+            if self._schemas is None or key != self._schema_key:
+                self._schemas = self._probe_schemas(key)
+                self._schema_key = key
+            return self._schemas
+
+    def _probe_keys(self, key):
+        """
+        Parse the keys of every schema from the .gschema.xml files into
+        SchemaKey tuples. Enums are also read from the .enums.xml files.
+        """
+        enums = {}
+        schemas = {}
+        extends = {}
+        for directory, _ in key:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+
+            for name in names:
+                if not name.endswith('.xml'):
+                    continue
+                try:
+                    root = ElementTree.parse(os.path.join(directory, name)).getroot()
+                except (OSError, ElementTree.ParseError):
+                    continue
+
+                for enum in root.iter('enum'):
+                    enums[enum.get('id')] = {value.get('nick') for value in enum.iter('value')}
+                for schema in root.iter('schema'):
+                    keys = schemas.setdefault(schema.get('id'), {})
+                    if schema.get('extends'):
+                        extends[schema.get('id')] = schema.get('extends')
+                    for element in schema.iter('key'):
+                        choices = {choice.get('value') for choice in element.iter('choice')}
+                        keys[element.get('name')] = (element.get('type'), element.get('enum'),
+                                                     element.get('flags'), choices or None)
+
+        resolved = {}
+        for schema_id in schemas:
+            keys = {}
+            # Keys defined by the schema override the ones it extends
+            chain = [schema_id]
+            while chain[-1] in extends and len(chain) < MAX_EXTENDS_DEPTH:
+                chain.append(extends[chain[-1]])
+            for ancestor in reversed(chain):
+                for name, (value_type, enum, flags, choices) in schemas.get(ancestor, {}).items():
+                    # Enums are stored as their nick, flags as a list of nicks
+                    if enum:
+                        keys[name] = SchemaKey('s', enums.get(enum))
+                    elif flags:
+                        keys[name] = SchemaKey('as', None)
+                    else:
+                        keys[name] = SchemaKey(value_type, choices)
+            resolved[schema_id] = keys
+
+        return resolved
+
+    def schema_keys(self, schema):
+        """
+        Return {key: SchemaKey} for a schema, or None if its source file is
+        not installed. Relocatable schemas may be given as 'schema.id:/path/'.
+        """
+        with self._lock:
+            key = self._schema_key_now()
+            if self._keys is None or key != self._keys_key:
+                self._keys = self._probe_keys(key)
+                self._keys_key = key
+            return self._keys.get(schema.split(':', 1)[0])
+
+    def unsupported_setting(self, schema, key, value):
+        """
+        Return why gsettings would refuse to write value to a key, or None
+        if it would accept it. Keys of schemas whose source file is not
+        installed cannot be checked and are accepted.
+        """
+        schema_id = schema.split(':', 1)[0]
+        if self.schemas() and not self.has_schema(schema):
+            return f"No such schema “{schema_id}”"
+
+        keys = self.schema_keys(schema)
+        if keys is None:
+            return None
+        if key not in keys:
+            return f"No such key “{key}” in schema “{schema_id}”"
+        choices = keys[key].choices
+        if choices is not None and str(value) not in choices:
+            return f"Invalid value for “{key}”; expected one of {', '.join(sorted(choices))}"
+        return None
+
+    def has_schema(self, schema):
+        """
+        Check if a gsettings schema is installed. Relocatable schemas may
+        be given as 'schema.id:/path/'.
+        """
+        return schema.split(':', 1)[0] in self.schemas()
+
+    def unsupported(self, argv):
+        """
+        Return why a command cannot work on this system, or None if it can:
+        its executable is missing, or it is a gsettings command for a schema
+        that is not installed.
+        """
+        if not argv:
+            return None
+        if not self.has_command(argv[0]):
+            return f"{argv[0]}: command not found"
+        if os.path.basename(argv[0]) == 'gsettings' and len(argv) > 2 and argv[1] in SCHEMA_SUBCOMMANDS:
+            if not self.has_schema(argv[2]):
+                return f"No such schema “{argv[2].split(':', 1)[0]}”"
+        return None
+
+
+_capabilities = None
+
+
+def get_capabilities():
+    """
+    Return the capability registry shared by the whole session.
+    """
+    global _capabilities
+    if _capabilities is None:
+        _capabilities = Capabilities()
+    return _capabilities
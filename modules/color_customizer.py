@@ -8,9 +8,12 @@ import time
 from modules.ascii_art import display_submenu_banner, display_category_title
 from modules.utils import (
     clear_screen, execute_command, show_success, show_error, 
-    show_warning, show_loading, is_command_available, backup_file,
+    show_warning, show_info, is_command_available, backup_file,
     confirm_action
 )
+from modules.executor import CommandExecutor
+from modules.progress import Progress
+from modules.live_state import get_live_state
 
 class ColorCustomizer:
     def __init__(self, config_manager):
@@ -141,6 +144,7 @@ class ColorCustomizer:
                     elif 'cinnamon' in self.desktop_env:
                         execute_command(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{selected_scheme}'")
                     
+                    get_live_state().invalidate()
                     show_success(f"Color scheme changed to {selected_scheme}")
                 except Exception as e:
                     show_warning(f"Could not apply color scheme automatically: {str(e)}")
@@ -181,11 +185,12 @@ class ColorCustomizer:
             return
         
         # Save to config
-        self.config_manager.set_value('colors', 'scheme', 'Custom')
-        self.config_manager.set_value('colors', 'background', bg_color)
-        self.config_manager.set_value('colors', 'foreground', fg_color)
-        self.config_manager.set_value('colors', 'primary', primary_color)
-        self.config_manager.set_value('colors', 'accent', accent_color)
+        with self.config_manager.batch():
+            self.config_manager.set_value('colors', 'scheme', 'Custom')
+            self.config_manager.set_value('colors', 'background', bg_color)
+            self.config_manager.set_value('colors', 'foreground', fg_color)
+            self.config_manager.set_value('colors', 'primary', primary_color)
+            self.config_manager.set_value('colors', 'accent', accent_color)
         
         show_success("Custom color scheme configured successfully!")
         
@@ -317,19 +322,19 @@ class ColorCustomizer:
         current_mode = "Unknown"
         try:
             if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                current_theme = execute_command("gsettings get org.gnome.desktop.interface gtk-theme").strip("'")
+                current_theme = get_live_state().get("org.gnome.desktop.interface", "gtk-theme", "")
                 current_mode = "Dark" if "dark" in current_theme.lower() else "Light"
             elif 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
-                color_scheme = execute_command("kreadconfig5 --file kdeglobals --group General --key ColorScheme").strip()
+                color_scheme = str(get_live_state().kde_get("kdeglobals", "General", "ColorScheme", ""))
                 current_mode = "Dark" if "dark" in color_scheme.lower() else "Light"
             elif 'xfce' in self.desktop_env:
-                current_theme = execute_command("xfconf-query -c xsettings -p /Net/ThemeName").strip()
+                current_theme = str(get_live_state().xfconf_get("xsettings", "/Net/ThemeName", ""))
                 current_mode = "Dark" if "dark" in current_theme.lower() else "Light"
             elif 'mate' in self.desktop_env:
-                current_theme = execute_command("gsettings get org.mate.interface gtk-theme").strip("'")
+                current_theme = get_live_state().get("org.mate.interface", "gtk-theme", "")
                 current_mode = "Dark" if "dark" in current_theme.lower() else "Light"
             elif 'cinnamon' in self.desktop_env:
-                current_theme = execute_command("gsettings get org.cinnamon.desktop.interface gtk-theme").strip("'")
+                current_theme = get_live_state().get("org.cinnamon.desktop.interface", "gtk-theme", "")
                 current_mode = "Dark" if "dark" in current_theme.lower() else "Light"
         except:
             pass
@@ -397,6 +402,7 @@ class ColorCustomizer:
                 show_warning(f"Dark/Light mode switching not supported for {self.desktop_env}.")
                 return
             
+            get_live_state().invalidate()
             show_success(f"Switched to {mode} Mode")
         except Exception as e:
             show_error(f"Failed to switch mode: {str(e)}")
@@ -536,15 +542,26 @@ class ColorCustomizer:
         print(f"{Fore.BLACK}{Back.CYAN}■ Black on Cyan{Style.RESET_ALL}")
         print(f"{Fore.YELLOW}{Back.MAGENTA}■ Yellow on Magenta{Style.RESET_ALL}")
     
+    def apply_resources(self):
+        """
+        Return the settings apply_settings() writes, so that sections
+        sharing one are not applied at the same time.
+        """
+        resources = {'gtk-theme', 'color-scheme'}
+        if 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
+            resources.add('kdeglobals')
+        return resources
+    
     def apply_settings(self):
         """
-        Apply all color customization settings.
+        Apply all color customization settings. Returns True on success.
         """
         clear_screen()
         display_category_title("APPLYING COLOR SETTINGS")
         
         print(f"\n{Fore.YELLOW}Applying color customization settings...{Style.RESET_ALL}")
-        show_loading("Applying color settings")
+        
+        executor = CommandExecutor()
         
         try:
             # Get color configuration
@@ -557,7 +574,7 @@ class ColorCustomizer:
             # Apply based on desktop environment
             if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"gsettings set org.gnome.desktop.interface gtk-theme '{scheme}'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface gtk-theme '{scheme}'")
                 elif scheme == 'Custom':
                     # Extract RGB components for GNOME's color-scheme preference
                     r_bg = int(bg_color[1:3], 16)
@@ -566,13 +583,13 @@ class ColorCustomizer:
                     
                     # For GNOME custom colors, we need to check if background is dark or light
                     if (r_bg + g_bg + b_bg) / 3 < 128:
-                        execute_command("gsettings set org.gnome.desktop.interface color-scheme 'prefer-dark'")
+                        executor.submit("gsettings set org.gnome.desktop.interface color-scheme 'prefer-dark'")
                     else:
-                        execute_command("gsettings set org.gnome.desktop.interface color-scheme 'prefer-light'")
+                        executor.submit("gsettings set org.gnome.desktop.interface color-scheme 'prefer-light'")
             
             elif 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"plasma-apply-colorscheme {scheme.lower()}")
+                    executor.submit(f"plasma-apply-colorscheme {scheme.lower()}")
                 elif scheme == 'Custom':
                     # Extract RGB components for KDE colors
                     r_bg = int(bg_color[1:3], 16)
@@ -592,24 +609,29 @@ class ColorCustomizer:
                     b_acc = int(accent_color[5:7], 16)
                     
                     # Set KDE colors
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key BackgroundNormal {r_bg},{g_bg},{b_bg}")
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key ForegroundNormal {r_fg},{g_fg},{b_fg}")
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group General --key AccentColor {r_prim},{g_prim},{b_prim}")
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group Colors:Selection --key BackgroundNormal {r_acc},{g_acc},{b_acc}")
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key BackgroundNormal {r_bg},{g_bg},{b_bg}", group='kdeglobals')
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key ForegroundNormal {r_fg},{g_fg},{b_fg}", group='kdeglobals')
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key AccentColor {r_prim},{g_prim},{b_prim}", group='kdeglobals')
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group Colors:Selection --key BackgroundNormal {r_acc},{g_acc},{b_acc}", group='kdeglobals')
             
             elif 'xfce' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"xfconf-query -c xsettings -p /Net/ThemeName -s '{scheme}'")
+                    executor.submit(f"xfconf-query -c xsettings -p /Net/ThemeName -s '{scheme}'")
             
             elif 'mate' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"gsettings set org.mate.interface gtk-theme '{scheme}'")
+                    executor.submit(f"gsettings set org.mate.interface gtk-theme '{scheme}'")
             
             elif 'cinnamon' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{scheme}'")
-                    execute_command(f"gsettings set org.cinnamon.theme name '{scheme}'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{scheme}'")
+                    executor.submit(f"gsettings set org.cinnamon.theme name '{scheme}'")
             
+            executor.run(progress=Progress("Applying color settings"))
+            executor.print_skipped()
+            get_live_state().invalidate()
             show_success("All color settings applied successfully!")
+            return True
         except Exception as e:
             show_error(f"Error applying color settings: {str(e)}")
+            return False
@@ -4,12 +4,29 @@ import json
 from colorama import Fore, Style
 from pathlib import Path
 import time
+import atexit
+import threading
+from contextlib import contextmanager
+from io import StringIO
+
+from modules.utils import atomic_write
 
 class ConfigManager:
-    def __init__(self, config_file):
+    def __init__(self, config_file, autosave_interval=None):
         self.config_file = config_file
         self.config = configparser.ConfigParser()
         
+        # Write coalescing: changes made inside batch() or while autosave is
+        # enabled are kept in memory and written to disk on flush()
+        self.autosave_interval = autosave_interval
+        self._batch_depth = 0
+        self._dirty = False
+        self._autosave_timer = None
+        self._lock = threading.RLock()
+        
+        if self.autosave_interval:
+            atexit.register(self.flush)
+        
         # Create config directory if it doesn't exist
         os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
         
@@ -77,8 +94,9 @@ class ConfigManager:
         Save the current configuration to file.
         """
         try:
-            with open(self.config_file, 'w') as f:
-                self.config.write(f)
+            buffer = StringIO()
+            self.config.write(buffer)
+            atomic_write(self.config_file, buffer.getvalue())
             return True
         except Exception as e:
             print(f"{Fore.RED}Error saving configuration: {str(e)}{Style.RESET_ALL}")
@@ -94,14 +112,73 @@ class ConfigManager:
     
     def set_value(self, section, option, value):
         """
-        Set a value in the configuration.
+        Set a value in the configuration. Setting an option to the value it
+        already has does not write the file.
         """
-        if section not in self.config:
-            self.config[section] = {}
+        with self._lock:
+            if section not in self.config:
+                self.config[section] = {}
+            elif self.config[section].get(option, raw=True) == value:
+                return True
+            
+            self.config[section][option] = value
+            
+            if self._batch_depth > 0:
+                self._dirty = True
+                return True
+            
+            if self.autosave_interval:
+                self._dirty = True
+                self._schedule_autosave()
+                return True
         
-        self.config[section][option] = value
         return self.save_config()
     
+    @contextmanager
+    def batch(self):
+        """
+        Buffer configuration changes and write them to disk once on exit.
+        Batches can be nested; only the outermost one flushes.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                outermost = self._batch_depth == 0
+            
+            if outermost:
+                self.flush()
+    
+    def flush(self):
+        """
+        Write pending configuration changes to disk.
+        """
+        with self._lock:
+            if self._autosave_timer:
+                self._autosave_timer.cancel()
+                self._autosave_timer = None
+            
+            if not self._dirty:
+                return True
+            
+            self._dirty = False
+            return self.save_config()
+    
+    def _schedule_autosave(self):
+        """
+        Start the autosave timer if it is not already running.
+        """
+        if self._autosave_timer:
+            return
+        
+        self._autosave_timer = threading.Timer(self.autosave_interval, self.flush)
+        self._autosave_timer.daemon = True
+        self._autosave_timer.start()
+    
     def get_section(self, section):
         """
         Get an entire section from the configuration.
@@ -120,8 +197,7 @@ class ConfigManager:
         theme_file = os.path.join(themes_dir, f"{theme_name}.json")
         
         try:
-            with open(theme_file, 'w') as f:
-                json.dump(theme_data, f, indent=4)
+            atomic_write(theme_file, json.dumps(theme_data, indent=4))
             return True
         except Exception as e:
             print(f"{Fore.RED}Error saving theme: {str(e)}{Style.RESET_ALL}")
@@ -180,8 +256,8 @@ class ConfigManager:
         backup_file = f"{self.config_file}.bak.{int(time.time())}"
         
         try:
-            with open(self.config_file, 'r') as src, open(backup_file, 'w') as dst:
-                dst.write(src.read())
+            with open(self.config_file, 'r') as src:
+                atomic_write(backup_file, src.read())
             return backup_file
         except Exception as e:
             print(f"{Fore.RED}Error creating backup: {str(e)}{Style.RESET_ALL}")
@@ -196,8 +272,8 @@ class ConfigManager:
             return False
         
         try:
-            with open(backup_file, 'r') as src, open(self.config_file, 'w') as dst:
-                dst.write(src.read())
+            with open(backup_file, 'r') as src:
+                atomic_write(self.config_file, src.read())
             
             # Reload the configuration
             self.config.read(self.config_file)
@@ -0,0 +1,394 @@
+import os
+import re
+import ast
+import shlex
+
+from modules.utils import is_command_available
+from modules.capabilities import get_capabilities
+from modules.executor import CommandExecutor, run_command, format_command
+
+# Command used to talk to the dconf database. Point this at the fake backend
+# (e.g. "python3 -m modules.fake_dconf") to test without a desktop session.
+DCONF_COMMAND_ENV = 'LINUX_CUSTOMIZER_DCONF'
+
+# Schemas whose dconf path is not simply the schema id with dots as slashes
+SCHEMA_PATHS = {
+    'org.mate.background': '/org/mate/desktop/background/',
+    'org.mate.interface': '/org/mate/desktop/interface/',
+    'org.mate.font-rendering': '/org/mate/desktop/font-rendering/',
+    'org.gnome.Terminal.ProfilesList': '/org/gnome/terminal/legacy/profiles:/',
+}
+
+# Type annotations dconf and gsettings print in front of values whose type
+# cannot be inferred from the text, e.g. 'uint32 12' or '@as []'
+TYPE_PREFIX = re.compile(r'^(?:@\S+|byte|u?int(?:16|32|64)|handle|double|boolean|string|objectpath|signature)\s+')
+
+
+def get_dconf_command():
+    """
+    Return the dconf command as an argv list.
+    """
+    return shlex.split(os.environ.get(DCONF_COMMAND_ENV, 'dconf'))
+
+
+def schema_to_path(schema):
+    """
+    Return the dconf directory path for a gsettings schema.
+    Relocatable schemas are given as 'schema.id:/path/'.
+    """
+    if ':' in schema:
+        path = schema.split(':', 1)[1]
+    else:
+        path = SCHEMA_PATHS.get(schema, '/' + schema.replace('.', '/') + '/')
+
+    if not path.endswith('/'):
+        path += '/'
+    return path
+
+
+# Integer GVariant types: the annotation written in front of the value
+# (int32 needs none) and the range of the type
+INTEGER_TYPES = {
+    'y': ('byte', 0, 2 ** 8 - 1),
+    'n': ('int16', -2 ** 15, 2 ** 15 - 1),
+    'q': ('uint16', 0, 2 ** 16 - 1),
+    'i': (None, -2 ** 31, 2 ** 31 - 1),
+    'u': ('uint32', 0, 2 ** 32 - 1),
+    'x': ('int64', -2 ** 63, 2 ** 63 - 1),
+    't': ('uint64', 0, 2 ** 64 - 1),
+    'h': ('handle', -2 ** 31, 2 ** 31 - 1),
+}
+
+# String GVariant types and their annotations
+STRING_TYPES = {
+    's': None,
+    'o': 'objectpath',
+    'g': 'signature',
+}
+
+
+def format_double(value):
+    """
+    Render a number as a GVariant double, dropping float noise such as
+    0.09999999999999998.
+    """
+    text = f"{float(value):.15g}"
+    if not any(char in text for char in '.en'):
+        text += '.0'
+    return text
+
+
+def format_string(value):
+    """
+    Render a value as a quoted GVariant string.
+    """
+    escaped = str(value).replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def format_value(value, value_type=None):
+    """
+    Render a Python value in GVariant text format. Without a type the
+    format follows the Python type. With a GVariant type string, as read
+    from the schema, the value is checked against it and annotated where
+    the type cannot be inferred from the text; ValueError is raised if it
+    does not fit, and None is returned for types that are not supported.
+    """
+    if value_type is None:
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, int):
+            return repr(value)
+        if isinstance(value, float):
+            return format_double(value)
+        if isinstance(value, (list, tuple)):
+            return '[' + ', '.join(format_value(item) for item in value) + ']'
+        return format_string(value)
+
+    if value_type == 'b':
+        if not isinstance(value, bool):
+            raise ValueError(f"Expected a boolean, got {value!r}")
+        return 'true' if value else 'false'
+
+    if value_type in INTEGER_TYPES:
+        annotation, low, high = INTEGER_TYPES[value_type]
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"Expected an integer, got {value!r}")
+        if not low <= value <= high:
+            raise ValueError(f"{value} is out of range for type '{value_type}'")
+        return f"{annotation} {value}" if annotation else str(value)
+
+    if value_type == 'd':
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Expected a number, got {value!r}")
+        return format_double(value)
+
+    if value_type in STRING_TYPES:
+        if not isinstance(value, str):
+            raise ValueError(f"Expected a string, got {value!r}")
+        annotation = STRING_TYPES[value_type]
+        return f"{annotation} {format_string(value)}" if annotation else format_string(value)
+
+    if value_type.startswith('a') and len(value_type) > 1:
+        if not isinstance(value, (list, tuple)):
+            raise ValueError(f"Expected a list, got {value!r}")
+        items = [format_value(item, value_type[1:]) for item in value]
+        if None in items:
+            return None
+        # One annotation for the whole array instead of one per item
+        return f"@{value_type} [" + ', '.join(TYPE_PREFIX.sub('', item) for item in items) + ']'
+
+    return None
+
+
+def normalize_value(text):
+    """
+    Normalize GVariant text so that values written by format_value() compare
+    equal to the same values read back from dconf or gsettings.
+    """
+    text = TYPE_PREFIX.sub('', text.strip())
+
+    if text[:1] in ("'", '"'):
+        try:
+            return format_value(ast.literal_eval(text))
+        except (ValueError, SyntaxError):
+            return text
+    try:
+        return str(int(text))
+    except ValueError:
+        pass
+    try:
+        return format_double(float(text))
+    except ValueError:
+        return text
+
+
+def parse_value(text):
+    """
+    Convert GVariant text into a Python value: bool, int, float, str or
+    list. Text that cannot be parsed is returned unchanged.
+    """
+    text = TYPE_PREFIX.sub('', text.strip())
+
+    if text in ('true', 'false'):
+        return text == 'true'
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        pass
+
+    if text[:1] in ("'", '"', '['):
+        try:
+            return ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            pass
+    return text
+
+
+def dconf_available():
+    """
+    Check if the dconf database can be written directly.
+    """
+    return bool(os.environ.get(DCONF_COMMAND_ENV)) or is_command_available(get_dconf_command()[0])
+
+
+def read_values(schemas):
+    """
+    Read the current values of several schemas with one bulk query each,
+    run concurrently. Returns {dir_path: {key: normalized_text}}.
+
+    With dconf this is 'dconf dump PATH', which only lists keys changed from
+    their defaults; otherwise 'gsettings list-recursively SCHEMA'. Schemas
+    that cannot be read are left out.
+    """
+    schemas = list(dict.fromkeys(schemas))
+    executor = CommandExecutor(max_workers=8)
+    use_dconf = dconf_available()
+
+    for schema in schemas:
+        if use_dconf:
+            executor.submit(get_dconf_command() + ['dump', schema_to_path(schema)])
+        else:
+            executor.submit(['gsettings', 'list-recursively', schema])
+
+    current = {}
+    for schema, result in zip(schemas, executor.run(check=False)):
+        if result.returncode != 0:
+            continue
+
+        path = schema_to_path(schema)
+        if use_dconf:
+            values = parse_keyfile(result.stdout, path).get(path, {})
+        else:
+            # Lines are 'schema key value'
+            values = {}
+            for line in result.stdout.splitlines():
+                fields = line.split(' ', 2)
+                if len(fields) == 3:
+                    values[fields[1]] = fields[2]
+
+        current.setdefault(path, {}).update((key, normalize_value(value)) for key, value in values.items())
+
+    return current
+
+
+def render_keyfile(entries):
+    """
+    Render {dir_path: {key: gvariant_text}} as a keyfile suitable for
+    'dconf load /'.
+    """
+    lines = []
+    for path in sorted(entries):
+        lines.append(f"[{path.strip('/') or '/'}]")
+        for key, value in entries[path].items():
+            lines.append(f"{key}={value}")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def parse_keyfile(text, root='/'):
+    """
+    Parse the output of 'dconf dump ROOT' into {dir_path: {key: gvariant_text}}.
+    """
+    entries = {}
+    section = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            group = line[1:-1].strip('/')
+            section = entries.setdefault(root.rstrip('/') + '/' + (group + '/' if group else ''), {})
+        elif section is not None and '=' in line:
+            key, value = line.split('=', 1)
+            section[key.strip()] = value.strip()
+
+    return entries
+
+
+class DconfTransaction:
+    """
+    Collect gsettings writes and apply them with a single 'dconf load'.
+
+    When dconf is not available the writes fall back to one gsettings
+    command per key. dconf itself does not know the schemas, so keys and
+    values are first checked against the installed schemas and rendered in
+    the key's type; writes that gsettings would refuse are left out, and
+    keys whose type is unknown are still written with gsettings.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._settings = []
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._entries.values())
+
+    def set(self, schema, key, value):
+        """
+        Queue a key to be written. Later writes to the same key win.
+        """
+        self._entries.setdefault(schema_to_path(schema), {})[key] = format_value(value)
+        self._settings.append((schema, key, value))
+
+    def render(self):
+        """
+        Return the keyfile fragment for all pending writes.
+        """
+        return render_keyfile(self._entries)
+
+    def discard_unchanged(self, current=None):
+        """
+        Drop pending writes whose value already matches the live system, as
+        read by read_values() in one bulk query per schema. Returns the
+        number of keys left to write.
+        """
+        if current is None:
+            current = read_values(schema for schema, _, _ in self._settings)
+
+        # Only the last write to a key counts
+        latest = {}
+        for schema, key, value in self._settings:
+            latest[(schema_to_path(schema), key)] = (schema, key, value)
+
+        self._entries = {}
+        self._settings = []
+        for (path, key), (schema, _, value) in latest.items():
+            if current.get(path, {}).get(key) == normalize_value(format_value(value)):
+                continue
+            self._entries.setdefault(path, {})[key] = format_value(value)
+            self._settings.append((schema, key, value))
+
+        return len(self._settings)
+
+    def commit(self, executor=None):
+        """
+        Write all pending keys. If an executor is given the write is queued
+        on it, otherwise it runs immediately and raises on failure.
+        """
+        if not self._settings:
+            return
+
+        rejected = []
+        if dconf_available():
+            capabilities = get_capabilities()
+            # Only the last write to a key counts
+            latest = {}
+            for schema, key, value in self._settings:
+                latest[(schema_to_path(schema), key)] = (schema, key, value)
+
+            entries = {}
+            fallback = []
+            for schema, key, value in latest.values():
+                command = ['gsettings', 'set', schema, key, format_value(value)]
+                reason = capabilities.unsupported_setting(schema, key, value)
+                if reason:
+                    rejected.append((command, reason))
+                    continue
+
+                # dconf stores the text as given, so it is rendered in the
+                # key's type; gsettings converts keys whose type is unknown
+                keys = capabilities.schema_keys(schema)
+                try:
+                    text = format_value(value, keys[key].type) if keys and keys[key].type else None
+                except ValueError as e:
+                    rejected.append((command, f"Invalid value for “{key}”: {e}"))
+                    continue
+
+                if text is None:
+                    fallback.append((command, None))
+                else:
+                    entries.setdefault(schema_to_path(schema), {})[key] = text
+
+            commands = [(get_dconf_command() + ['load', '/'], render_keyfile(entries))] if entries else []
+            commands += fallback
+        else:
+            commands = [(['gsettings', 'set', schema, key, format_value(value)], None)
+                        for schema, key, value in self._settings]
+
+        self._entries = {}
+        self._settings = []
+
+        if executor is not None:
+            # Reported with the commands the executor skips
+            executor.skipped.extend(rejected)
+
+        for command, keyfile in commands:
+            if executor is not None:
+                executor.submit(command, group='dconf', input=keyfile)
+                continue
+
+            result = run_command(command, keyfile)
+            if result.returncode != 0:
+                raise RuntimeError(f"Command '{format_command(command)}' failed with exit code "
+                                   f"{result.returncode}: {result.stderr}")
+
+        if rejected and executor is None:
+            command, reason = rejected[0]
+            raise RuntimeError(f"Command '{format_command(command)}' was not run: {reason}")
+
@@ -7,9 +7,13 @@ import time
 from modules.ascii_art import display_submenu_banner, display_category_title
 from modules.utils import (
     clear_screen, execute_command, show_success, show_error, 
-    show_warning, show_loading, is_command_available, backup_file,
+    show_warning, show_info, is_command_available, backup_file,
     confirm_action
 )
+from modules.executor import CommandExecutor
+from modules.progress import Progress
+from modules.asset_index import get_asset_index
+from modules.live_state import get_live_state
 
 class DesktopCustomizer:
     def __init__(self, config_manager):
@@ -137,6 +141,7 @@ class DesktopCustomizer:
             else:
                 execute_command(f"feh --bg-scale '{path}'")
             
+            get_live_state().invalidate()
             show_success(f"Desktop background changed to {path}")
         except Exception as e:
             show_error(f"Failed to change background: {str(e)}")
@@ -153,15 +158,19 @@ class DesktopCustomizer:
         ]
         
         found_backgrounds = []
+        records = get_asset_index().scan_many(background_dirs)
         
         for directory in background_dirs:
-            if os.path.exists(directory):
+            if directory in records:
                 print(f"\n{Fore.YELLOW}Backgrounds in {directory}:{Style.RESET_ALL}")
                 
                 # Find image files in the directory
                 try:
+                    if 'error' in records[directory]:
+                        raise Exception(records[directory]['error'])
+                    
                     image_files = []
-                    for file in os.listdir(directory):
+                    for file in records[directory]['files']:
                         if file.lower().endswith(('.jpg', '.jpeg', '.png', '.bmp')):
                             full_path = os.path.join(directory, file)
                             image_files.append(full_path)
@@ -226,6 +235,7 @@ class DesktopCustomizer:
                 show_info("The theme has been saved but couldn't be applied immediately.")
                 return
             
+            get_live_state().invalidate()
             show_success(f"Desktop theme changed to {theme}")
         except Exception as e:
             show_error(f"Failed to change theme: {str(e)}")
@@ -242,13 +252,17 @@ class DesktopCustomizer:
         ]
         
         available_themes = []
+        records = get_asset_index().scan_many(theme_dirs)
         
         for directory in theme_dirs:
-            if os.path.exists(directory):
+            if directory in records:
                 print(f"\n{Fore.YELLOW}Themes in {directory}:{Style.RESET_ALL}")
                 
                 try:
-                    themes = [d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d))]
+                    if 'error' in records[directory]:
+                        raise Exception(records[directory]['error'])
+                    
+                    themes = records[directory]['dirs']
                     for theme in themes:
                         available_themes.append(theme)
                         print(f"{Fore.CYAN}- {theme}{Style.RESET_ALL}")
@@ -257,7 +271,7 @@ class DesktopCustomizer:
         
         if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
             try:
-                system_themes = execute_command("gsettings get org.gnome.desktop.interface gtk-theme").strip("'")
+                system_themes = get_live_state().get("org.gnome.desktop.interface", "gtk-theme", "")
                 if system_themes and system_themes not in available_themes:
                     available_themes.append(system_themes)
                     print(f"\n{Fore.YELLOW}Current system theme:{Style.RESET_ALL}")
@@ -312,6 +326,7 @@ class DesktopCustomizer:
                 show_info("The icon theme has been saved but couldn't be applied immediately.")
                 return
             
+            get_live_state().invalidate()
             show_success(f"Icon theme changed to {icon_theme}")
         except Exception as e:
             show_error(f"Failed to change icon theme: {str(e)}")
@@ -328,13 +343,17 @@ class DesktopCustomizer:
         ]
         
         available_icons = []
+        records = get_asset_index().scan_many(icon_dirs)
         
         for directory in icon_dirs:
-            if os.path.exists(directory):
+            if directory in records:
                 print(f"\n{Fore.YELLOW}Icon themes in {directory}:{Style.RESET_ALL}")
                 
                 try:
-                    icons = [d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d))]
+                    if 'error' in records[directory]:
+                        raise Exception(records[directory]['error'])
+                    
+                    icons = records[directory]['dirs']
                     for icon in icons:
                         available_icons.append(icon)
                         print(f"{Fore.CYAN}- {icon}{Style.RESET_ALL}")
@@ -343,7 +362,7 @@ class DesktopCustomizer:
         
         if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
             try:
-                system_icons = execute_command("gsettings get org.gnome.desktop.interface icon-theme").strip("'")
+                system_icons = get_live_state().get("org.gnome.desktop.interface", "icon-theme", "")
                 if system_icons and system_icons not in available_icons:
                     available_icons.append(system_icons)
                     print(f"\n{Fore.YELLOW}Current system icon theme:{Style.RESET_ALL}")
@@ -398,6 +417,7 @@ class DesktopCustomizer:
                 show_info("The cursor theme has been saved but couldn't be applied immediately.")
                 return
             
+            get_live_state().invalidate()
             show_success(f"Cursor theme changed to {cursor_theme}")
         except Exception as e:
             show_error(f"Failed to change cursor theme: {str(e)}")
@@ -414,16 +434,17 @@ class DesktopCustomizer:
         ]
         
         available_cursors = []
+        records = get_asset_index().scan_many(cursor_dirs, cursors=True)
         
         for directory in cursor_dirs:
-            if os.path.exists(directory):
+            if directory in records:
                 print(f"\n{Fore.YELLOW}Cursor themes in {directory}:{Style.RESET_ALL}")
                 
                 try:
-                    cursors = []
-                    for d in os.listdir(directory):
-                        if os.path.isdir(os.path.join(directory, d)) and os.path.exists(os.path.join(directory, d, 'cursors')):
-                            cursors.append(d)
+                    if 'error' in records[directory]:
+                        raise Exception(records[directory]['error'])
+                    
+                    cursors = records[directory]['cursors']
                     
                     for cursor in cursors:
                         available_cursors.append(cursor)
@@ -433,7 +454,7 @@ class DesktopCustomizer:
         
         if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
             try:
-                system_cursor = execute_command("gsettings get org.gnome.desktop.interface cursor-theme").strip("'")
+                system_cursor = get_live_state().get("org.gnome.desktop.interface", "cursor-theme", "")
                 if system_cursor and system_cursor not in available_cursors:
                     available_cursors.append(system_cursor)
                     print(f"\n{Fore.YELLOW}Current system cursor theme:{Style.RESET_ALL}")
@@ -480,13 +501,14 @@ class DesktopCustomizer:
             choice = int(choice)
             
             if choice == 1:
-                current = execute_command("gsettings get org.gnome.desktop.interface enable-animations").strip()
+                current = str(get_live_state().get("org.gnome.desktop.interface", "enable-animations", "unknown")).lower()
                 print(f"\n{Fore.YELLOW}Current animation setting: {Fore.WHITE}{current}{Style.RESET_ALL}")
                 
                 new_value = input(f"\n{Fore.GREEN}Enable animations? (true/false): {Style.RESET_ALL}").lower()
                 
                 if new_value in ('true', 'false'):
                     execute_command(f"gsettings set org.gnome.desktop.interface enable-animations {new_value}")
+                    get_live_state().invalidate()
                     show_success(f"Animation setting changed to {new_value}")
                 else:
                     show_error("Invalid value. Use 'true' or 'false'.")
@@ -574,13 +596,14 @@ class DesktopCustomizer:
             choice = int(choice)
             
             if choice == 1:
-                current = execute_command("gsettings get org.cinnamon.desktop.interface enable-animations").strip()
+                current = str(get_live_state().get("org.cinnamon.desktop.interface", "enable-animations", "unknown")).lower()
                 print(f"\n{Fore.YELLOW}Current animation setting: {Fore.WHITE}{current}{Style.RESET_ALL}")
                 
                 new_value = input(f"\n{Fore.GREEN}Enable animations? (true/false): {Style.RESET_ALL}").lower()
                 
                 if new_value in ('true', 'false'):
                     execute_command(f"gsettings set org.cinnamon.desktop.interface enable-animations {new_value}")
+                    get_live_state().invalidate()
                     show_success(f"Animation setting changed to {new_value}")
                 else:
                     show_error("Invalid value. Use 'true' or 'false'.")
@@ -699,10 +722,11 @@ class DesktopCustomizer:
                 
                 execute_command(f"gsettings set org.gnome.shell.extensions.dash-to-dock dock-position '{position}'")
                 self.config_manager.set_value('desktop', 'dock_position', position)
+                get_live_state().invalidate()
                 show_success(f"Dock position set to {position}")
             
             elif choice == 2:
-                current_size = execute_command("gsettings get org.gnome.shell.extensions.dash-to-dock dash-max-icon-size").strip()
+                current_size = get_live_state().get("org.gnome.shell.extensions.dash-to-dock", "dash-max-icon-size", "")
                 print(f"\n{Fore.YELLOW}Current icon size: {Fore.WHITE}{current_size}{Style.RESET_ALL}")
                 
                 new_size = input(f"\n{Fore.GREEN}Enter new icon size (24-64): {Style.RESET_ALL}")
@@ -712,6 +736,7 @@ class DesktopCustomizer:
                     if 24 <= size <= 64:
                         execute_command(f"gsettings set org.gnome.shell.extensions.dash-to-dock dash-max-icon-size {size}")
                         self.config_manager.set_value('desktop', 'dock_size', str(size))
+                        get_live_state().invalidate()
                         show_success(f"Dock icon size set to {size}")
                     else:
                         show_error("Size must be between 24 and 64.")
@@ -719,7 +744,7 @@ class DesktopCustomizer:
                     show_error("Please enter a valid number.")
             
             elif choice == 3:
-                current = execute_command("gsettings get org.gnome.shell.extensions.dash-to-dock autohide").strip()
+                current = str(get_live_state().get("org.gnome.shell.extensions.dash-to-dock", "autohide", "unknown")).lower()
                 print(f"\n{Fore.YELLOW}Current auto-hide setting: {Fore.WHITE}{current}{Style.RESET_ALL}")
                 
                 new_value = input(f"\n{Fore.GREEN}Enable auto-hide? (true/false): {Style.RESET_ALL}").lower()
@@ -727,6 +752,7 @@ class DesktopCustomizer:
                 if new_value in ('true', 'false'):
                     execute_command(f"gsettings set org.gnome.shell.extensions.dash-to-dock autohide {new_value}")
                     self.config_manager.set_value('desktop', 'dock_autohide', new_value)
+                    get_live_state().invalidate()
                     show_success(f"Dock auto-hide set to {new_value}")
                 else:
                     show_error("Invalid value. Use 'true' or 'false'.")
@@ -799,15 +825,23 @@ class DesktopCustomizer:
             except:
                 show_error("Failed to launch Panel settings.")
     
+    def apply_resources(self):
+        """
+        Return the settings apply_settings() writes, so that sections
+        sharing one are not applied at the same time.
+        """
+        return {'gtk-theme', 'icon-theme', 'cursor-theme', 'background'}
+    
     def apply_settings(self):
         """
-        Apply all desktop customization settings.
+        Apply all desktop customization settings. Returns True on success.
         """
         clear_screen()
         display_category_title("APPLYING DESKTOP SETTINGS")
         
         print(f"\n{Fore.YELLOW}Applying all desktop customization settings...{Style.RESET_ALL}")
-        show_loading("Applying desktop settings")
+        
+        executor = CommandExecutor()
         
         try:
             # Apply background
@@ -815,44 +849,49 @@ class DesktopCustomizer:
             if background:
                 print(f"{Fore.CYAN}Setting desktop background: {background}{Style.RESET_ALL}")
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.background picture-uri 'file://{background}'")
+                    executor.submit(f"gsettings set org.gnome.desktop.background picture-uri 'file://{background}'")
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.background picture-filename '{background}'")
+                    executor.submit(f"gsettings set org.mate.background picture-filename '{background}'")
             
             # Apply theme
             theme = self.config_manager.get_value('desktop', 'theme')
             if theme and theme != 'Default':
                 print(f"{Fore.CYAN}Setting desktop theme: {theme}{Style.RESET_ALL}")
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.interface gtk-theme '{theme}'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface gtk-theme '{theme}'")
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.interface gtk-theme '{theme}'")
+                    executor.submit(f"gsettings set org.mate.interface gtk-theme '{theme}'")
                 elif 'cinnamon' in self.desktop_env:
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{theme}'")
-                    execute_command(f"gsettings set org.cinnamon.theme name '{theme}'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{theme}'")
+                    executor.submit(f"gsettings set org.cinnamon.theme name '{theme}'")
             
             # Apply icons
             icons = self.config_manager.get_value('desktop', 'icons')
             if icons and icons != 'Default':
                 print(f"{Fore.CYAN}Setting icon theme: {icons}{Style.RESET_ALL}")
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.interface icon-theme '{icons}'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface icon-theme '{icons}'")
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.interface icon-theme '{icons}'")
+                    executor.submit(f"gsettings set org.mate.interface icon-theme '{icons}'")
                 elif 'cinnamon' in self.desktop_env:
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface icon-theme '{icons}'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface icon-theme '{icons}'")
             
             # Apply cursor
             cursor = self.config_manager.get_value('desktop', 'cursor')
             if cursor and cursor != 'Default':
                 print(f"{Fore.CYAN}Setting cursor theme: {cursor}{Style.RESET_ALL}")
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.interface cursor-theme '{cursor}'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface cursor-theme '{cursor}'")
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.interface cursor-theme '{cursor}'")
+                    executor.submit(f"gsettings set org.mate.interface cursor-theme '{cursor}'")
                 elif 'cinnamon' in self.desktop_env:
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface cursor-theme '{cursor}'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface cursor-theme '{cursor}'")
             
+            executor.run(progress=Progress("Applying desktop settings"))
+            executor.print_skipped()
+            get_live_state().invalidate()
             show_success("All desktop settings applied successfully!")
+            return True
         except Exception as e:
             show_error(f"Error applying desktop settings: {str(e)}")
+            return False
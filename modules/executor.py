@@ -0,0 +1,239 @@
+import re
+import shlex
+import subprocess
+import time
+from collections import namedtuple
+from colorama import Fore, Style
+
+# Characters that only mean something to /bin/sh when they appear unquoted.
+SHELL_METACHARACTERS = set('|&;<>()$`\\*?[]{}~\n')
+
+# Builtins and keywords with no executable of the same name (or whose
+# executable cannot do the same job), so commands starting with them only
+# work through /bin/sh
+SHELL_BUILTINS = {
+    'alias', 'unalias', 'source', '.', ':', 'export', 'unset', 'readonly', 'local',
+    'declare', 'typeset', 'cd', 'eval', 'exec', 'set', 'shift', 'trap', 'ulimit',
+    'umask', 'type', 'hash', 'command', 'builtin', 'wait', 'jobs', 'fg', 'bg',
+    'read', 'exit', 'return', 'break', 'continue', 'times', 'let', 'getopts',
+    'shopt', 'history', 'if', 'then', 'else', 'elif', 'fi', 'for', 'while',
+    'until', 'do', 'done', 'case', 'esac', 'function', 'select', 'time', '!', '[[',
+}
+
+# A leading NAME=value sets the variable for the command that follows
+ASSIGNMENT = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*=')
+
+CommandResult = namedtuple('CommandResult', ['command', 'returncode', 'stdout', 'stderr', 'duration'])
+
+
+def needs_shell(command):
+    """
+    Check if a command string uses shell features (pipes, redirection,
+    substitution, globbing) and therefore has to be run through /bin/sh.
+    """
+    quote = None
+    for char in command:
+        if quote == "'":
+            if char == "'":
+                quote = None
+            continue
+        if quote == '"':
+            if char == '"':
+                quote = None
+            elif char in '$`\\':
+                return True
+            continue
+        if char in ("'", '"'):
+            quote = char
+        elif char in SHELL_METACHARACTERS:
+            return True
+    return quote is not None
+
+
+def split_command(command):
+    """
+    Convert a command into an argv list, or return None if it needs a shell:
+    it uses shell syntax, starts with a builtin or keyword, or starts with a
+    NAME=value assignment.
+    """
+    if isinstance(command, (list, tuple)):
+        return list(command)
+    if needs_shell(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if argv and (argv[0] in SHELL_BUILTINS or ASSIGNMENT.match(argv[0])):
+        return None
+    return argv
+
+
+def run_command(command, input=None):
+    """
+    Run a single command without raising and return a CommandResult.
+    Simple commands are executed directly from their argv; only commands
+    that use shell syntax are handed to /bin/sh. If input is given it is
+    written to the command's stdin.
+    """
+    argv = split_command(command)
+    start = time.monotonic()
+
+    try:
+        if argv is None:
+            result = subprocess.run(command, shell=True, input=input,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        else:
+            result = subprocess.run(argv, input=input,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
+    except OSError as e:
+        # Mirror the shell's "command not found" exit status
+        returncode, stdout, stderr = 127, '', str(e)
+
+    return CommandResult(command, returncode, stdout, stderr, time.monotonic() - start)
+
+
+def format_command(command):
+    """
+    Return a printable form of a command given as a string or argv list.
+    """
+    if isinstance(command, (list, tuple)):
+        return ' '.join(shlex.quote(arg) for arg in command)
+    return command
+
+
+class CommandExecutor:
+    """
+    Queue commands and run them concurrently on the asyncio core, with at
+    most max_workers commands in flight.
+
+    Commands submitted with the same group run one after another in
+    submission order; everything else runs concurrently.
+    """
+
+    def __init__(self, max_workers=4, verbose=False):
+        self.max_workers = max_workers
+        self.verbose = verbose
+        self.results = []
+        self.skipped = []
+        self._queue = []
+
+    def __len__(self):
+        return len(self._queue)
+
+    def submit(self, command, group=None, ignore_errors=False, input=None):
+        """
+        Queue a command. Commands sharing a group are serialized.
+        """
+        self._queue.append((command, group, ignore_errors, input))
+
+    def run(self, check=True, progress=None):
+        """
+        Run every queued command and return their results in submission order.
+        If check is True, raise a RuntimeError once all commands have finished
+        if any of them failed. A Progress passed in is advanced as each
+        command finishes and erased at the end.
+
+        Commands this system cannot run (missing executable or gsettings
+        schema) are not started; they get exit status 127, are listed in
+        self.skipped and do not make check raise.
+        """
+        # asyncio is only imported once there is something to run
+        from modules.async_core import run
+
+        return run(self.run_async(check, progress))
+
+    async def run_async(self, check=True, progress=None):
+        """
+        Coroutine version of run(), for callers that already have an event loop.
+        """
+        from modules.async_core import run_chains
+        from modules.capabilities import get_capabilities
+
+        queue, self._queue = self._queue, []
+        if not queue:
+            if progress is not None:
+                progress.finish()
+            return []
+
+        if progress is not None:
+            progress.start(len(queue))
+
+        # Commands whose tool or gsettings schema is missing are skipped
+        # without spawning anything
+        capabilities = get_capabilities()
+        skipped = {}
+        for index, (command, _, _, _) in enumerate(queue):
+            reason = capabilities.unsupported(split_command(command))
+            if reason:
+                skipped[index] = CommandResult(command, 127, '', reason, 0.0)
+                self.skipped.append((command, reason))
+                if progress is not None:
+                    progress.advance()
+
+        # Build the chains of commands that must run sequentially
+        chains = []
+        grouped = {}
+        for index, (command, group, _, input) in enumerate(queue):
+            if index in skipped:
+                continue
+            if group is None:
+                chains.append([(index, command, input)])
+            elif group in grouped:
+                grouped[group].append((index, command, input))
+            else:
+                grouped[group] = [(index, command, input)]
+                chains.append(grouped[group])
+
+        def on_result(command, result):
+            if progress is not None:
+                progress.advance(label=format_command(command).split(' ', 1)[0])
+
+        try:
+            completed = await run_chains(chains, self.max_workers, on_result)
+        finally:
+            if progress is not None:
+                progress.finish()
+
+        completed.update(skipped)
+        results = [completed[index] for index in range(len(queue))]
+        self.results.extend(results)
+
+        if self.verbose:
+            self.print_report(results)
+
+        if check:
+            for index, ((command, _, ignore_errors, _), result) in enumerate(zip(queue, results)):
+                if result.returncode != 0 and not ignore_errors and index not in skipped:
+                    raise RuntimeError(f"Command '{format_command(command)}' failed with exit code "
+                                       f"{result.returncode}: {result.stderr}")
+
+        return results
+
+    def print_skipped(self):
+        """
+        Summarize the commands that were skipped because this system does
+        not support them.
+        """
+        reasons = {}
+        for _, reason in self.skipped:
+            reasons[reason] = reasons.get(reason, 0) + 1
+
+        for reason, count in reasons.items():
+            print(f"{Fore.YELLOW}Skipped {count} unsupported command(s): {reason}{Style.RESET_ALL}")
+
+    def print_report(self, results=None):
+        """
+        Print the latency of each executed command.
+        """
+        results = self.results if results is None else results
+
+        for result in results:
+            color = Fore.GREEN if result.returncode == 0 else Fore.RED
+            print(f"{color}{result.duration * 1000:8.1f} ms  {format_command(result.command)}{Style.RESET_ALL}")
+
+        total = sum(result.duration for result in results)
+        print(f"{Fore.CYAN}{len(results)} commands, {total * 1000:.1f} ms of command time{Style.RESET_ALL}")
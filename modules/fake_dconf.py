@@ -0,0 +1,107 @@
+"""
+A small stand-in for the dconf command line tool, used to exercise the
+dconf backend without a desktop session:
+
+    export LINUX_CUSTOMIZER_DCONF="python3 -m modules.fake_dconf"
+
+The database is kept as a keyfile at $LINUX_CUSTOMIZER_FAKE_DCONF_DB
+(default ~/.cache/linux_customizer/fake-dconf.ini) and every invocation
+is appended to a log next to it, so the number of spawns can be checked.
+"""
+import os
+import sys
+import time
+
+from modules.dconf_backend import render_keyfile, parse_keyfile
+
+DB_ENV = 'LINUX_CUSTOMIZER_FAKE_DCONF_DB'
+
+
+def get_db_path():
+    """
+    Return the path of the fake dconf database.
+    """
+    default = os.path.join(os.path.expanduser("~"), ".cache", "linux_customizer", "fake-dconf.ini")
+    return os.environ.get(DB_ENV, default)
+
+
+def read_db(db_path):
+    """
+    Read the fake database as {dir_path: {key: gvariant_text}}.
+    """
+    if not os.path.exists(db_path):
+        return {}
+    with open(db_path, 'r') as f:
+        return parse_keyfile(f.read())
+
+
+def write_db(db_path, entries):
+    """
+    Write the fake database back to disk.
+    """
+    with open(db_path, 'w') as f:
+        f.write(render_keyfile(entries))
+
+
+def dump(entries, root):
+    """
+    Return the entries below root in 'dconf dump' format.
+    """
+    root = root.rstrip('/') + '/'
+    lines = []
+    for path in sorted(entries):
+        if not path.startswith(root) or not entries[path]:
+            continue
+        lines.append(f"[{path[len(root):].strip('/') or '/'}]")
+        for key in sorted(entries[path]):
+            lines.append(f"{key}={entries[path][key]}")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def main(argv):
+    if not argv:
+        print("Usage: fake_dconf load DIR | dump DIR | read KEY | write KEY VALUE | reset [-f] PATH",
+              file=sys.stderr)
+        return 1
+
+    db_path = get_db_path()
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    entries = read_db(db_path)
+    command, args = argv[0], argv[1:]
+
+    with open(db_path + '.log', 'a') as log:
+        log.write(f"{time.time():.6f} {' '.join(argv)}\n")
+
+    if command == 'load' and len(args) == 1:
+        for path, keys in parse_keyfile(sys.stdin.read(), args[0]).items():
+            entries.setdefault(path, {}).update(keys)
+        write_db(db_path, entries)
+    elif command == 'dump' and len(args) == 1:
+        print(dump(entries, args[0]))
+    elif command == 'read' and len(args) == 1:
+        path, key = args[0].rsplit('/', 1)
+        value = entries.get(path + '/', {}).get(key)
+        if value is not None:
+            print(value)
+    elif command == 'write' and len(args) == 2:
+        path, key = args[0].rsplit('/', 1)
+        entries.setdefault(path + '/', {})[key] = args[1]
+        write_db(db_path, entries)
+    elif command == 'reset' and args:
+        target = args[-1]
+        if target.endswith('/'):
+            entries = {path: keys for path, keys in entries.items() if not path.startswith(target)}
+        else:
+            path, key = target.rsplit('/', 1)
+            entries.get(path + '/', {}).pop(key, None)
+        write_db(db_path, entries)
+    else:
+        print(f"error: invalid arguments: {' '.join(argv)}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
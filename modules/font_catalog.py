@@ -0,0 +1,359 @@
+import os
+import re
+import json
+from collections import namedtuple
+
+from modules.utils import atomic_write, get_cache_dir
+
+# Bump when the cached entry format changes
+CACHE_VERSION = 3
+
+# fc-cache touches these directories whenever the set of fonts changes
+FONTCONFIG_CACHE_DIRS = [
+    "~/.cache/fontconfig",
+    "~/.fontconfig",
+    "/var/cache/fontconfig",
+    "/usr/lib/fontconfig/cache",
+]
+
+# User font directories, so fonts installed without running fc-cache are noticed
+FONT_DIRS = [
+    "~/.local/share/fonts",
+    "~/.fonts",
+]
+
+FC_LIST_FORMAT = "%{family[0]}\\t%{style[0]}\\t%{foundry}\\t%{file}\\t%{spacing}\\t%{weight}\\t%{slant}\\n"
+
+# Font categories stored in the catalog
+MONOSPACE = 'monospace'
+SERIF = 'serif'
+SANS_SERIF = 'sans-serif'
+DISPLAY = 'display'
+
+# fontconfig spacing values: FC_DUAL, FC_MONO and FC_CHARCELL
+MONOSPACE_SPACINGS = (90, 100, 110)
+
+# Name hints for properties fontconfig does not record
+SERIF_HINTS = re.compile(r'serif|times|georgia|garamond|palatino|bookman|baskerville|caslon|'
+                         r'cambria|charter|century|didot|bodoni|minion|merriweather|slab', re.IGNORECASE)
+DISPLAY_HINTS = re.compile(r'display|decorative|dingbat|symbol|emoji|script|handwriting|'
+                           r'comic|brush|blackletter|fraktur|ornament', re.IGNORECASE)
+
+FontEntry = namedtuple('FontEntry', ['family', 'style', 'foundry', 'file', 'spacing', 'weight', 'slant', 'category'])
+
+
+def get_cache_file():
+    """
+    Return the path of the on-disk font catalog cache.
+    """
+    return os.path.join(get_cache_dir(), "fonts.json")
+
+
+def get_cache_key():
+    """
+    Build a key from the modification times of the fontconfig cache
+    directories. The key changes whenever fonts are added or removed.
+    """
+    key = []
+    for directory in FONTCONFIG_CACHE_DIRS + FONT_DIRS:
+        path = os.path.expanduser(directory)
+        try:
+            key.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            continue
+    return key
+
+
+def parse_number(value):
+    """
+    Parse a numeric fontconfig property. Variable fonts report a range such
+    as '[40 210]'; the first value is used. Returns None if unset.
+    """
+    match = re.search(r'-?\d+(?:\.\d+)?', value)
+    return int(float(match.group())) if match else None
+
+
+def classify_font(family, style, spacing):
+    """
+    Return the category of a font. Monospace is decided by the fontconfig
+    spacing property; serif and display faces are recognised by name.
+    """
+    if spacing in MONOSPACE_SPACINGS:
+        return MONOSPACE
+    if DISPLAY_HINTS.search(family) or DISPLAY_HINTS.search(style):
+        return DISPLAY
+    if SERIF_HINTS.search(family) and 'sans' not in family.lower():
+        return SERIF
+    return SANS_SERIF
+
+
+def parse_fc_list(output):
+    """
+    Parse the output of fc-list with FC_LIST_FORMAT into FontEntry tuples.
+    """
+    entries = []
+    for line in output.split('\n'):
+        fields = [field.strip() for field in line.split('\t')]
+        if len(fields) != len(FontEntry._fields) - 1 or not fields[0]:
+            continue
+
+        family, style, foundry, file, spacing, weight, slant = fields
+        spacing, weight, slant = parse_number(spacing), parse_number(weight), parse_number(slant)
+        entries.append(FontEntry(family, style, foundry, file, spacing, weight, slant,
+                                 classify_font(family, style, spacing)))
+    return entries
+
+
+def trigrams(text):
+    """
+    Return the set of trigrams of each word in text. Words are padded so
+    that short queries and word prefixes still produce trigrams.
+    """
+    grams = set()
+    for word in re.split(r'[^0-9a-z]+', text.lower()):
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index for ranked fuzzy matching.
+
+    Each document is a key with a list of (text, weight) fields; a query
+    matches documents sharing enough of its trigrams and results are
+    ranked by coverage, field weight and exact substring matches.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._texts = []
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, fields):
+        """
+        Add a document. Fields are (text, weight) pairs; a trigram found in
+        several fields keeps its highest weight.
+        """
+        doc = len(self._keys)
+        self._keys.append(key)
+        self._texts.append(' '.join(text.lower() for text, _ in fields))
+
+        weights = {}
+        for text, weight in fields:
+            for gram in trigrams(text):
+                weights[gram] = max(weights.get(gram, 0), weight)
+
+        for gram, weight in weights.items():
+            self._postings.setdefault(gram, {})[doc] = weight
+
+    def search(self, query, limit=None, threshold=0.5):
+        """
+        Return the keys matching query, best match first. threshold is the
+        fraction of the query's trigrams a document must contain.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        hits = {}
+        for gram in grams:
+            for doc, weight in self._postings.get(gram, {}).items():
+                count, total = hits.get(doc, (0, 0))
+                hits[doc] = (count + 1, total + weight)
+
+        query = query.lower().strip()
+        ranked = []
+        for doc, (count, total) in hits.items():
+            coverage = count / len(grams)
+            if coverage < threshold:
+                continue
+
+            key = self._keys[doc]
+            score = coverage + total / len(grams)
+            if query in self._texts[doc]:
+                score += 1
+            if str(key).lower().startswith(query):
+                score += 1
+            ranked.append((-score, str(key).lower(), key))
+
+        ranked.sort()
+        keys = [key for _, _, key in ranked]
+        return keys[:limit] if limit else keys
+
+
+class FontCatalog:
+    """
+    Catalog of installed fonts, built from a single fc-list call and cached
+    on disk until the fontconfig cache changes.
+    """
+
+    def __init__(self, cache_file=None):
+        self.cache_file = cache_file or get_cache_file()
+        self.entries = []
+        self._families = {}
+        self._names = []
+        self._search_index = None
+        self._loaded = False
+
+    def __len__(self):
+        return len(self._names)
+
+    def load(self, force=False):
+        """
+        Load the catalog from the cache, or rebuild it from fc-list if the
+        cache is missing or stale.
+        """
+        if self._loaded and not force:
+            return self
+
+        key = get_cache_key()
+        entries = None if force else self._read_cache(key)
+
+        if entries is None:
+            from modules.async_core import run
+
+            entries = run(self._list_fonts_async())
+            if entries is None:
+                # fc-list is missing or failed: show no fonts this time,
+                # but do not cache the empty list
+                entries = []
+            else:
+                self._write_cache(key, entries)
+
+        self._index(entries)
+        self._loaded = True
+        return self
+
+    async def _list_fonts_async(self):
+        """
+        Run fc-list on the event loop, ticking a spinner until it finishes,
+        since it can take seconds on large font sets. Returns None if fc-list
+        is not installed or fails.
+        """
+        from modules.async_core import run_command_async, with_spinner
+        from modules.progress import Progress
+
+        result = await with_spinner(run_command_async(['fc-list', '--format', FC_LIST_FORMAT]),
+                                    Progress("Reading installed fonts"))
+        if result.returncode != 0:
+            return None
+        return parse_fc_list(result.stdout)
+
+    def refresh(self):
+        """
+        Rebuild the catalog from fc-list, ignoring the cache.
+        """
+        return self.load(force=True)
+
+    def _read_cache(self, key):
+        """
+        Return the cached entries if the cache matches the given key.
+        """
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != CACHE_VERSION or data.get('key') != key:
+            return None
+
+        try:
+            return [FontEntry(*entry) for entry in data['entries']]
+        except (KeyError, TypeError):
+            return None
+
+    def _write_cache(self, key, entries):
+        """
+        Persist the entries. Failing to write the cache is not fatal.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            data = {'version': CACHE_VERSION, 'key': key, 'entries': [list(entry) for entry in entries]}
+            atomic_write(self.cache_file, json.dumps(data), durable=False)
+        except OSError:
+            pass
+
+    def _index(self, entries):
+        """
+        Group entries by family (case-insensitively) for O(1) lookups.
+        """
+        self.entries = entries
+        self._families = {}
+        names = {}
+
+        for entry in entries:
+            folded = entry.family.lower()
+            self._families.setdefault(folded, []).append(entry)
+            names.setdefault(folded, entry.family)
+
+        self._names = sorted(names.values(), key=str.lower)
+        self._search_index = None
+
+    def families(self, predicate=None):
+        """
+        Return the sorted, de-duplicated family names. If a predicate is
+        given, only families with at least one matching entry are returned.
+        """
+        self.load()
+        if predicate is None:
+            return list(self._names)
+        return [name for name in self._names
+                if any(predicate(entry) for entry in self._families[name.lower()])]
+
+    def by_category(self, category):
+        """
+        Return the family names in a category (MONOSPACE, SERIF, SANS_SERIF
+        or DISPLAY).
+        """
+        return self.families(lambda font: font.category == category)
+
+    def get_family(self, name):
+        """
+        Return all entries (styles) of a family, matched case-insensitively.
+        """
+        self.load()
+        return self._families.get(name.lower(), [])
+
+    def has_family(self, name):
+        """
+        Check if a font family is installed.
+        """
+        self.load()
+        return name.lower() in self._families
+
+    def search(self, query, limit=None):
+        """
+        Fuzzy search families by family name, style, foundry and file path.
+        Returns family names, best match first.
+        """
+        self.load()
+
+        if self._search_index is None:
+            index = TrigramIndex()
+            for name in self._names:
+                fields = {(name, 3): None}
+                for entry in self._families[name.lower()]:
+                    fields.update(dict.fromkeys([(entry.style, 1), (entry.foundry, 1), (entry.file, 1)]))
+                index.add(name, list(fields))
+            self._search_index = index
+
+        return self._search_index.search(query, limit)
+
+
+_catalog = None
+
+
+def get_font_catalog():
+    """
+    Return the font catalog shared by the whole session.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = FontCatalog()
+    return _catalog.load()
@@ -8,9 +8,12 @@ import time
 from modules.ascii_art import display_submenu_banner, display_category_title
 from modules.utils import (
     clear_screen, execute_command, show_success, show_error, 
-    show_warning, show_loading, is_command_available, backup_file,
+    show_warning, show_info, is_command_available, backup_file,
     confirm_action
 )
+from modules.executor import CommandExecutor
+from modules.progress import Progress
+from modules.font_catalog import get_font_catalog, MONOSPACE, SERIF, SANS_SERIF, DISPLAY
 
 class FontCustomizer:
     def __init__(self, config_manager):
@@ -92,15 +95,8 @@ class FontCustomizer:
         print(f"\n{Fore.CYAN}Searching for available fonts...{Style.RESET_ALL}")
         
         try:
-            # Get a list of fonts from fc-list
-            fonts_output = execute_command("fc-list : family style | sort | uniq")
-            fonts = []
-            
-            for line in fonts_output.split('\n'):
-                if line.strip():
-                    font_family = line.split(',')[0].strip()
-                    if font_family and font_family not in fonts:
-                        fonts.append(font_family)
+            # Get the list of font families from the font catalog
+            fonts = get_font_catalog().families()
             
             # Display first 15 fonts
             print(f"\n{Fore.CYAN}Available Fonts (first 15):{Style.RESET_ALL}")
@@ -176,15 +172,8 @@ class FontCustomizer:
         print(f"\n{Fore.CYAN}Searching for available fonts...{Style.RESET_ALL}")
         
         try:
-            # Get a list of fonts from fc-list
-            fonts_output = execute_command("fc-list : family style | grep -i -v mono | sort | uniq")
-            fonts = []
-            
-            for line in fonts_output.split('\n'):
-                if line.strip():
-                    font_family = line.split(',')[0].strip()
-                    if font_family and font_family not in fonts:
-                        fonts.append(font_family)
+            # Get the list of non-monospace font families from the font catalog
+            fonts = get_font_catalog().families(lambda font: font.category != MONOSPACE)
             
             # Display first 15 fonts
             print(f"\n{Fore.CYAN}Available Fonts (first 15):{Style.RESET_ALL}")
@@ -258,15 +247,8 @@ class FontCustomizer:
         print(f"\n{Fore.CYAN}Searching for available monospace fonts...{Style.RESET_ALL}")
         
         try:
-            # Get a list of monospace fonts from fc-list
-            fonts_output = execute_command("fc-list : family style | grep -i 'mono\\|courier\\|console\\|terminal' | sort | uniq")
-            fonts = []
-            
-            for line in fonts_output.split('\n'):
-                if line.strip():
-                    font_family = line.split(',')[0].strip()
-                    if font_family and font_family not in fonts:
-                        fonts.append(font_family)
+            # Get the list of monospace font families from the font catalog
+            fonts = get_font_catalog().by_category(MONOSPACE)
             
             # Display first 15 fonts
             print(f"\n{Fore.CYAN}Available Monospace Fonts:{Style.RESET_ALL}")
@@ -392,7 +374,7 @@ class FontCustomizer:
                 elif 'cinnamon' in self.desktop_env:
                     execute_command(f"gsettings set org.cinnamon.desktop.interface font-hinting '{hinting}'")
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.desktop.interface font-hinting '{hinting}'")
+                    execute_command(f"gsettings set org.mate.font-rendering hinting '{hinting}'")
                 elif 'xfce' in self.desktop_env:
                     if hinting == "none":
                         hint_style = 0
@@ -472,12 +454,12 @@ class FontCustomizer:
                         execute_command(f"gsettings set org.cinnamon.desktop.interface font-rgba-order '{antialiasing}'")
                 elif 'mate' in self.desktop_env:
                     if antialiasing == "none":
-                        execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'none'")
+                        execute_command("gsettings set org.mate.font-rendering antialiasing 'none'")
                     elif antialiasing == "grayscale":
-                        execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'grayscale'")
+                        execute_command("gsettings set org.mate.font-rendering antialiasing 'grayscale'")
                     else:
-                        execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'rgba'")
-                        execute_command(f"gsettings set org.mate.desktop.interface font-rgba-order '{antialiasing}'")
+                        execute_command("gsettings set org.mate.font-rendering antialiasing 'rgba'")
+                        execute_command(f"gsettings set org.mate.font-rendering rgba-order '{antialiasing}'")
                 elif 'xfce' in self.desktop_env:
                     if antialiasing == "none":
                         execute_command("xfconf-query -c xsettings -p /Xft/Antialias -s 0")
@@ -554,50 +536,48 @@ class FontCustomizer:
         try:
             print(f"\n{Fore.YELLOW}Listing all installed fonts. This may take a moment...{Style.RESET_ALL}")
             
-            # Use fc-list to get all fonts
-            fonts_output = execute_command("fc-list : family style | sort | uniq")
-            fonts = []
-            
-            for line in fonts_output.split('\n'):
-                if line.strip():
-                    font_family = line.split(',')[0].strip()
-                    if font_family and font_family not in fonts:
-                        fonts.append(font_family)
+            # Get all font families from the font catalog
+            fonts = get_font_catalog().families()
             
-            # Display fonts with pagination
-            page_size = 20
-            total_pages = (len(fonts) + page_size - 1) // page_size
-            current_page = 1
-            
-            while True:
-                clear_screen()
-                display_category_title("INSTALLED FONTS")
-                
-                start_idx = (current_page - 1) * page_size
-                end_idx = min(start_idx + page_size, len(fonts))
-                
-                print(f"\n{Fore.YELLOW}Showing fonts {start_idx + 1}-{end_idx} of {len(fonts)}{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}Page {current_page} of {total_pages}{Style.RESET_ALL}")
-                
-                for i, font in enumerate(fonts[start_idx:end_idx]):
-                    print(f"{Fore.CYAN}{start_idx + i + 1}. {font}{Style.RESET_ALL}")
-                
-                print(f"\n{Fore.CYAN}Navigation:{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}n - Next page{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}p - Previous page{Style.RESET_ALL}")
-                print(f"{Fore.CYAN}q - Quit listing{Style.RESET_ALL}")
-                
-                nav = input(f"\n{Fore.GREEN}Enter option: {Style.RESET_ALL}").lower()
-                
-                if nav == 'q':
-                    break
-                elif nav == 'n' and current_page < total_pages:
-                    current_page += 1
-                elif nav == 'p' and current_page > 1:
-                    current_page -= 1
+            self._paginate_fonts(fonts, "INSTALLED FONTS")
         except Exception as e:
             show_error(f"Error listing fonts: {str(e)}")
     
+    def _paginate_fonts(self, fonts, title):
+        """
+        Display a list of fonts with pagination.
+        """
+        page_size = 20
+        total_pages = (len(fonts) + page_size - 1) // page_size
+        current_page = 1
+        
+        while True:
+            clear_screen()
+            display_category_title(title)
+            
+            start_idx = (current_page - 1) * page_size
+            end_idx = min(start_idx + page_size, len(fonts))
+            
+            print(f"\n{Fore.YELLOW}Showing fonts {start_idx + 1}-{end_idx} of {len(fonts)}{Style.RESET_ALL}")
+            print(f"{Fore.YELLOW}Page {current_page} of {total_pages}{Style.RESET_ALL}")
+            
+            for i, font in enumerate(fonts[start_idx:end_idx]):
+                print(f"{Fore.CYAN}{start_idx + i + 1}. {font}{Style.RESET_ALL}")
+            
+            print(f"\n{Fore.CYAN}Navigation:{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}n - Next page{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}p - Previous page{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}q - Quit listing{Style.RESET_ALL}")
+            
+            nav = input(f"\n{Fore.GREEN}Enter option: {Style.RESET_ALL}").lower()
+            
+            if nav == 'q':
+                break
+            elif nav == 'n' and current_page < total_pages:
+                current_page += 1
+            elif nav == 'p' and current_page > 1:
+                current_page -= 1
+    
     def _search_fonts(self):
         """
         Search for fonts by name.
@@ -609,26 +589,16 @@ class FontCustomizer:
             return
         
         try:
-            print(f"\n{Fore.YELLOW}Searching for fonts containing '{search_term}'...{Style.RESET_ALL}")
+            print(f"\n{Fore.YELLOW}Searching for fonts matching '{search_term}'...{Style.RESET_ALL}")
             
-            # Use fc-list with grep to search for fonts
-            fonts_output = execute_command(f"fc-list : family style | grep -i '{search_term}' | sort | uniq")
+            # Fuzzy search the font catalog, best matches first
+            fonts = get_font_catalog().search(search_term)
             
-            if not fonts_output.strip():
+            if not fonts:
                 show_warning(f"No fonts found matching '{search_term}'.")
                 return
             
-            fonts = []
-            for line in fonts_output.split('\n'):
-                if line.strip():
-                    font_family = line.split(',')[0].strip()
-                    if font_family and font_family not in fonts:
-                        fonts.append(font_family)
-            
-            print(f"\n{Fore.CYAN}Found {len(fonts)} fonts matching '{search_term}':{Style.RESET_ALL}")
-            
-            for i, font in enumerate(fonts):
-                print(f"{Fore.CYAN}{i+1}. {font}{Style.RESET_ALL}")
+            self._paginate_fonts(fonts, f"FONTS MATCHING '{search_term.upper()}'")
         except Exception as e:
             show_error(f"Error searching fonts: {str(e)}")
     
@@ -651,38 +621,31 @@ class FontCustomizer:
             if choice == 0:
                 return
             
-            category = ""
+            category = None
             if choice == 1:
-                category = "mono"
+                category = MONOSPACE
                 print(f"\n{Fore.YELLOW}Listing monospace fonts...{Style.RESET_ALL}")
             elif choice == 2:
-                category = "serif"
+                category = SERIF
                 print(f"\n{Fore.YELLOW}Listing serif fonts...{Style.RESET_ALL}")
             elif choice == 3:
-                category = "sans"
+                category = SANS_SERIF
                 print(f"\n{Fore.YELLOW}Listing sans-serif fonts...{Style.RESET_ALL}")
             elif choice == 4:
-                category = "display\\|decorative\\|dingbat"
+                category = DISPLAY
                 print(f"\n{Fore.YELLOW}Listing display/decorative fonts...{Style.RESET_ALL}")
             else:
                 show_error("Invalid choice.")
                 return
             
             try:
-                # Use fc-list with grep to filter fonts by category
-                fonts_output = execute_command(f"fc-list : family style | grep -i '{category}' | sort | uniq")
+                # Filter the font catalog by category
+                fonts = get_font_catalog().by_category(category)
                 
-                if not fonts_output.strip():
+                if not fonts:
                     show_warning(f"No fonts found in this category.")
                     return
                 
-                fonts = []
-                for line in fonts_output.split('\n'):
-                    if line.strip():
-                        font_family = line.split(',')[0].strip()
-                        if font_family and font_family not in fonts:
-                            fonts.append(font_family)
-                
                 print(f"\n{Fore.CYAN}Found {len(fonts)} fonts in this category:{Style.RESET_ALL}")
                 
                 # Display fonts with pagination
@@ -739,9 +702,11 @@ class FontCustomizer:
         
         try:
             # Check if the font exists
-            font_check = execute_command(f"fc-list | grep -i '{font_name}'")
+            name = font_name.lower()
+            font_check = get_font_catalog().has_family(font_name) or any(
+                name in f"{font.family} {font.style} {font.file}".lower() for font in get_font_catalog().entries)
             
-            if not font_check.strip():
+            if not font_check:
                 show_warning(f"Font '{font_name}' not found.")
                 return
             
@@ -794,15 +759,26 @@ class FontCustomizer:
         except Exception as e:
             show_error(f"Error previewing font: {str(e)}")
     
+    def apply_resources(self):
+        """
+        Return the settings apply_settings() writes, so that sections
+        sharing one are not applied at the same time.
+        """
+        resources = {'fonts'}
+        if 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
+            resources.add('kdeglobals')
+        return resources
+    
     def apply_settings(self):
         """
-        Apply all font customization settings.
+        Apply all font customization settings. Returns True on success.
         """
         clear_screen()
         display_category_title("APPLYING FONT SETTINGS")
         
         print(f"\n{Fore.YELLOW}Applying font customization settings...{Style.RESET_ALL}")
-        show_loading("Applying font settings")
+        
+        executor = CommandExecutor()
         
         try:
             # Get font settings
@@ -816,76 +792,76 @@ class FontCustomizer:
             if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
                 # Apply system font
                 if system_font != 'Default':
-                    execute_command(f"gsettings set org.gnome.desktop.interface font-name '{system_font} 11'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface font-name '{system_font} 11'")
                 
                 # Apply document font
                 if document_font != 'Default':
-                    execute_command(f"gsettings set org.gnome.desktop.interface document-font-name '{document_font} 11'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface document-font-name '{document_font} 11'")
                 
                 # Apply monospace font
                 if monospace_font != 'Default':
-                    execute_command(f"gsettings set org.gnome.desktop.interface monospace-font-name '{monospace_font} 11'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface monospace-font-name '{monospace_font} 11'")
                 
                 # Apply font hinting
-                execute_command(f"gsettings set org.gnome.desktop.interface font-hinting '{font_hinting}'")
+                executor.submit(f"gsettings set org.gnome.desktop.interface font-hinting '{font_hinting}'")
                 
                 # Apply antialiasing
                 if antialiasing == "none":
-                    execute_command("gsettings set org.gnome.desktop.interface font-antialiasing 'none'")
+                    executor.submit("gsettings set org.gnome.desktop.interface font-antialiasing 'none'")
                 elif antialiasing == "grayscale":
-                    execute_command("gsettings set org.gnome.desktop.interface font-antialiasing 'grayscale'")
+                    executor.submit("gsettings set org.gnome.desktop.interface font-antialiasing 'grayscale'")
                 else:
-                    execute_command("gsettings set org.gnome.desktop.interface font-antialiasing 'rgba'")
-                    execute_command(f"gsettings set org.gnome.desktop.interface font-rgba-order '{antialiasing}'")
+                    executor.submit("gsettings set org.gnome.desktop.interface font-antialiasing 'rgba'")
+                    executor.submit(f"gsettings set org.gnome.desktop.interface font-rgba-order '{antialiasing}'")
             
             elif 'cinnamon' in self.desktop_env:
                 # Similar to GNOME
                 if system_font != 'Default':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface font-name '{system_font} 11'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface font-name '{system_font} 11'")
                 
                 if document_font != 'Default':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface document-font-name '{document_font} 11'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface document-font-name '{document_font} 11'")
                 
                 if monospace_font != 'Default':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface monospace-font-name '{monospace_font} 11'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface monospace-font-name '{monospace_font} 11'")
                 
-                execute_command(f"gsettings set org.cinnamon.desktop.interface font-hinting '{font_hinting}'")
+                executor.submit(f"gsettings set org.cinnamon.desktop.interface font-hinting '{font_hinting}'")
                 
                 if antialiasing == "none":
-                    execute_command("gsettings set org.cinnamon.desktop.interface font-antialiasing 'none'")
+                    executor.submit("gsettings set org.cinnamon.desktop.interface font-antialiasing 'none'")
                 elif antialiasing == "grayscale":
-                    execute_command("gsettings set org.cinnamon.desktop.interface font-antialiasing 'grayscale'")
+                    executor.submit("gsettings set org.cinnamon.desktop.interface font-antialiasing 'grayscale'")
                 else:
-                    execute_command("gsettings set org.cinnamon.desktop.interface font-antialiasing 'rgba'")
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface font-rgba-order '{antialiasing}'")
+                    executor.submit("gsettings set org.cinnamon.desktop.interface font-antialiasing 'rgba'")
+                    executor.submit(f"gsettings set org.cinnamon.desktop.interface font-rgba-order '{antialiasing}'")
             
             elif 'mate' in self.desktop_env:
                 # Similar to GNOME
                 if system_font != 'Default':
-                    execute_command(f"gsettings set org.mate.interface font-name '{system_font} 11'")
+                    executor.submit(f"gsettings set org.mate.interface font-name '{system_font} 11'")
                 
                 if document_font != 'Default':
-                    execute_command(f"gsettings set org.mate.interface document-font-name '{document_font} 11'")
+                    executor.submit(f"gsettings set org.mate.interface document-font-name '{document_font} 11'")
                 
                 if monospace_font != 'Default':
-                    execute_command(f"gsettings set org.mate.interface monospace-font-name '{monospace_font} 11'")
+                    executor.submit(f"gsettings set org.mate.interface monospace-font-name '{monospace_font} 11'")
                 
-                execute_command(f"gsettings set org.mate.desktop.interface font-hinting '{font_hinting}'")
+                executor.submit(f"gsettings set org.mate.font-rendering hinting '{font_hinting}'")
                 
                 if antialiasing == "none":
-                    execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'none'")
+                    executor.submit("gsettings set org.mate.font-rendering antialiasing 'none'")
                 elif antialiasing == "grayscale":
-                    execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'grayscale'")
+                    executor.submit("gsettings set org.mate.font-rendering antialiasing 'grayscale'")
                 else:
-                    execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'rgba'")
-                    execute_command(f"gsettings set org.mate.desktop.interface font-rgba-order '{antialiasing}'")
+                    executor.submit("gsettings set org.mate.font-rendering antialiasing 'rgba'")
+                    executor.submit(f"gsettings set org.mate.font-rendering rgba-order '{antialiasing}'")
             
             elif 'xfce' in self.desktop_env:
                 if system_font != 'Default':
-                    execute_command(f"xfconf-query -c xsettings -p /Gtk/FontName -s '{system_font} 11'")
+                    executor.submit(f"xfconf-query -c xsettings -p /Gtk/FontName -s '{system_font} 11'")
                 
                 if monospace_font != 'Default':
-                    execute_command(f"xfconf-query -c xsettings -p /Gtk/MonospaceFontName -s '{monospace_font} 11'")
+                    executor.submit(f"xfconf-query -c xsettings -p /Gtk/MonospaceFontName -s '{monospace_font} 11'")
                 
                 # Hinting
                 if font_hinting == "none":
@@ -896,25 +872,25 @@ class FontCustomizer:
                     hint_style = 2
                 elif font_hinting == "full":
                     hint_style = 3
-                execute_command(f"xfconf-query -c xsettings -p /Xft/HintStyle -s '{hint_style}'")
+                executor.submit(f"xfconf-query -c xsettings -p /Xft/HintStyle -s '{hint_style}'")
                 
                 # Antialiasing
                 if antialiasing == "none":
-                    execute_command("xfconf-query -c xsettings -p /Xft/Antialias -s 0")
+                    executor.submit("xfconf-query -c xsettings -p /Xft/Antialias -s 0")
                 else:
-                    execute_command("xfconf-query -c xsettings -p /Xft/Antialias -s 1")
+                    executor.submit("xfconf-query -c xsettings -p /Xft/Antialias -s 1")
                     if antialiasing == "grayscale":
-                        execute_command("xfconf-query -c xsettings -p /Xft/RGBA -s 'none'")
+                        executor.submit("xfconf-query -c xsettings -p /Xft/RGBA -s 'none'")
                     else:
-                        execute_command(f"xfconf-query -c xsettings -p /Xft/RGBA -s '{antialiasing}'")
+                        executor.submit(f"xfconf-query -c xsettings -p /Xft/RGBA -s '{antialiasing}'")
             
             elif 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
                 # KDE has a different configuration system
                 if system_font != 'Default':
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group General --key font '{system_font},11,-1,5,50,0,0,0,0,0'")
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key font '{system_font},11,-1,5,50,0,0,0,0,0'", group='kdeglobals')
                 
                 if monospace_font != 'Default':
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group General --key fixed '{monospace_font},11,-1,5,50,0,0,0,0,0'")
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key fixed '{monospace_font},11,-1,5,50,0,0,0,0,0'", group='kdeglobals')
                 
                 # Hinting
                 if font_hinting == "none":
@@ -925,15 +901,15 @@ class FontCustomizer:
                     hint_style = "MediumHinting"
                 elif font_hinting == "full":
                     hint_style = "FullHinting"
-                execute_command(f"kwriteconfig5 --file kdeglobals --group General --key font-hinting '{hint_style}'")
+                executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key font-hinting '{hint_style}'", group='kdeglobals')
                 
                 # Antialiasing
                 if antialiasing == "none":
-                    execute_command("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '0'")
+                    executor.submit("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '0'", group='kdeglobals')
                 else:
-                    execute_command("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '1'")
+                    executor.submit("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '1'", group='kdeglobals')
                     if antialiasing == "grayscale":
-                        execute_command("kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type 'none'")
+                        executor.submit("kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type 'none'", group='kdeglobals')
                     else:
                         # Map our options to KDE's option names
                         kde_subpixel = {
@@ -942,15 +918,19 @@ class FontCustomizer:
                             "vrgb": "vrgb",
                             "vbgr": "vbgr"
                         }.get(antialiasing, "rgb")
-                        execute_command(f"kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type '{kde_subpixel}'")
+                        executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type '{kde_subpixel}'", group='kdeglobals')
                 
-                execute_command("qdbus org.kde.KWin /KWin reconfigure")
+                executor.submit("qdbus org.kde.KWin /KWin reconfigure", group='kdeglobals')
             
             else:
                 show_warning(f"Automatic font configuration not fully supported for {self.desktop_env}.")
                 show_info("Some settings may not have been applied.")
-                return
+                return False
             
+            executor.run(progress=Progress("Applying font settings"))
+            executor.print_skipped()
             show_success("All font settings applied successfully!")
+            return True
         except Exception as e:
             show_error(f"Error applying font settings: {str(e)}")
+            return False
@@ -0,0 +1,186 @@
+import os
+import time
+import threading
+
+from modules.executor import run_command
+from modules.capabilities import get_capabilities
+from modules.dconf_backend import get_dconf_command, dconf_available, parse_keyfile, parse_value, schema_to_path
+
+# Seconds a snapshot is trusted before it is read again
+DEFAULT_TTL = 5.0
+
+
+def parse_gsettings_list(output):
+    """
+    Parse 'gsettings list-recursively' output into {schema: {key: value}}.
+    """
+    values = {}
+    for line in output.splitlines():
+        fields = line.split(' ', 2)
+        if len(fields) == 3:
+            values.setdefault(fields[0], {})[fields[1]] = parse_value(fields[2])
+    return values
+
+
+def parse_xfconf_list(output):
+    """
+    Parse 'xfconf-query -c CHANNEL -lv' output into {property: value}.
+    """
+    values = {}
+    for line in output.splitlines():
+        fields = line.split(None, 1)
+        if fields:
+            values[fields[0]] = coerce_text(fields[1] if len(fields) > 1 else '')
+    return values
+
+
+def parse_kde_config(text):
+    """
+    Parse a KDE config file into {group: {key: value}}. Nested groups such
+    as [Colors][Window] are joined with ':' as kwriteconfig5 expects.
+    """
+    groups = {}
+    group = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('[') and line.endswith(']'):
+            group = groups.setdefault(':'.join(line[1:-1].split('][')), {})
+        elif group is not None and '=' in line:
+            key, value = line.split('=', 1)
+            # Drop KDE's [$e] / [$i] key flags
+            group[key.split('[', 1)[0].strip()] = value.strip()
+    return groups
+
+
+def coerce_text(text):
+    """
+    Convert a plain-text value (xfconf, KDE) into a bool or number if it
+    looks like one.
+    """
+    if text in ('true', 'false'):
+        return text == 'true'
+    for convert in (int, float):
+        try:
+            return convert(text)
+        except ValueError:
+            pass
+    return text
+
+
+class LiveState:
+    """
+    In-memory snapshot of the desktop's current settings.
+
+    Each backend is read in bulk the first time one of its values is asked
+    for, and every later query is answered from memory until the snapshot
+    is older than ttl seconds or invalidate() is called:
+
+    - gsettings: one 'gsettings list-recursively' for every installed schema,
+      with 'dconf dump /' as a fallback for relocatable or unlisted schemas
+    - xfconf: one 'xfconf-query -c CHANNEL -lv' per channel
+    - KDE: the config file itself, re-read when its mtime changes
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """
+        Forget every snapshot, e.g. after changing settings.
+        """
+        with self._lock:
+            self._sources = {}
+
+    def _source(self, name, loader):
+        """
+        Return a cached source, loading it if it is missing or expired.
+        """
+        with self._lock:
+            loaded_at, data = self._sources.get(name, (None, None))
+            if loaded_at is None or time.monotonic() - loaded_at > self.ttl:
+                data = loader()
+                self._sources[name] = (time.monotonic(), data)
+            return data
+
+    def _load_gsettings(self):
+        if not get_capabilities().has_command('gsettings'):
+            return {}
+        result = run_command(['gsettings', 'list-recursively'])
+        return parse_gsettings_list(result.stdout) if result.returncode == 0 else {}
+
+    def _load_dconf(self):
+        if not dconf_available():
+            return {}
+        result = run_command(get_dconf_command() + ['dump', '/'])
+        if result.returncode != 0:
+            return {}
+        return {path: {key: parse_value(value) for key, value in keys.items()}
+                for path, keys in parse_keyfile(result.stdout).items()}
+
+    def get(self, schema, key, default=None):
+        """
+        Return the current value of a gsettings key as a Python value.
+        """
+        if ':' not in schema:
+            values = self._source('gsettings', self._load_gsettings).get(schema, {})
+            if key in values:
+                return values[key]
+
+        # dconf only holds keys changed from their defaults
+        values = self._source('dconf', self._load_dconf).get(schema_to_path(schema), {})
+        return values.get(key, default)
+
+    def xfconf_get(self, channel, prop, default=None):
+        """
+        Return the current value of an xfconf property.
+        """
+        def load():
+            if not get_capabilities().has_command('xfconf-query'):
+                return {}
+            result = run_command(['xfconf-query', '-c', channel, '-lv'])
+            return parse_xfconf_list(result.stdout) if result.returncode == 0 else {}
+
+        return self._source(f'xfconf:{channel}', load).get(prop, default)
+
+    def kde_get(self, file, group, key, default=None):
+        """
+        Return a value from a KDE config file in ~/.config, e.g. kdeglobals.
+        """
+        path = os.path.join(os.path.expanduser("~/.config"), file)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return default
+
+        def load():
+            try:
+                with open(path, 'r') as f:
+                    return mtime, parse_kde_config(f.read())
+            except OSError:
+                return mtime, {}
+
+        loaded_mtime, groups = self._source(f'kde:{path}', load)
+        if loaded_mtime != mtime:
+            with self._lock:
+                self._sources.pop(f'kde:{path}', None)
+            loaded_mtime, groups = self._source(f'kde:{path}', load)
+
+        values = groups.get(group, {})
+        return coerce_text(values[key]) if key in values else default
+
+
+_state = None
+
+
+def get_live_state():
+    """
+    Return the live-state snapshot shared by the whole session.
+    """
+    global _state
+    if _state is None:
+        _state = LiveState()
+    return _state
@@ -0,0 +1,117 @@
+import sys
+import shutil
+import threading
+from colorama import Fore, Style
+
+from modules.utils import is_interactive
+
+SPINNER = "|/-\\"
+BAR_WIDTH = 20
+
+
+class Progress:
+    """
+    Progress line for a batch of work items.
+
+    Nothing is animated on a timer: the line is redrawn only when a work
+    item finishes (see CommandExecutor.run), so the spinner moves as fast
+    as the real work does. When stdout is not a terminal, or in the
+    non-interactive CLI, nothing is printed at all.
+    """
+
+    def __init__(self, message, total=None, stream=None):
+        self.message = message
+        self.total = total
+        self.done = 0
+        self.stream = stream
+        self._frame = 0
+        self._lock = threading.Lock()
+        self._width = 0
+        self._enabled = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finish()
+
+    def _is_enabled(self):
+        """
+        Check once whether the progress line should be shown.
+        """
+        if self._enabled is None:
+            stream = self.stream or sys.stdout
+            try:
+                self._enabled = is_interactive() and stream.isatty()
+            except (AttributeError, ValueError):
+                self._enabled = False
+        return self._enabled
+
+    def start(self, total):
+        """
+        Set the number of work items and draw the initial line.
+        """
+        with self._lock:
+            self.total = total
+            self.done = 0
+            self._draw()
+
+    def advance(self, count=1, label=None):
+        """
+        Record finished work items. Safe to call from worker threads.
+        """
+        with self._lock:
+            self.done += count
+            self._frame += 1
+            self._draw(label)
+
+    def tick(self):
+        """
+        Move the spinner without recording progress, for work that reports
+        no intermediate steps.
+        """
+        with self._lock:
+            self._frame += 1
+            self._draw()
+
+    def finish(self):
+        """
+        Erase the progress line.
+        """
+        with self._lock:
+            if self._width and self._is_enabled():
+                self._write("\r" + " " * self._width + "\r")
+            self._width = 0
+
+    def _draw(self, label=None):
+        """
+        Redraw the progress line in place.
+        """
+        if not self._is_enabled():
+            return
+
+        char = SPINNER[self._frame % len(SPINNER)]
+        line = f"{self.message}... {char}"
+
+        if self.total:
+            filled = BAR_WIDTH * min(self.done, self.total) // self.total
+            line += f" [{'#' * filled}{' ' * (BAR_WIDTH - filled)}] {self.done}/{self.total}"
+        if label:
+            line += f" {label}"
+
+        # Stay on one line so the whole thing can be erased with \r
+        line = line[:shutil.get_terminal_size().columns - 1]
+        padding = " " * max(0, self._width - len(line))
+        self._width = len(line)
+        self._write(f"\r{Fore.CYAN}{line}{Style.RESET_ALL}{padding}")
+
+    def _write(self, text):
+        """
+        Write straight to the terminal, after any buffered frame.
+        """
+        stream = self.stream or sys.stdout
+        # Flushing first renders a pending screen frame, so the progress
+        # line is drawn below it rather than buffered into it
+        stream.flush()
+        stream.write(text)
+        stream.flush()
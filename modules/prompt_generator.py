@@ -0,0 +1,317 @@
+"""
+Generators for the git-aware shell prompts installed by ShellCustomizer.
+
+The prompts find the repository by walking up from $PWD with shell
+builtins only and read the branch straight from .git/HEAD, so showing the
+branch starts no process. The repository is cached per $PWD. git itself only
+runs for the dirty-state check, under a timeout; a repository that times out
+once is not checked again in that shell session. The check starts git on
+every prompt, so it is off unless a timeout is given, either when the prompt
+is generated or per shell with LC_GIT_DIRTY_TIMEOUT (0 disables it).
+"""
+
+# Seconds the dirty-state check may take before it is given up; 0 leaves
+# the check out, so the default prompt starts no process at all
+DEFAULT_DIRTY_TIMEOUT = 0
+
+BASH_GIT_PROMPT = r"""
+# Git-aware Prompt (branch read from .git/HEAD with shell builtins)
+__lc_git_timeout=${LC_GIT_DIRTY_TIMEOUT:-@TIMEOUT@}
+__lc_git_pwd=
+__lc_git_dir=
+__lc_git_slow=
+__lc_git_segment=
+__lc_git_prompt() {
+    local last=$? dir head
+    if [[ $PWD != "$__lc_git_pwd" ]]; then
+        __lc_git_pwd=$PWD
+        __lc_git_dir=
+        dir=$PWD
+        while :; do
+            if [[ -d $dir/.git ]]; then
+                __lc_git_dir=$dir/.git
+                break
+            elif [[ -f $dir/.git ]]; then
+                read -r head < "$dir/.git"
+                head=${head#gitdir: }
+                [[ $head == /* ]] || head=$dir/$head
+                __lc_git_dir=$head
+                break
+            fi
+            [[ -z $dir ]] && break
+            dir=${dir%/*}
+        done
+    fi
+    __lc_git_segment=
+    [[ -n $__lc_git_dir && -r $__lc_git_dir/HEAD ]] || return $last
+    read -r head < "$__lc_git_dir/HEAD"
+    if [[ $head == "ref: refs/heads/"* ]]; then
+        head=${head#ref: refs/heads/}
+    else
+        head=${head:0:7}
+    fi
+    if [[ -n ${__lc_git_timeout//[0.]/} && $__lc_git_slow != "$__lc_git_dir" ]]; then
+        timeout "$__lc_git_timeout" git --no-optional-locks diff --no-ext-diff --quiet HEAD -- >/dev/null 2>&1
+        case $? in
+            1) head="$head*" ;;
+            124) __lc_git_slow=$__lc_git_dir ;;
+        esac
+    fi
+    __lc_git_segment=" ($head)"
+    return $last
+}
+[[ $PROMPT_COMMAND == *__lc_git_prompt* ]] || PROMPT_COMMAND="__lc_git_prompt${PROMPT_COMMAND:+; $PROMPT_COMMAND}"
+PS1='\[\033[01;32m\]\u@\h\[\033[00m\]:\[\033[01;34m\]\w\[\033[00m\]\[\033[01;33m\]${__lc_git_segment}\[\033[00m\]\$ '
+"""
+
+ZSH_GIT_FUNCTIONS = r"""
+# Git-aware Prompt (branch read from .git/HEAD with shell builtins)
+__lc_git_timeout=${LC_GIT_DIRTY_TIMEOUT:-@TIMEOUT@}
+__lc_git_pwd=
+__lc_git_dir=
+__lc_git_slow=
+__lc_git_segment=
+__lc_git_prompt() {
+    local dir head
+    if [[ $PWD != "$__lc_git_pwd" ]]; then
+        __lc_git_pwd=$PWD
+        __lc_git_dir=
+        dir=$PWD
+        while :; do
+            if [[ -d $dir/.git ]]; then
+                __lc_git_dir=$dir/.git
+                break
+            elif [[ -f $dir/.git ]]; then
+                read -r head < "$dir/.git"
+                head=${head#gitdir: }
+                [[ $head == /* ]] || head=$dir/$head
+                __lc_git_dir=$head
+                break
+            fi
+            [[ -z $dir ]] && break
+            dir=${dir%/*}
+        done
+    fi
+    __lc_git_segment=
+    [[ -n $__lc_git_dir && -r $__lc_git_dir/HEAD ]] || return 0
+    read -r head < "$__lc_git_dir/HEAD"
+    if [[ $head == "ref: refs/heads/"* ]]; then
+        head=${head#ref: refs/heads/}
+    else
+        head=${head[1,7]}
+    fi
+    if [[ -n ${__lc_git_timeout//[0.]/} && $__lc_git_slow != "$__lc_git_dir" ]]; then
+        timeout "$__lc_git_timeout" git --no-optional-locks diff --no-ext-diff --quiet HEAD -- >/dev/null 2>&1
+        case $? in
+            1) head="$head*" ;;
+            124) __lc_git_slow=$__lc_git_dir ;;
+        esac
+    fi
+    __lc_git_segment=" (${head//\%/%%})"
+}
+autoload -Uz add-zsh-hook
+add-zsh-hook precmd __lc_git_prompt
+setopt PROMPT_SUBST
+"""
+
+ZSH_GIT_PROMPT = ZSH_GIT_FUNCTIONS + r"""PROMPT='%F{green}%n@%m%f:%F{blue}%~%f%F{yellow}${__lc_git_segment}%f $ '
+"""
+
+# The prompt is drawn as soon as the builtin-only segments are known. git
+# status runs in a worker whose output zle -F hands back to the line editor,
+# which redraws the prompt in place. A new prompt cancels a pending worker,
+# killing it along with the git it runs.
+ZSH_ASYNC_SEGMENTS = r"""
+# Async Prompt Segments (git status computed in the background)
+zmodload zsh/datetime zsh/system
+__lc_git_timeout=0
+__lc_async_timeout=${LC_GIT_STATUS_TIMEOUT:-@ASYNC_TIMEOUT@}
+__lc_async_fd=
+__lc_async_pid=
+__lc_async_dir=
+__lc_async_segment=
+__lc_cmd_start=
+__lc_time_segment=
+__lc_venv_segment=
+__lc_git_status_worker() {
+    local line staged=0 unstaged=0 untracked=0 ahead=0 behind=0 out= pid=
+    trap 'kill $pid 2>/dev/null; exit 1' TERM
+    coproc timeout "$__lc_async_timeout" git -C "$1" --no-optional-locks status --porcelain=v2 --branch 2>/dev/null
+    pid=$!
+    while read -r -p line; do
+        case $line in
+            '# branch.ab '*) line=${line#\# branch.ab +}; ahead=${line%% *}; behind=${line##*-} ;;
+            '? '*) (( untracked++ )) ;;
+            [12u]' '*)
+                [[ ${line[3]} != . ]] && (( staged++ ))
+                [[ ${line[4]} != . ]] && (( unstaged++ )) ;;
+        esac
+    done
+    wait $pid
+    case $? in
+        0) ;;
+        124) print -r -- slow; return ;;
+        *) print; return ;;
+    esac
+    (( ahead )) && out+=" ↑$ahead"
+    (( behind )) && out+=" ↓$behind"
+    (( staged )) && out+=" +$staged"
+    (( unstaged )) && out+=" ~$unstaged"
+    (( untracked )) && out+=" ?$untracked"
+    print -r -- "$out"
+}
+__lc_async_cancel() {
+    [[ -n $__lc_async_fd ]] || return 0
+    zle -F $__lc_async_fd 2>/dev/null
+    exec {__lc_async_fd}<&-
+    __lc_async_fd=
+    [[ -n $__lc_async_pid ]] && kill $__lc_async_pid 2>/dev/null
+    __lc_async_pid=
+}
+__lc_async_done() {
+    local fd=$1 line
+    read -r -u $fd line
+    zle -F $fd
+    exec {fd}<&-
+    __lc_async_fd=
+    __lc_async_pid=
+    if [[ $line == slow ]]; then
+        __lc_git_slow=$__lc_async_dir
+        line=
+    fi
+    __lc_async_segment=$line
+    zle && zle reset-prompt
+}
+__lc_async_start() {
+    __lc_async_cancel
+    if [[ $__lc_git_dir != "$__lc_async_dir" ]]; then
+        __lc_async_dir=$__lc_git_dir
+        __lc_async_segment=
+    fi
+    [[ -n $__lc_git_dir && -n ${__lc_async_timeout//[0.]/} && $__lc_git_slow != "$__lc_git_dir" ]] || return 0
+    exec {__lc_async_fd}< <(__lc_git_status_worker "$PWD")
+    __lc_async_pid=$sysparams[procsubstpid]
+    zle -F $__lc_async_fd __lc_async_done
+}
+__lc_timer_start() {
+    __lc_cmd_start=$EPOCHREALTIME
+}
+__lc_timer_stop() {
+    __lc_time_segment=
+    [[ -n $__lc_cmd_start ]] || return 0
+    local -F 1 elapsed=$(( EPOCHREALTIME - __lc_cmd_start ))
+    __lc_cmd_start=
+    (( elapsed >= @TIME_THRESHOLD@ )) && __lc_time_segment=" ${elapsed}s"
+}
+__lc_venv() {
+    __lc_venv_segment=${VIRTUAL_ENV:+ (${${VIRTUAL_ENV:t}//\%/%%})}
+}
+add-zsh-hook preexec __lc_timer_start
+add-zsh-hook precmd __lc_timer_stop
+add-zsh-hook precmd __lc_venv
+add-zsh-hook precmd __lc_async_start
+PROMPT='%F{green}%n@%m%f:%F{blue}%~%f%F{magenta}${__lc_venv_segment}%F{yellow}${__lc_git_segment}%F{red}${__lc_async_segment}%f $ '
+RPROMPT='%(?..%F{red}✘ %?%f)%F{cyan}${__lc_time_segment}%f'
+"""
+
+FISH_GIT_PROMPT = r"""
+# Git-aware Prompt (branch read from .git/HEAD with shell builtins)
+set -q LC_GIT_DIRTY_TIMEOUT; or set -g LC_GIT_DIRTY_TIMEOUT @TIMEOUT@
+set -g __lc_git_pwd
+set -g __lc_git_dir
+set -g __lc_git_slow
+
+function __lc_git_segment
+    if test "$PWD" != "$__lc_git_pwd"
+        set -g __lc_git_pwd $PWD
+        set -g __lc_git_dir
+        set -l dir $PWD
+        while true
+            if test -d "$dir/.git"
+                set -g __lc_git_dir "$dir/.git"
+                break
+            else if test -f "$dir/.git"
+                read -l line < "$dir/.git"
+                set line (string replace 'gitdir: ' '' -- $line)
+                string match -q '/*' -- $line; or set line "$dir/$line"
+                set -g __lc_git_dir $line
+                break
+            end
+            test -z "$dir"; and break
+            set dir (string replace -r '/[^/]*$' '' -- $dir)
+        end
+    end
+    test -n "$__lc_git_dir" -a -r "$__lc_git_dir/HEAD"; or return
+    read -l head < "$__lc_git_dir/HEAD"
+    if string match -q 'ref: refs/heads/*' -- $head
+        set head (string replace 'ref: refs/heads/' '' -- $head)
+    else
+        set head (string sub -l 7 -- $head)
+    end
+    set -l timeout (string replace -a -r '[0.]' '' -- $LC_GIT_DIRTY_TIMEOUT)
+    if test -n "$timeout" -a "$__lc_git_slow" != "$__lc_git_dir"
+        timeout $LC_GIT_DIRTY_TIMEOUT git --no-optional-locks diff --no-ext-diff --quiet HEAD -- >/dev/null 2>&1
+        switch $status
+            case 1
+                set head "$head*"
+            case 124
+                set -g __lc_git_slow $__lc_git_dir
+        end
+    end
+    echo -n " ($head)"
+end
+
+function fish_prompt
+    set_color green
+    echo -n "$USER@"(prompt_hostname)
+    set_color normal
+    echo -n ':'
+    set_color blue
+    echo -n (prompt_pwd)
+    set_color yellow
+    __lc_git_segment
+    set_color normal
+    echo -n '> '
+end
+"""
+
+GIT_PROMPTS = {
+    'bash': BASH_GIT_PROMPT,
+    'zsh': ZSH_GIT_PROMPT,
+    'fish': FISH_GIT_PROMPT,
+}
+
+
+# Seconds the background git status may take
+DEFAULT_ASYNC_TIMEOUT = 5
+
+# Commands that take at least this many seconds show their duration
+DEFAULT_TIME_THRESHOLD = 2
+
+
+def format_timeout(seconds):
+    """
+    Format a timeout for timeout(1); 0 disables the check.
+    """
+    return f"{seconds:g}" if seconds and seconds > 0 else "0"
+
+
+def git_prompt(shell_type, dirty_timeout=DEFAULT_DIRTY_TIMEOUT):
+    """
+    Return the rc file code for the git-aware prompt of a shell.
+    """
+    if shell_type not in GIT_PROMPTS:
+        raise ValueError(f"No git-aware prompt for {shell_type}.")
+    return GIT_PROMPTS[shell_type].replace('@TIMEOUT@', format_timeout(dirty_timeout))
+
+
+def zsh_async_prompt(status_timeout=DEFAULT_ASYNC_TIMEOUT, time_threshold=DEFAULT_TIME_THRESHOLD):
+    """
+    Return the zsh rc file code for a prompt whose slow segments are
+    computed in the background: git status counts (ahead/behind, staged,
+    unstaged, untracked), plus the virtualenv and the last command's exit
+    status and duration, which only need builtins.
+    """
+    return (ZSH_GIT_FUNCTIONS.replace('@TIMEOUT@', '0')
+            + ZSH_ASYNC_SEGMENTS.replace('@ASYNC_TIMEOUT@', format_timeout(status_timeout))
+                                .replace('@TIME_THRESHOLD@', f"{time_threshold:g}"))
@@ -0,0 +1,544 @@
+import re
+import shlex
+import time
+
+from modules.utils import atomic_write
+
+# Sections of the rc file managed by the shell customizer
+PROMPT = 'prompt'
+ALIASES = 'aliases'
+FUNCTIONS = 'functions'
+ENV_VARS = 'env'
+
+SECTION_MARKERS = {
+    PROMPT: ("# BEGIN PROMPT CONFIGURATION", "# END PROMPT CONFIGURATION"),
+    ALIASES: ("# BEGIN CUSTOM ALIASES", "# END CUSTOM ALIASES"),
+    FUNCTIONS: ("# BEGIN CUSTOM FUNCTIONS", "# END CUSTOM FUNCTIONS"),
+    ENV_VARS: ("# BEGIN ENVIRONMENT VARIABLES", "# END ENVIRONMENT VARIABLES"),
+}
+
+# Comments written above each managed entry
+ENTRY_COMMENTS = {
+    ALIASES: "# Alias: ",
+    FUNCTIONS: "# Function: ",
+    ENV_VARS: "# Environment Variable: ",
+}
+
+# Definitions recognised anywhere in the file
+POSIX_ALIAS = re.compile(r'^\s*alias\s+([^=\s]+)=')
+POSIX_EXPORT = re.compile(r'^\s*export\s+([A-Za-z_][A-Za-z0-9_]*)=')
+FISH_FUNCTION = re.compile(r'^\s*function\s+(\S+)')
+FISH_BLOCK_OPENERS = ('function', 'if', 'for', 'while', 'switch', 'begin')
+FISH_EXPORT = re.compile(r'^\s*set\s+-[a-zA-Z]*x[a-zA-Z]*\s+([A-Za-z_][A-Za-z0-9_]*)(\s|$)')
+
+# Names accepted for imported entries
+ALIAS_NAME = re.compile(r'^[A-Za-z0-9_.:+@%,-]+$')
+ENV_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def unquote(text):
+    """
+    Return the value of a shell word such as 'ls -l' or "$HOME/bin".
+    Text that is not a single word is returned unchanged.
+    """
+    try:
+        words = shlex.split(text)
+    except ValueError:
+        return text
+    return words[0] if len(words) == 1 else text
+
+
+# Characters escaped inside the double quotes written around variable
+# values. A $ stays live only where it starts a plain variable reference
+# such as $HOME or ${HOME}, so a value cannot run a command substitution
+POSIX_QUOTE_ESCAPES = re.compile(r'[\\"`]|\$(?![A-Za-z_]|\{[A-Za-z_][A-Za-z0-9_]*\})')
+FISH_QUOTE_ESCAPES = re.compile(r'[\\"]|\$(?![A-Za-z_])')
+QUOTED_ESCAPE = re.compile(r'\\([\\"`$])')
+
+
+def quote_value(value, shell_type='bash'):
+    """
+    Quote an environment variable value for an rc file line.
+    """
+    pattern = FISH_QUOTE_ESCAPES if shell_type == 'fish' else POSIX_QUOTE_ESCAPES
+    return '"' + pattern.sub(lambda match: '\\' + match.group(0), value) + '"'
+
+
+def unquote_value(text):
+    """
+    Reverse quote_value(). Other shell words go through unquote().
+    """
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return QUOTED_ESCAPE.sub(r'\1', text[1:-1])
+    return unquote(text)
+
+
+def parse_definitions(lines):
+    """
+    Parse alias and environment variable definitions, one per line, in
+    bash, zsh or fish syntax:
+
+        alias ll='ls -l'        export EDITOR=vim       EDITOR=vim
+        alias ll 'ls -l'        set -gx EDITOR vim
+
+    lines may be any iterable, such as an open file, and is read once.
+    Returns (definitions, errors): definitions maps (kind, name) to the
+    value, in input order, with later duplicates replacing earlier ones;
+    errors lists (line number, message) for lines that were not understood.
+    """
+    definitions = {}
+    errors = []
+
+    for number, line in enumerate(lines, 1):
+        try:
+            words = shlex.split(line, comments=True)
+        except ValueError as e:
+            errors.append((number, str(e)))
+            continue
+        if not words:
+            continue
+
+        found = []
+        if words[0] == 'alias' and len(words) == 3 and '=' not in words[1]:
+            found.append((ALIASES, words[1], words[2]))
+        elif words[0] in ('alias', 'export'):
+            kind = ALIASES if words[0] == 'alias' else ENV_VARS
+            for word in words[1:]:
+                name, equals, value = word.partition('=')
+                if not equals:
+                    errors.append((number, f"expected NAME=VALUE, got '{word}'"))
+                    break
+                found.append((kind, name, value))
+        elif words[0] == 'set' and len(words) >= 3 and words[1].startswith('-') and 'x' in words[1]:
+            found.append((ENV_VARS, words[2], ' '.join(words[3:])))
+        elif len(words) == 1 and '=' in words[0]:
+            name, _, value = words[0].partition('=')
+            found.append((ENV_VARS, name, value))
+        else:
+            errors.append((number, "not an alias or environment variable definition"))
+            continue
+
+        for kind, name, value in found:
+            pattern = ALIAS_NAME if kind == ALIASES else ENV_NAME
+            if not pattern.match(name) or name.startswith('-'):
+                errors.append((number, f"invalid name '{name}'"))
+            elif kind == ALIASES and not value.strip():
+                errors.append((number, f"alias '{name}' has no command"))
+            else:
+                definitions.pop((kind, name), None)
+                definitions[(kind, name)] = value
+
+    return definitions, errors
+
+
+def format_definition(kind, name, value):
+    """
+    Format an alias or environment variable as one line that
+    parse_definitions() reads back and a POSIX shell can source.
+    """
+    if kind == ALIASES:
+        return f"alias {name}={shlex.quote(value)}\n"
+
+    # Double quotes keep references such as $HOME expandable
+    return f'export {name}={quote_value(value)}\n'
+
+
+class Node:
+    """
+    A run of lines in the document: either plain text or a named entry.
+    Nodes added in front of it later are kept in `inserted`, so adding an
+    entry to a section does not shift the rest of the document.
+    """
+
+    __slots__ = ('kind', 'name', 'lines', 'section', 'inserted')
+
+    def __init__(self, kind, name, lines, section=None):
+        self.kind = kind
+        self.name = name
+        self.lines = lines
+        self.section = section
+        self.inserted = []
+
+    def render(self):
+        return ''.join(node.render() for node in self.inserted) + ''.join(self.lines)
+
+
+class RcDocument:
+    """
+    In-memory model of a shell rc file.
+
+    The file is parsed once into nodes: plain text, section markers and
+    entries (aliases, environment variables and functions), which are
+    indexed by name. Edits only touch the affected nodes; the file is
+    rendered and written once by save(), so a bulk import of n entries
+    costs O(n) instead of n full rewrites.
+    """
+
+    def __init__(self, path, shell_type, text=None):
+        self.path = path
+        self.shell_type = shell_type
+        self.exists = text is not None
+        self.original = text or ''
+        self._nodes = []
+        self._index = {}
+        self._sections = {}
+        self._parse(self.original)
+
+    @classmethod
+    def load(cls, path, shell_type):
+        """
+        Read and parse an rc file. A missing file gives an empty document.
+        """
+        try:
+            with open(path, 'r') as f:
+                text = f.read()
+        except FileNotFoundError:
+            text = None
+        return cls(path, shell_type, text)
+
+    # Parsing
+
+    def _definition(self, line):
+        """
+        Return (kind, name) if a line starts an alias, variable or function
+        definition.
+        """
+        if self.shell_type == 'fish':
+            match = FISH_FUNCTION.match(line)
+            if match:
+                return 'function', match.group(1)
+            match = FISH_EXPORT.match(line)
+            if match:
+                return ENV_VARS, match.group(1)
+        else:
+            match = POSIX_ALIAS.match(line)
+            if match:
+                return ALIASES, match.group(1)
+            match = POSIX_EXPORT.match(line)
+            if match:
+                return ENV_VARS, match.group(1)
+        return None
+
+    def _parse(self, text):
+        lines = text.splitlines(keepends=True)
+        markers = {}
+        for section, (begin, end) in SECTION_MARKERS.items():
+            markers[begin] = ('begin', section)
+            markers[end] = ('end', section)
+
+        section = None
+        pending = []
+        i = 0
+
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.strip()
+
+            marker = markers.get(stripped)
+            if marker and (marker[0] == 'begin' or marker[1] == section):
+                self._flush(pending, section)
+                pending = []
+                kind, marker_section = marker
+                self._add(Node(kind, marker_section, [line], marker_section))
+                section = marker_section if kind == 'begin' else None
+                i += 1
+                continue
+
+            # Functions added through the menu: a comment followed by the
+            # code, up to the next function or the end of the section
+            if section == FUNCTIONS and stripped.startswith(ENTRY_COMMENTS[FUNCTIONS]):
+                block = self._leading_blank(pending, section, FUNCTIONS)
+                self._flush(pending, section)
+                pending = []
+                name = stripped[len(ENTRY_COMMENTS[FUNCTIONS]):].strip()
+                block.append(line)
+                i += 1
+                while i < len(lines) and not lines[i].strip().startswith(ENTRY_COMMENTS[FUNCTIONS]) \
+                        and lines[i].strip() != SECTION_MARKERS[FUNCTIONS][1]:
+                    block.append(lines[i])
+                    i += 1
+                self._add(Node(FUNCTIONS, name, block, section))
+                continue
+
+            definition = self._definition(line)
+            if definition and definition[0] == 'function':
+                # A fish function is an alias only where the customizer
+                # wrote it as one; other functions, such as the prompt's,
+                # are kept whole as plain text
+                name = definition[1]
+                is_alias = section == ALIASES or (pending and pending[-1].strip() == ENTRY_COMMENTS[ALIASES] + name)
+                if not is_alias:
+                    self._flush(pending, section)
+                    pending = []
+                    block, i = self._fish_block(lines, i)
+                    self._add(Node('text', None, block, section))
+                    continue
+                definition = (ALIASES, name)
+
+            if definition:
+                kind, name = definition
+                block = []
+
+                # Keep the entry's comment with it
+                if pending and pending[-1].strip() == ENTRY_COMMENTS.get(kind, '\0') + name:
+                    comment = pending.pop()
+                    block = self._leading_blank(pending, section, kind) + [comment]
+                self._flush(pending, section)
+                pending = []
+
+                if self.shell_type == 'fish' and kind == ALIASES:
+                    body, i = self._fish_block(lines, i)
+                    block.extend(body)
+                else:
+                    block.append(line)
+                    i += 1
+                self._add(Node(kind, name, block, section))
+                continue
+
+            pending.append(line)
+            i += 1
+
+        self._flush(pending, section)
+
+    @staticmethod
+    def _fish_block(lines, start):
+        """
+        Return the lines of the fish block opened at lines[start], up to
+        its matching 'end', and the index after it. Nested blocks are
+        counted, including ones opened and closed on a single line.
+        """
+        depth = 0
+        i = start
+        while i < len(lines):
+            for command in lines[i].split(';'):
+                words = command.split()
+                while words and words[0] in ('and', 'or', 'not', 'command', 'builtin'):
+                    words = words[1:]
+                if not words or words[0].startswith('#'):
+                    continue
+                if words[0] in FISH_BLOCK_OPENERS:
+                    depth += 1
+                elif words[0] == 'end':
+                    depth -= 1
+            i += 1
+            if depth <= 0:
+                break
+        return lines[start:i], i
+
+    def _leading_blank(self, pending, section, kind):
+        """
+        Take the blank line written before each entry of a managed section,
+        so that removing the entry removes it too.
+        """
+        if section == kind and pending and pending[-1] == '\n':
+            return [pending.pop()]
+        return []
+
+    def _flush(self, lines, section):
+        if lines:
+            self._add(Node('text', None, list(lines), section))
+
+    def _add(self, node):
+        self._nodes.append(node)
+
+        if node.kind in ('begin', 'end'):
+            self._sections.setdefault(node.name, {})[node.kind] = node
+        elif node.name is not None:
+            self._index.setdefault((node.kind, node.name), []).append(node)
+
+    # Queries
+
+    def names(self, kind):
+        """
+        Return the names of the entries of a kind (ALIASES, ENV_VARS or
+        FUNCTIONS) defined anywhere in the file, in file order.
+        """
+        return [name for (entry_kind, name), nodes in self._index.items() if entry_kind == kind and nodes]
+
+    def has(self, kind, name):
+        return bool(self._index.get((kind, name)))
+
+    def entry_text(self, kind, name):
+        """
+        Return the text of the last definition of an entry, or None.
+        """
+        nodes = self._index.get((kind, name))
+        return ''.join(nodes[-1].lines) if nodes else None
+
+    def value(self, kind, name):
+        """
+        Return the command of an alias or the value of an environment
+        variable, from its last definition, or None if it is not defined.
+        """
+        nodes = self._index.get((kind, name))
+        if not nodes or kind not in (ALIASES, ENV_VARS):
+            return None
+
+        lines = [line for line in nodes[-1].lines if line.strip() and not line.lstrip().startswith('#')]
+        if not lines:
+            return None
+
+        if self.shell_type == 'fish' and kind == ALIASES:
+            # function NAME / body / end, as written by set_alias()
+            body = [line.strip() for line in lines[1:-1]]
+            if len(body) == 1 and body[0].endswith(' $argv'):
+                return body[0][:-len(' $argv')]
+            return '\n'.join(body)
+
+        if self.shell_type == 'fish':
+            words = lines[0].split(None, 3)
+            return unquote_value(words[3].strip()) if len(words) > 3 else ''
+
+        if kind == ENV_VARS:
+            return unquote_value(lines[0][POSIX_EXPORT.match(lines[0]).end():].strip())
+        return unquote(lines[0][POSIX_ALIAS.match(lines[0]).end():].strip())
+
+    def export(self, kinds=(ALIASES, ENV_VARS)):
+        """
+        Yield every alias and environment variable of the given kinds as
+        lines in the format read by parse_definitions().
+        """
+        for kind in kinds:
+            for name in self.names(kind):
+                value = self.value(kind, name)
+                if value is not None:
+                    yield format_definition(kind, name, value)
+
+    # Edits
+
+    def _ensure_section(self, section):
+        """
+        Return the end marker of a managed section, adding the section at
+        the end of the file if it is missing.
+        """
+        markers = self._sections.get(section, {})
+        if 'begin' in markers and 'end' in markers:
+            return markers['end']
+
+        begin, end = SECTION_MARKERS[section]
+        if self.render():
+            if not self._nodes[-1].render().endswith('\n'):
+                self._nodes[-1].lines.append('\n')
+            self._add(Node('text', None, ['\n']))
+        self._add(Node('begin', section, [begin + '\n'], section))
+        self._add(Node('end', section, [end + '\n'], section))
+        return self._sections[section]['end']
+
+    def _set_entry(self, kind, name, lines):
+        """
+        Replace the managed definition of an entry, or add it at the end of
+        its managed section. Definitions the user wrote elsewhere in the
+        file are left alone.
+        """
+        # The layout the customizer has always written: a blank line, the
+        # comment, then the definition
+        lines = ['\n', ENTRY_COMMENTS[kind] + name + '\n'] + lines
+
+        nodes = self._index.setdefault((kind, name), [])
+        managed = [node for node in nodes if node.section == kind]
+        for node in managed[:-1]:
+            node.lines = []
+            nodes.remove(node)
+
+        if managed:
+            managed[-1].lines = lines
+            return
+
+        node = Node(kind, name, lines, kind)
+        self._ensure_section(kind).inserted.append(node)
+        nodes.append(node)
+
+    def _remove_entry(self, kind, name):
+        nodes = self._index.pop((kind, name), [])
+        for node in nodes:
+            node.lines = []
+        return bool(nodes)
+
+    def set_alias(self, name, command):
+        if self.shell_type == 'fish':
+            lines = [f"function {name}\n", f"    {command} $argv\n", "end\n"]
+        else:
+            command = command.replace("'", "'\\''")
+            lines = [f"alias {name}='{command}'\n"]
+        self._set_entry(ALIASES, name, lines)
+
+    def remove_alias(self, name):
+        return self._remove_entry(ALIASES, name)
+
+    def set_env(self, name, value):
+        value = quote_value(value, self.shell_type)
+        if self.shell_type == 'fish':
+            lines = [f'set -x {name} {value}\n']
+        else:
+            lines = [f'export {name}={value}\n']
+        self._set_entry(ENV_VARS, name, lines)
+
+    def remove_env(self, name):
+        return self._remove_entry(ENV_VARS, name)
+
+    def set_function(self, name, code_lines):
+        self._set_entry(FUNCTIONS, name, [line.rstrip('\n') + '\n' for line in code_lines])
+
+    def remove_function(self, name):
+        return self._remove_entry(FUNCTIONS, name)
+
+    def set_section(self, section, content):
+        """
+        Replace everything between a section's markers with content.
+        """
+        end = self._ensure_section(section)
+        begin = self._sections[section]['begin']
+
+        inside = False
+        for node in self._nodes:
+            if node is begin:
+                inside = True
+            elif node is end:
+                break
+            elif inside:
+                self._clear(node)
+
+        for node in end.inserted:
+            self._clear(node)
+        end.inserted = [Node('text', None, [content], section)]
+
+    def _clear(self, node):
+        node.lines = []
+        for inserted in node.inserted:
+            self._clear(inserted)
+        if node.name is not None and node.kind not in ('begin', 'end'):
+            nodes = self._index.get((node.kind, node.name), [])
+            if node in nodes:
+                nodes.remove(node)
+
+    # Output
+
+    def render(self):
+        return ''.join(node.render() for node in self._nodes)
+
+    def changed(self):
+        return self.render() != self.original
+
+    def backup(self):
+        """
+        Write a timestamped copy of the file as it was when loaded, from
+        memory. Returns the backup path, or None if the file did not exist.
+        """
+        if not self.exists:
+            return None
+        backup_path = f"{self.path}.bak.{int(time.time())}"
+        atomic_write(backup_path, self.original)
+        return backup_path
+
+    def save(self):
+        """
+        Write the document if it changed. Returns True if the file was written.
+        """
+        text = self.render()
+        if self.exists and text == self.original:
+            return False
+
+        atomic_write(self.path, text)
+        self.original = text
+        self.exists = True
+        return True
@@ -0,0 +1,123 @@
+import sys
+import time
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from io import StringIO
+
+Section = namedtuple('Section', ['name', 'resources', 'function'])
+SectionResult = namedtuple('SectionResult', ['name', 'ok', 'output', 'error', 'duration'])
+
+
+class ThreadOutput:
+    """
+    Stand-in for sys.stdout that gives each capturing thread its own buffer.
+
+    Threads that have not called start() write straight through. A capturing
+    thread is told it is not on a terminal, so screen clears and progress
+    lines are skipped while its output is collected.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def _buffer(self):
+        return getattr(self._local, 'buffer', None)
+
+    def start(self):
+        """
+        Start capturing the current thread's output.
+        """
+        self._local.buffer = StringIO()
+
+    def stop(self):
+        """
+        Stop capturing and return what the current thread printed.
+        """
+        buffer, self._local.buffer = self._buffer(), None
+        return buffer.getvalue() if buffer is not None else ''
+
+    def write(self, text):
+        buffer = self._buffer()
+        if buffer is not None:
+            return buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        if self._buffer() is None:
+            self.stream.flush()
+
+    def isatty(self):
+        if self._buffer() is not None:
+            return False
+        return self.stream.isatty()
+
+
+@contextmanager
+def capture_output():
+    """
+    Install a ThreadOutput on sys.stdout for the duration of the block.
+    """
+    original = sys.stdout
+    output = ThreadOutput(original)
+    sys.stdout = output
+    try:
+        yield output
+    finally:
+        sys.stdout = original
+
+
+def run_sections(sections):
+    """
+    Run sections concurrently, each section waiting only for the earlier
+    sections that share one of its resources. Sections that share nothing
+    run in parallel; sections that do share a resource keep their relative
+    order, so the last writer is the same as in a sequential run.
+
+    A section's function succeeds unless it returns False or raises. Each
+    section's output is captured separately and returned, in submission
+    order, as SectionResult tuples.
+    """
+    from modules.async_core import run
+
+    return run(run_sections_async(sections))
+
+
+async def run_sections_async(sections):
+    """
+    Coroutine version of run_sections(). Section functions are synchronous
+    and each runs in a worker thread once its dependencies have finished.
+    """
+    import asyncio
+
+    if not sections:
+        return []
+
+    def run_section(section, output):
+        output.start()
+        start = time.monotonic()
+        error = None
+        try:
+            ok = section.function() is not False
+        except Exception as e:
+            ok, error = False, str(e)
+
+        return SectionResult(section.name, ok, output.stop(), error, time.monotonic() - start)
+
+    async def schedule(section, dependencies, output):
+        if dependencies:
+            await asyncio.wait(dependencies)
+        return await asyncio.to_thread(run_section, section, output)
+
+    with capture_output() as output:
+        tasks = []
+        for index, section in enumerate(sections):
+            dependencies = [tasks[earlier] for earlier in range(index)
+                            if set(sections[earlier].resources) & set(section.resources)]
+            tasks.append(asyncio.ensure_future(schedule(section, dependencies, output)))
+
+        return list(await asyncio.gather(*tasks))
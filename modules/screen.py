@@ -0,0 +1,130 @@
+import re
+import sys
+import shutil
+
+# ANSI control sequences
+CLEAR_SCREEN = "\x1b[H\x1b[2J\x1b[3J"
+CLEAR_LINE = "\x1b[K"
+CLEAR_BELOW = "\x1b[J"
+
+ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+
+def move_to(row):
+    """
+    Return the sequence that moves the cursor to the start of a 0-based row.
+    """
+    return f"\x1b[{row + 1};1H"
+
+
+def visible_width(line):
+    """
+    Return the printed width of a line, ignoring color codes.
+    """
+    return len(ANSI_ESCAPE.sub('', line))
+
+
+class Screen:
+    """
+    Full-screen renderer installed in place of sys.stdout.
+
+    After clear_screen() starts a frame, everything printed is buffered. When
+    the frame is flushed (input() flushes stdout before reading), it is
+    compared with the previous frame and only the changed lines are
+    rewritten, in a single write. Output after that point goes straight
+    through. If a frame does not fit the terminal, or output since the last
+    frame may have scrolled it, the screen is cleared and redrawn in full.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._frame = None
+        self._back = None
+        self._dirty_from = 0
+        self._rows_used = 0
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def begin_frame(self):
+        """
+        Start buffering a new frame, discarding any frame not yet drawn.
+        """
+        self._frame = []
+
+    def invalidate(self):
+        """
+        Forget what is on screen, forcing the next frame to redraw in full.
+        """
+        self._back = None
+
+    def write(self, text):
+        if self._frame is not None:
+            self._frame.append(text)
+        else:
+            self._rows_used += text.count('\n')
+            self.stream.write(text)
+        return len(text)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        if self._frame is not None:
+            frame, self._frame = ''.join(self._frame), None
+            self._render(frame)
+        self.stream.flush()
+
+    def _render(self, frame):
+        """
+        Draw a frame, rewriting only the lines that changed.
+        """
+        columns, rows = shutil.get_terminal_size()
+        lines = frame.split('\n')
+
+        overflow = len(lines) > rows or any(visible_width(line) >= columns for line in lines)
+        scrolled = self._back is not None and len(self._back) + self._rows_used >= rows
+
+        if self._back is None or overflow or scrolled:
+            output = CLEAR_SCREEN + frame
+        else:
+            output = []
+            for row, line in enumerate(lines[:-1]):
+                if row >= self._dirty_from or row >= len(self._back) or self._back[row] != line:
+                    output.append(move_to(row) + line + CLEAR_LINE)
+
+            # The last line is always redrawn; clearing from the end of it
+            # removes whatever is left of the previous frame
+            output.append(move_to(len(lines) - 1) + lines[-1] + CLEAR_BELOW)
+            output = ''.join(output)
+
+        self.stream.write(output)
+
+        # Input is echoed from the last line on, so it is never trusted
+        self._back = None if overflow else lines
+        self._dirty_from = len(lines) - 1
+        self._rows_used = 0
+
+
+_screen = None
+
+
+def get_screen():
+    """
+    Return the screen renderer, installing it on sys.stdout the first time.
+    Returns None if stdout is not a terminal.
+    """
+    global _screen
+    if _screen is not None and sys.stdout is _screen:
+        return _screen
+
+    try:
+        if not sys.stdout.isatty():
+            return None
+    except (AttributeError, ValueError):
+        return None
+
+    _screen = Screen(sys.stdout)
+    sys.stdout = _screen
+    return _screen
@@ -8,9 +8,12 @@ import time
 from modules.ascii_art import display_submenu_banner, display_category_title
 from modules.utils import (
     clear_screen, execute_command, show_success, show_error, 
-    show_warning, show_loading, is_command_available, backup_file,
+    show_warning, is_command_available, backup_file,
     confirm_action
 )
+from modules.progress import Progress
+from modules.prompt_generator import git_prompt, zsh_async_prompt, DEFAULT_DIRTY_TIMEOUT
+from modules.rc_file import RcDocument, PROMPT, ALIASES, ENV_VARS, parse_definitions
 
 class ShellCustomizer:
     def __init__(self, config_manager):
@@ -62,6 +65,7 @@ class ShellCustomizer:
             print(f"{Fore.CYAN}║{Fore.YELLOW} 5. Customize Shell Environment Variables {Fore.CYAN}║{Style.RESET_ALL}")
             print(f"{Fore.CYAN}║{Fore.YELLOW} 6. Edit RC File Directly                 {Fore.CYAN}║{Style.RESET_ALL}")
             print(f"{Fore.CYAN}║{Fore.YELLOW} 7. Apply Current Settings                {Fore.CYAN}║{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}║{Fore.YELLOW} 8. Profile Shell Startup Time            {Fore.CYAN}║{Style.RESET_ALL}")
             print(f"{Fore.CYAN}║{Fore.RED} 0. Back to Main Menu                     {Fore.CYAN}║{Style.RESET_ALL}")
             print(f"{Fore.CYAN}╚═══════════════════════════════════════════╝{Style.RESET_ALL}")
             
@@ -84,6 +88,8 @@ class ShellCustomizer:
                     self.edit_rc_file()
                 elif choice == 7:
                     self.apply_settings()
+                elif choice == 8:
+                    self.profile_startup()
                 elif choice == 0:
                     return
                 else:
@@ -131,8 +137,9 @@ class ShellCustomizer:
             execute_command(f"chsh -s {shell_path}")
             self.shell_type = shell_choice
             self.rc_file = self._get_rc_file()
-            self.config_manager.set_value('shell', 'type', shell_choice)
-            self.config_manager.set_value('shell', 'rc_file', self.rc_file)
+            with self.config_manager.batch():
+                self.config_manager.set_value('shell', 'type', shell_choice)
+                self.config_manager.set_value('shell', 'rc_file', self.rc_file)
             
             show_success(f"Shell changed to {shell_choice}.")
             print(f"{Fore.YELLOW}Note: You may need to log out and log back in for the changes to take effect.{Style.RESET_ALL}")
@@ -198,6 +205,26 @@ class ShellCustomizer:
         else:
             show_warning(f"Prompt customization for {self.shell_type} is not supported.")
     
+    def _ask_dirty_timeout(self):
+        """
+        Ask how long the git-aware prompt may spend checking for
+        uncommitted changes. Returns seconds; 0 disables the check.
+        """
+        default = self.config_manager.get_value('shell', 'git_dirty_timeout') or str(DEFAULT_DIRTY_TIMEOUT)
+        
+        print(f"\n{Fore.CYAN}The branch is shown without starting any process. Showing uncommitted changes (*){Style.RESET_ALL}")
+        print(f"{Fore.CYAN}runs git on each prompt, and is skipped in repositories where it takes too long.{Style.RESET_ALL}")
+        answer = input(f"{Fore.GREEN}Time limit for the check in seconds (e.g. 0.3), 0 to leave it out [{default}]: {Style.RESET_ALL}").strip()
+        
+        try:
+            timeout = max(0.0, float(answer or default))
+        except ValueError:
+            show_warning(f"Invalid time limit, using {default} seconds.")
+            timeout = float(default)
+        
+        self.config_manager.set_value('shell', 'git_dirty_timeout', str(timeout))
+        return timeout
+    
     def _customize_bash_prompt(self):
         """
         Customize the Bash prompt.
@@ -220,10 +247,6 @@ class ShellCustomizer:
             if choice == 0:
                 return
             
-            # Backup the rc file before modifying
-            if not backup_file(self.rc_file):
-                return
-            
             prompt_config = ""
             
             if choice == 1:
@@ -237,14 +260,7 @@ PS1='\\u@\\h:\\w\\$ '
 PS1='\\[\\033[01;32m\\]\\u@\\h\\[\\033[00m\\]:\\[\\033[01;34m\\]\\w\\[\\033[00m\\]\\$ '
 """
             elif choice == 3:
-                prompt_config = """
-# Informative Prompt with Git support
-parse_git_branch() {
-    git branch 2> /dev/null | sed -e '/^[^*]/d' -e 's/* \\(.*\\)/ (\\1)/'
-}
-
-PS1='\\[\\033[01;32m\\]\\u@\\h\\[\\033[00m\\]:\\[\\033[01;34m\\]\\w\\[\\033[00m\\]\\[\\033[01;33m\\]$(parse_git_branch)\\[\\033[00m\\]\\$ '
-"""
+                prompt_config = git_prompt('bash', self._ask_dirty_timeout())
             elif choice == 4:
                 prompt_config = """
 # Minimalist Prompt
@@ -276,7 +292,10 @@ PS1='{custom_prompt}'
                 return
             
             # Update the prompt in the rc file
-            self._update_rc_file_section(prompt_config, "# BEGIN PROMPT CONFIGURATION", "# END PROMPT CONFIGURATION")
+            document = self._load_rc_file()
+            document.set_section(PROMPT, prompt_config)
+            if not self._save_rc_file(document):
+                return
             
             self.config_manager.set_value('shell', 'prompt', str(choice))
             show_success("Bash prompt customized successfully!")
@@ -300,6 +319,7 @@ PS1='{custom_prompt}'
         print(f"{Fore.CYAN}4. Minimalist ($ ){Style.RESET_ALL}")
         print(f"{Fore.CYAN}5. Install Oh-My-Zsh (recommended for Zsh users){Style.RESET_ALL}")
         print(f"{Fore.CYAN}6. Custom (define your own){Style.RESET_ALL}")
+        print(f"{Fore.CYAN}7. Async (git status, virtualenv and command time, updated in the background){Style.RESET_ALL}")
         print(f"{Fore.CYAN}0. Cancel{Style.RESET_ALL}")
         
         choice = input(f"\n{Fore.GREEN}Enter your choice: {Style.RESET_ALL}")
@@ -314,10 +334,6 @@ PS1='{custom_prompt}'
                 self._install_oh_my_zsh()
                 return
             
-            # Backup the rc file before modifying
-            if not backup_file(self.rc_file):
-                return
-            
             prompt_config = ""
             
             if choice == 1:
@@ -331,14 +347,7 @@ PROMPT='%n@%m:%~ $ '
 PROMPT='%F{green}%n@%m%f:%F{blue}%~%f $ '
 """
             elif choice == 3:
-                prompt_config = """
-# Informative Prompt
-autoload -Uz vcs_info
-precmd() { vcs_info }
-zstyle ':vcs_info:git:*' formats '%F{yellow}(%b)%f '
-setopt PROMPT_SUBST
-PROMPT='%F{green}%n@%m%f:%F{blue}%~%f ${vcs_info_msg_0_}$ '
-"""
+                prompt_config = git_prompt('zsh', self._ask_dirty_timeout())
             elif choice == 4:
                 prompt_config = """
 # Minimalist Prompt
@@ -364,12 +373,17 @@ PROMPT='$ '
 # Custom Prompt
 PROMPT='{custom_prompt}'
 """
+            elif choice == 7:
+                prompt_config = zsh_async_prompt()
             else:
                 show_error("Invalid choice.")
                 return
             
             # Update the prompt in the rc file
-            self._update_rc_file_section(prompt_config, "# BEGIN PROMPT CONFIGURATION", "# END PROMPT CONFIGURATION")
+            document = self._load_rc_file()
+            document.set_section(PROMPT, prompt_config)
+            if not self._save_rc_file(document):
+                return
             
             self.config_manager.set_value('shell', 'prompt', str(choice))
             show_success("Zsh prompt customized successfully!")
@@ -453,6 +467,22 @@ sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/too
         """
         print(f"\n{Fore.CYAN}Fish Prompt Customization:{Style.RESET_ALL}")
         
+        git_aware = input(f"\n{Fore.GREEN}Install the git-aware prompt (shows the branch without running git)? (y/n): {Style.RESET_ALL}").lower()
+        
+        if git_aware == 'y':
+            try:
+                document = self._load_rc_file()
+                document.set_section(PROMPT, git_prompt('fish', self._ask_dirty_timeout()))
+                if not self._save_rc_file(document):
+                    return
+                
+                self.config_manager.set_value('shell', 'prompt', 'git')
+                show_success("Fish prompt customized successfully!")
+                print(f"{Fore.YELLOW}Note: Open a new terminal or run 'source {self.rc_file}' to see the changes.{Style.RESET_ALL}")
+            except Exception as e:
+                show_error(f"Error customizing prompt: {str(e)}")
+            return
+        
         print(f"\n{Fore.YELLOW}Fish has a built-in prompt customization tool.{Style.RESET_ALL}")
         print(f"{Fore.CYAN}Would you like to run the Fish prompt configuration tool?{Style.RESET_ALL}")
         
@@ -504,6 +534,8 @@ sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/too
             print(f"{Fore.CYAN}1. List Current Aliases{Style.RESET_ALL}")
             print(f"{Fore.CYAN}2. Add New Alias{Style.RESET_ALL}")
             print(f"{Fore.CYAN}3. Remove Alias{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}4. Import Aliases from File{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}5. Export Aliases to File{Style.RESET_ALL}")
             print(f"{Fore.CYAN}0. Back{Style.RESET_ALL}")
             
             choice = input(f"\n{Fore.GREEN}Enter your choice: {Style.RESET_ALL}")
@@ -519,6 +551,10 @@ sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/too
                     self._add_alias()
                 elif choice == 3:
                     self._remove_alias()
+                elif choice == 4:
+                    self._import_from_file((ALIASES,))
+                elif choice == 5:
+                    self._export_to_file((ALIASES,))
                 else:
                     show_error("Invalid choice.")
             
@@ -573,28 +609,12 @@ sh -c "$(curl -fsSL https://raw.githubusercontent.com/ohmyzsh/ohmyzsh/master/too
             show_warning("No alias command provided. Operation cancelled.")
             return
         
-        # Backup the rc file before modifying
-        if not backup_file(self.rc_file):
-            return
-        
         try:
-            alias_config = ""
-            
-            if self.shell_type == 'bash' or self.shell_type == 'zsh':
-                alias_config = f"""
-# Alias: {alias_name}
-alias {alias_name}='{alias_command}'
-"""
-            elif self.shell_type == 'fish':
-                alias_config = f"""
-# Alias: {alias_name}
-function {alias_name}
-    {alias_command} $argv
-end
-"""
-            
             # Add the alias to the rc file
-            self._update_rc_file_section(alias_config, "# BEGIN CUSTOM ALIASES", "# END CUSTOM ALIASES", append=True)
+            document = self._load_rc_file()
+            document.set_alias(alias_name, alias_command)
+            if not self._save_rc_file(document):
+                return
             
             show_success(f"Alias '{alias_name}' added successfully!")
             print(f"{Fore.YELLOW}Note: Open a new terminal or run 'source {self.rc_file}' to use the new alias.{Style.RESET_ALL}")
@@ -613,46 +633,15 @@ end
             show_warning("No alias name provided. Operation cancelled.")
             return
         
-        # Backup the rc file before modifying
-        if not backup_file(self.rc_file):
-            return
-        
         try:
-            with open(self.rc_file, 'r') as f:
-                lines = f.readlines()
+            document = self._load_rc_file()
             
-            pattern = ""
-            if self.shell_type == 'bash' or self.shell_type == 'zsh':
-                pattern = f"alias {alias_name}="
-            elif self.shell_type == 'fish':
-                pattern = f"function {alias_name}"
-            
-            # Find and remove the alias
-            new_lines = []
-            removed = False
-            skip_lines = False
-            
-            for line in lines:
-                if pattern in line:
-                    removed = True
-                    skip_lines = True
-                    continue
-                
-                # For fish shell, we need to skip until the 'end' statement
-                if skip_lines and self.shell_type == 'fish' and line.strip() == 'end':
-                    skip_lines = False
-                    continue
-                
-                if not skip_lines:
-                    new_lines.append(line)
-            
-            if not removed:
+            if not document.remove_alias(alias_name):
                 show_warning(f"Alias '{alias_name}' not found in {self.rc_file}.")
                 return
             
-            # Write the updated file
-            with open(self.rc_file, 'w') as f:
-                f.writelines(new_lines)
+            if not self._save_rc_file(document):
+                return
             
             show_success(f"Alias '{alias_name}' removed successfully!")
             print(f"{Fore.YELLOW}Note: Open a new terminal or run 'source {self.rc_file}' to apply the changes.{Style.RESET_ALL}")
@@ -709,20 +698,12 @@ END
             show_warning("No function code provided. Operation cancelled.")
             return
         
-        # Backup the rc file before modifying
-        if not backup_file(self.rc_file):
-            return
-        
         try:
-            function_config = f"""
-# Function: {function_name}
-"""
-            
-            for line in function_code:
-                function_config += line + "\n"
-            
             # Add the function to the rc file
-            self._update_rc_file_section(function_config, "# BEGIN CUSTOM FUNCTIONS", "# END CUSTOM FUNCTIONS", append=True)
+            document = self._load_rc_file()
+            document.set_function(function_name, function_code)
+            if not self._save_rc_file(document):
+                return
             
             show_success(f"Function '{function_name}' added successfully!")
             print(f"{Fore.YELLOW}Note: Open a new terminal or run 'source {self.rc_file}' to use the new function.{Style.RESET_ALL}")
@@ -744,6 +725,8 @@ END
             print(f"{Fore.CYAN}1. List Current Environment Variables{Style.RESET_ALL}")
             print(f"{Fore.CYAN}2. Add/Modify Environment Variable{Style.RESET_ALL}")
             print(f"{Fore.CYAN}3. Remove Environment Variable{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}4. Import Environment Variables from File{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}5. Export Environment Variables to File{Style.RESET_ALL}")
             print(f"{Fore.CYAN}0. Back{Style.RESET_ALL}")
             
             choice = input(f"\n{Fore.GREEN}Enter your choice: {Style.RESET_ALL}")
@@ -759,6 +742,10 @@ END
                     self._add_env_var()
                 elif choice == 3:
                     self._remove_env_var()
+                elif choice == 4:
+                    self._import_from_file((ENV_VARS,))
+                elif choice == 5:
+                    self._export_to_file((ENV_VARS,))
                 else:
                     show_error("Invalid choice.")
             
@@ -798,26 +785,12 @@ END
         
         var_value = input(f"{Fore.GREEN}Variable value: {Style.RESET_ALL}")
         
-        # Backup the rc file before modifying
-        if not backup_file(self.rc_file):
-            return
-        
         try:
-            env_var_config = ""
-            
-            if self.shell_type == 'bash' or self.shell_type == 'zsh':
-                env_var_config = f"""
-# Environment Variable: {var_name}
-export {var_name}="{var_value}"
-"""
-            elif self.shell_type == 'fish':
-                env_var_config = f"""
-# Environment Variable: {var_name}
-set -x {var_name} "{var_value}"
-"""
-            
             # Add the environment variable to the rc file
-            self._update_rc_file_section(env_var_config, "# BEGIN ENVIRONMENT VARIABLES", "# END ENVIRONMENT VARIABLES", append=True)
+            document = self._load_rc_file()
+            document.set_env(var_name, var_value)
+            if not self._save_rc_file(document):
+                return
             
             show_success(f"Environment variable '{var_name}' set successfully!")
             print(f"{Fore.YELLOW}Note: Open a new terminal or run 'source {self.rc_file}' to apply the changes.{Style.RESET_ALL}")
@@ -837,46 +810,15 @@ set -x {var_name} "{var_value}"
             show_warning("No variable name provided. Operation cancelled.")
             return
         
-        # Backup the rc file before modifying
-        if not backup_file(self.rc_file):
-            return
-        
         try:
-            with open(self.rc_file, 'r') as f:
-                lines = f.readlines()
-            
-            pattern = ""
-            if self.shell_type == 'bash' or self.shell_type == 'zsh':
-                pattern = f"export {var_name}="
-            elif self.shell_type == 'fish':
-                pattern = f"set -x {var_name} "
-            
-            # Find and remove the environment variable
-            new_lines = []
-            removed = False
-            
-            for i, line in enumerate(lines):
-                if pattern in line:
-                    # Skip the comment line before it as well
-                    if i > 0 and f"# Environment Variable: {var_name}" in lines[i-1]:
-                        removed = True
-                        continue
-                    removed = True
-                    continue
-                
-                if i > 0 and f"# Environment Variable: {var_name}" in line:
-                    removed = True
-                    continue
-                
-                new_lines.append(line)
+            document = self._load_rc_file()
             
-            if not removed:
+            if not document.remove_env(var_name):
                 show_warning(f"Environment variable '{var_name}' not found in {self.rc_file}.")
                 return
             
-            # Write the updated file
-            with open(self.rc_file, 'w') as f:
-                f.writelines(new_lines)
+            if not self._save_rc_file(document):
+                return
             
             show_success(f"Environment variable '{var_name}' removed successfully!")
             print(f"{Fore.YELLOW}Note: Open a new terminal or run 'source {self.rc_file}' to apply the changes.{Style.RESET_ALL}")
@@ -884,6 +826,94 @@ set -x {var_name} "{var_value}"
         except Exception as e:
             show_error(f"Error removing environment variable: {str(e)}")
     
+    def import_definitions(self, lines, kinds=(ALIASES, ENV_VARS)):
+        """
+        Import aliases and environment variables from lines in bash, zsh or
+        fish syntax (see rc_file.parse_definitions). Nothing is written if a
+        line is invalid. Entries already defined with the same value are
+        skipped and everything else is written in one atomic write.
+        Returns True on success.
+        """
+        definitions, errors = parse_definitions(lines)
+        
+        if errors:
+            for number, message in errors:
+                show_error(f"Line {number}: {message}")
+            show_error(f"Import cancelled: {len(errors)} invalid line(s). Nothing was written.")
+            return False
+        
+        document = self._load_rc_file()
+        counts = {ALIASES: 0, ENV_VARS: 0}
+        unchanged = ignored = 0
+        
+        for (kind, name), value in definitions.items():
+            if kind not in kinds:
+                ignored += 1
+            elif document.value(kind, name) == value:
+                unchanged += 1
+            else:
+                if kind == ALIASES:
+                    document.set_alias(name, value)
+                else:
+                    document.set_env(name, value)
+                counts[kind] += 1
+        
+        if not self._save_rc_file(document):
+            return False
+        
+        show_success(f"Imported {counts[ALIASES]} alias(es) and {counts[ENV_VARS]} environment variable(s) "
+                     f"into {self.rc_file}.")
+        if unchanged:
+            print(f"{Fore.CYAN}{unchanged} entr{'y' if unchanged == 1 else 'ies'} already defined with the same value.{Style.RESET_ALL}")
+        if ignored:
+            show_warning(f"{ignored} entr{'y' if ignored == 1 else 'ies'} of another kind ignored.")
+        return True
+    
+    def export_definitions(self, stream, kinds=(ALIASES, ENV_VARS)):
+        """
+        Write the rc file's aliases and environment variables to stream, one
+        line at a time, in a format import_definitions() reads back.
+        Returns the number of entries written.
+        """
+        count = 0
+        for line in self._load_rc_file().export(kinds):
+            stream.write(line)
+            count += 1
+        return count
+    
+    def _import_from_file(self, kinds):
+        """
+        Ask for a file and import its definitions.
+        """
+        path = input(f"\n{Fore.GREEN}File to import: {Style.RESET_ALL}").strip()
+        
+        if not path:
+            show_warning("No file provided. Operation cancelled.")
+            return
+        
+        try:
+            with open(os.path.expanduser(path), 'r') as f:
+                self.import_definitions(f, kinds)
+        except Exception as e:
+            show_error(f"Error importing from {path}: {str(e)}")
+    
+    def _export_to_file(self, kinds):
+        """
+        Ask for a file and export the definitions to it.
+        """
+        path = input(f"\n{Fore.GREEN}File to export to: {Style.RESET_ALL}").strip()
+        
+        if not path:
+            show_warning("No file provided. Operation cancelled.")
+            return
+        
+        try:
+            with open(os.path.expanduser(path), 'w') as f:
+                count = self.export_definitions(f, kinds)
+            show_success(f"Exported {count} entr{'y' if count == 1 else 'ies'} to {path}.")
+        except Exception as e:
+            show_error(f"Error exporting to {path}: {str(e)}")
+    
     def edit_rc_file(self):
         """
         Edit the shell rc file directly.
@@ -931,81 +961,107 @@ set -x {var_name} "{var_value}"
         except Exception as e:
             show_error(f"Error editing RC file: {str(e)}")
     
-    def _update_rc_file_section(self, content, begin_marker, end_marker, append=False):
+    def _load_rc_file(self):
+        """
+        Parse the rc file into a document that can be edited in memory.
+        """
+        return RcDocument.load(self.rc_file, self.shell_type)
+    
+    def _save_rc_file(self, document):
         """
-        Update a section in the RC file between markers, or add it if not present.
-        If append is True, append the content between markers instead of replacing it.
+        Back up the rc file as it was loaded and write the edited document
+        in a single write. Returns False if the backup failed.
         """
+        if not document.changed():
+            return True
+        
         try:
-            # Check if file exists
-            if not os.path.exists(self.rc_file):
-                with open(self.rc_file, 'w') as f:
-                    f.write(f"{begin_marker}\n{content}\n{end_marker}\n")
-                return
-            
-            with open(self.rc_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Check if markers exist in the file
-            begin_index = -1
-            end_index = -1
-            
-            for i, line in enumerate(lines):
-                if begin_marker in line:
-                    begin_index = i
-                elif end_marker in line and begin_index != -1:
-                    end_index = i
-                    break
-            
-            # If markers not found, append them to the end of the file
-            if begin_index == -1 or end_index == -1:
-                lines.append(f"\n{begin_marker}\n")
-                lines.append(content)
-                lines.append(f"{end_marker}\n")
-            else:
-                # If append is True, add the content before the end marker
-                if append:
-                    new_lines = lines[:end_index]
-                    new_lines.append(content)
-                    new_lines.extend(lines[end_index:])
-                    lines = new_lines
-                else:
-                    # Replace content between markers
-                    new_lines = lines[:begin_index+1]
-                    new_lines.append(content)
-                    new_lines.extend(lines[end_index:])
-                    lines = new_lines
-            
-            # Write the updated file
-            with open(self.rc_file, 'w') as f:
-                f.writelines(lines)
+            backup_path = document.backup()
+        except Exception as e:
+            show_error(f"Failed to create backup: {str(e)}")
+            return False
+        
+        if backup_path:
+            show_success(f"Backup created at {backup_path}")
         
+        try:
+            document.save()
         except Exception as e:
             raise Exception(f"Error updating RC file: {str(e)}")
+        return True
+    
+    def profile_startup(self, runs=10):
+        """
+        Time the shell's startup against the rc file and rank the managed
+        sections by the milliseconds they add. Returns the ProfileResult,
+        or None if the shell could not be profiled.
+        """
+        from modules.shell_profiler import profile_startup, ranked_sections, slowest_lines, mean, SECTION_LABELS
+        
+        clear_screen()
+        display_category_title("PROFILE SHELL STARTUP")
+        
+        print(f"\n{Fore.YELLOW}Starting {self.shell_type} {runs} times with {self.rc_file}...{Style.RESET_ALL}")
+        
+        try:
+            with Progress(f"Profiling {self.shell_type} startup") as progress:
+                progress.start(runs)
+                result = profile_startup(self.shell_type, self.rc_file, runs, on_run=progress.advance)
+        except ValueError as e:
+            show_error(str(e))
+            return None
+        
+        print(f"\n{Fore.CYAN}Startup time: {Fore.WHITE}{mean(result.wall):.1f} ms mean, "
+              f"{min(result.wall):.1f} ms best of {runs}{Style.RESET_ALL}")
+        
+        print(f"\n{Fore.YELLOW}Time per section (mean):{Style.RESET_ALL}")
+        total = sum(ms for _, ms in ranked_sections(result)) or 1.0
+        for rank, (section, ms) in enumerate(ranked_sections(result), 1):
+            print(f"{Fore.CYAN}{rank}. {SECTION_LABELS[section]:<32}{Fore.WHITE}{ms:8.2f} ms  "
+                  f"{ms * 100 / total:5.1f}%{Style.RESET_ALL}")
+        
+        print(f"\n{Fore.YELLOW}Slowest lines:{Style.RESET_ALL}")
+        for number, ms, text in slowest_lines(result, 5):
+            print(f"{Fore.CYAN}{os.path.basename(self.rc_file)}:{number:<6}{Fore.WHITE}{ms:8.2f} ms  {text.strip()[:60]}{Style.RESET_ALL}")
+        
+        return result
+    
+    def apply_resources(self):
+        """
+        Return the settings apply_settings() writes, so that sections
+        sharing one are not applied at the same time.
+        """
+        return {'rc-file'}
     
     def apply_settings(self):
         """
-        Apply all shell customization settings.
+        Apply all shell customization settings. Returns True on success.
         """
         clear_screen()
         display_category_title("APPLYING SHELL SETTINGS")
         
         print(f"\n{Fore.YELLOW}Applying shell customization settings...{Style.RESET_ALL}")
-        show_loading("Applying shell settings")
         
         try:
             # Source the RC file to apply changes
             if self.shell_type in ('bash', 'zsh'):
-                status = execute_command(f"source {self.rc_file} &>/dev/null && echo 'Success' || echo 'Failed'")
+                with Progress("Applying shell settings", total=1) as progress:
+                    status = execute_command(f"source {self.rc_file} &>/dev/null && echo 'Success' || echo 'Failed'")
+                    progress.advance()
+                
                 if status.strip() == 'Success':
                     show_success("Shell settings applied successfully!")
-                else:
-                    show_warning("Shell settings may not have applied correctly.")
-                    print(f"{Fore.YELLOW}Please open a new terminal to see the changes.{Style.RESET_ALL}")
-            else:
-                show_success("Shell settings saved successfully!")
+                    return True
+                
+                show_warning("Shell settings may not have applied correctly.")
                 print(f"{Fore.YELLOW}Please open a new terminal to see the changes.{Style.RESET_ALL}")
+                return False
+            
+            show_success("Shell settings saved successfully!")
+            print(f"{Fore.YELLOW}Please open a new terminal to see the changes.{Style.RESET_ALL}")
+            return True
         
         except Exception as e:
             show_error(f"Error applying shell settings: {str(e)}")
             print(f"{Fore.YELLOW}You may need to open a new terminal to see your changes.{Style.RESET_ALL}")
+            return False
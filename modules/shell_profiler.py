@@ -0,0 +1,252 @@
+import os
+import re
+import subprocess
+import tempfile
+import time
+from collections import namedtuple
+
+from modules.capabilities import get_capabilities
+from modules.rc_file import SECTION_MARKERS, PROMPT, ALIASES, FUNCTIONS, ENV_VARS
+
+# Sections reported by the profiler, with the labels shown to the user
+OH_MY_ZSH = 'oh-my-zsh'
+UNMANAGED = 'unmanaged'
+
+SECTION_LABELS = {
+    PROMPT: "Prompt",
+    ALIASES: "Aliases",
+    FUNCTIONS: "Functions",
+    ENV_VARS: "Environment variables",
+    OH_MY_ZSH: "Oh-My-Zsh",
+    UNMANAGED: "Lines outside managed sections",
+}
+
+OH_MY_ZSH_LINE = re.compile(r'^\s*(source|\.)\s+.*oh-my-zsh\.sh')
+
+# Trace prefixes: bash repeats the first character of PS4 per nesting
+# level; zsh expands %D{%s.%6.} to the time in microseconds
+BASH_PS4 = '+${EPOCHREALTIME}|${BASH_SOURCE}|${LINENO}> '
+ZSH_PS4 = '+%D{%s.%6.}|%x|%I> '
+TRACE_LINE = re.compile(r'^\++(\d+[.,]\d+)\|(.*?)\|(\d+)> (.*)$')
+
+# fish --profile-startup: self time, total time, depth dashes, command
+FISH_PROFILE_LINE = re.compile(r'^\s*(\d+)\s+(\d+)\s+(-*)>\s?(.*)$')
+
+# Per-run limit, so a broken rc file cannot hang the profiler
+RUN_TIMEOUT = 30
+
+ProfileResult = namedtuple('ProfileResult', ['shell', 'rc_file', 'runs', 'wall', 'sections', 'lines'])
+
+
+def section_map(rc_file, shell_type):
+    """
+    Return the rc file's lines and, for each line number (from 1), the
+    section it belongs to.
+    """
+    try:
+        with open(rc_file, 'r', errors='replace') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return [], {}
+
+    markers = {}
+    for section, (begin, end) in SECTION_MARKERS.items():
+        markers[begin] = (section, True)
+        markers[end] = (section, False)
+
+    sections = {}
+    current = None
+    for number, line in enumerate(lines, 1):
+        marker = markers.get(line.strip())
+        if marker:
+            current = marker[0] if marker[1] else None
+        elif current is None and shell_type == 'zsh' and OH_MY_ZSH_LINE.match(line):
+            sections[number] = OH_MY_ZSH
+            continue
+        sections[number] = current or UNMANAGED
+
+    return lines, sections
+
+
+def parse_trace(text, rc_file):
+    """
+    Turn an xtrace log into (line number, milliseconds) pairs for the rc
+    file. Each traced command lasts until the next one starts. Commands
+    from other files, such as sourced scripts, are charged to the rc file
+    line that was running when they started; the body of a function
+    defined in the rc file is charged to the line it is defined on.
+    """
+    rc_path = os.path.realpath(rc_file)
+    records = []
+    for line in text.splitlines():
+        match = TRACE_LINE.match(line)
+        if match:
+            records.append((float(match.group(1).replace(',', '.')), match.group(2), int(match.group(3))))
+
+    timings = []
+    current = None
+    for index in range(len(records) - 1):
+        start, source, number = records[index]
+        if source and os.path.realpath(source) == rc_path:
+            current = number
+        elif source and current is None:
+            # The wrapper's own commands, before the rc file starts
+            continue
+        timings.append((current, (records[index + 1][0] - start) * 1000))
+
+    return [(number, ms) for number, ms in timings if number is not None]
+
+
+def parse_fish_profile(text, rc_lines):
+    """
+    Turn fish --profile-startup output into (line number, milliseconds)
+    pairs. fish reports commands, not line numbers, so each command is
+    matched to the next unused rc file line with the same text. A matched
+    command is charged its total time, including everything it ran.
+    """
+    positions = {}
+    for number, line in enumerate(rc_lines, 1):
+        positions.setdefault(line.strip(), []).append(number)
+
+    timings = []
+    matched_depth = None
+    for line in text.splitlines():
+        match = FISH_PROFILE_LINE.match(line)
+        if not match:
+            continue
+
+        depth = len(match.group(3))
+        if matched_depth is not None and depth > matched_depth:
+            continue
+        matched_depth = None
+
+        candidates = positions.get(match.group(4).strip())
+        if candidates:
+            timings.append((candidates.pop(0), int(match.group(2)) / 1000))
+            matched_depth = depth
+
+    return timings
+
+
+def _bash_run(rc_file, workdir, env):
+    trace = os.path.join(workdir, 'trace')
+    wrapper = os.path.join(workdir, 'bashrc')
+    with open(wrapper, 'w') as f:
+        f.write(f"exec 9>{_quote(trace)}\n"
+                "BASH_XTRACEFD=9\n"
+                f"PS4='{BASH_PS4}'\n"
+                "set -x\n"
+                f". {_quote(rc_file)}\n"
+                "set +x\n")
+    return ['bash', '--noprofile', '--rcfile', wrapper, '-i', '-c', 'exit'], trace, env
+
+
+def _zsh_run(rc_file, workdir, env):
+    trace = os.path.join(workdir, 'trace')
+    with open(os.path.join(workdir, '.zshrc'), 'w') as f:
+        f.write(f"exec 2>{_quote(trace)}\n"
+                f"PS4='{ZSH_PS4}'\n"
+                f"ZDOTDIR={_quote(os.path.dirname(os.path.abspath(rc_file)))}\n"
+                "setopt xtrace\n"
+                f"source {_quote(rc_file)}\n"
+                "unsetopt xtrace\n")
+    env = dict(env, ZDOTDIR=workdir)
+    return ['zsh', '-i', '-c', 'exit'], trace, env
+
+
+def _fish_run(rc_file, workdir, env):
+    trace = os.path.join(workdir, 'trace')
+    return ['fish', f'--profile-startup={trace}', '-i', '-c', 'exit'], trace, env
+
+
+def _quote(path):
+    return "'" + path.replace("'", "'\\''") + "'"
+
+
+SHELL_RUNS = {
+    'bash': _bash_run,
+    'zsh': _zsh_run,
+    'fish': _fish_run,
+}
+
+
+def profile_startup(shell_type, rc_file, runs=10, on_run=None):
+    """
+    Start an interactive shell runs times against rc_file and time each of
+    its lines. Returns a ProfileResult: wall-clock startup times and, per
+    section and per line, the milliseconds spent in each run. on_run() is
+    called as each run finishes.
+
+    Raises ValueError if the shell cannot be profiled here.
+    """
+    if shell_type not in SHELL_RUNS:
+        raise ValueError(f"Profiling {shell_type} is not supported.")
+    if not get_capabilities().has_command(shell_type):
+        raise ValueError(f"{shell_type} is not installed.")
+    if not os.path.exists(rc_file):
+        raise ValueError(f"{rc_file} does not exist.")
+
+    rc_lines, sections = section_map(rc_file, shell_type)
+
+    # Keep frameworks from checking for updates over the network
+    env = dict(os.environ, DISABLE_AUTO_UPDATE='true', DISABLE_UPDATE_PROMPT='true')
+
+    wall = []
+    section_times = {}
+    line_times = {}
+
+    for run in range(runs):
+        with tempfile.TemporaryDirectory(prefix='linux_customizer_profile_') as workdir:
+            command, trace, run_env = SHELL_RUNS[shell_type](rc_file, workdir, env)
+
+            start = time.monotonic()
+            try:
+                subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, env=run_env, timeout=RUN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                raise ValueError(f"{shell_type} did not finish starting within {RUN_TIMEOUT} seconds.")
+            wall.append((time.monotonic() - start) * 1000)
+
+            try:
+                with open(trace, 'r', errors='replace') as f:
+                    text = f.read()
+            except OSError:
+                raise ValueError(f"{shell_type} did not write a startup trace.")
+
+        if shell_type == 'fish':
+            timings = parse_fish_profile(text, rc_lines)
+        else:
+            timings = parse_trace(text, rc_file)
+
+        for section in set(sections.values()):
+            section_times.setdefault(section, [0.0] * runs)
+        for number, ms in timings:
+            section_times.setdefault(sections.get(number, UNMANAGED), [0.0] * runs)[run] += ms
+            line_times.setdefault(number, [0.0] * runs)[run] += ms
+
+        if on_run:
+            on_run()
+
+    lines = {number: (times, rc_lines[number - 1] if 0 < number <= len(rc_lines) else '')
+             for number, times in line_times.items()}
+    return ProfileResult(shell_type, rc_file, runs, wall, section_times, lines)
+
+
+def mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def ranked_sections(result):
+    """
+    Return (section, mean ms) pairs, slowest first.
+    """
+    return sorted(((section, mean(times)) for section, times in result.sections.items()),
+                  key=lambda item: item[1], reverse=True)
+
+
+def slowest_lines(result, count=10):
+    """
+    Return (line number, mean ms, text) for the slowest lines.
+    """
+    lines = [(number, mean(times), text) for number, (times, text) in result.lines.items()]
+    return sorted(lines, key=lambda item: item[1], reverse=True)[:count]
@@ -8,11 +8,19 @@ import time
 from modules.ascii_art import display_submenu_banner, display_category_title
 from modules.utils import (
     clear_screen, execute_command, show_success, show_error, 
-    show_warning, show_loading, is_command_available, backup_file,
-    confirm_action
+    show_warning, show_info, is_command_available, backup_file,
+    confirm_action, atomic_write
 )
+from modules.executor import CommandExecutor
+from modules.progress import Progress
+from modules.font_catalog import get_font_catalog, MONOSPACE
+from modules.live_state import get_live_state
+from modules.terminal_detect import detect_terminal
 
 class TerminalCustomizer:
+    # Terminal detection result, shared by all instances in this session
+    _detected_terminal = None
+    
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self.terminal_type = self._detect_terminal()
@@ -21,34 +29,21 @@ class TerminalCustomizer:
     def _detect_terminal(self):
         """
         Detect the current terminal emulator.
+        The result is cached for the rest of the session.
+        """
+        if TerminalCustomizer._detected_terminal is None:
+            TerminalCustomizer._detected_terminal = self._probe_terminal()
+        return TerminalCustomizer._detected_terminal
+    
+    def _probe_terminal(self):
+        """
+        Work out the terminal emulator by walking the process tree in /proc,
+        through tmux or screen, falling back to environment hints.
         """
-        terminal = os.environ.get('TERM', 'xterm')
-        
-        # Try to get more specific terminal name
-        if 'XTERM_VERSION' in os.environ:
-            terminal = 'xterm'
-        elif 'GNOME_TERMINAL_SCREEN' in os.environ:
-            terminal = 'gnome-terminal'
-        elif 'KONSOLE_VERSION' in os.environ:
-            terminal = 'konsole'
-        elif 'XFCE_TERMINAL_VERSION' in os.environ:
-            terminal = 'xfce4-terminal'
-        
-        # Check by process
         try:
-            ppid = os.getppid()
-            parent_name = execute_command(f"ps -p {ppid} -o comm=").strip()
-            
-            if parent_name in ['gnome-terminal-', 'konsole', 'xfce4-terminal', 'terminator', 'tilix', 'kitty', 'alacritty']:
-                terminal = parent_name
-                
-                # Fix gnome-terminal name
-                if parent_name == 'gnome-terminal-':
-                    terminal = 'gnome-terminal'
-        except:
-            pass
-        
-        return terminal
+            return detect_terminal()
+        except Exception:
+            return os.environ.get('TERM', 'xterm')
     
     def _get_terminal_configs(self):
         """
@@ -176,14 +171,11 @@ class TerminalCustomizer:
         # List available monospace fonts
         print(f"\n{Fore.CYAN}Available Monospace Fonts:{Style.RESET_ALL}")
         try:
-            fonts = execute_command("fc-list : family style | grep -i mono | sort | uniq").split('\n')
-            monospace_fonts = []
+            fonts = get_font_catalog().by_category(MONOSPACE)
+            monospace_fonts = fonts[:15]  # Show first 15 fonts
             
-            for i, font in enumerate(fonts[:15]):  # Show first 15 fonts
-                font_cleaned = font.split(',')[0].strip()
-                if font_cleaned and font_cleaned not in monospace_fonts:
-                    monospace_fonts.append(font_cleaned)
-                    print(f"{Fore.CYAN}{i+1}. {font_cleaned}{Style.RESET_ALL}")
+            for i, font in enumerate(monospace_fonts):
+                print(f"{Fore.CYAN}{i+1}. {font}{Style.RESET_ALL}")
             
             if len(fonts) > 15:
                 print(f"{Fore.CYAN}...and more{Style.RESET_ALL}")
@@ -241,7 +233,7 @@ class TerminalCustomizer:
         """
         try:
             # Get the default profile ID
-            profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+            profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
             
             # Set custom font
             execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-system-font false")
@@ -295,12 +287,10 @@ class TerminalCustomizer:
                 if not font_line_found:
                     new_lines.append(f"Font={font},{size},-1,5,50,0,0,0,0,0\n")
                 
-                with open(profile_path, 'w') as f:
-                    f.writelines(new_lines)
+                atomic_write(profile_path, ''.join(new_lines))
             else:
                 # Create new profile
-                with open(profile_path, 'w') as f:
-                    f.write(f"[Appearance]\nFont={font},{size},-1,5,50,0,0,0,0,0\n")
+                atomic_write(profile_path, f"[Appearance]\nFont={font},{size},-1,5,50,0,0,0,0,0\n")
         except Exception as e:
             raise Exception(f"Failed to set Konsole font: {str(e)}")
     
@@ -348,14 +338,10 @@ class TerminalCustomizer:
                 if not system_font_found:
                     new_lines.append("FontUseSystem=FALSE\n")
                 
-                with open(config_file, 'w') as f:
-                    f.writelines(new_lines)
+                atomic_write(config_file, ''.join(new_lines))
             else:
                 # Create new config file
-                with open(config_file, 'w') as f:
-                    f.write("[Configuration]\n")
-                    f.write(f"FontName={font} {size}\n")
-                    f.write("FontUseSystem=FALSE\n")
+                atomic_write(config_file, f"[Configuration]\nFontName={font} {size}\nFontUseSystem=FALSE\n")
         except Exception as e:
             raise Exception(f"Failed to set XFCE Terminal font: {str(e)}")
     
@@ -394,16 +380,13 @@ class TerminalCustomizer:
                     new_lines.append(f"XTerm*faceName: {font}\n")
                     new_lines.append(f"XTerm*faceSize: {size}\n")
                 
-                with open(config_file, 'w') as f:
-                    f.writelines(new_lines)
+                atomic_write(config_file, ''.join(new_lines))
                 
                 # Apply the changes
                 execute_command(f"xrdb -merge {config_file}")
             else:
                 # Create new .Xresources
-                with open(config_file, 'w') as f:
-                    f.write(f"XTerm*faceName: {font}\n")
-                    f.write(f"XTerm*faceSize: {size}\n")
+                atomic_write(config_file, f"XTerm*faceName: {font}\nXTerm*faceSize: {size}\n")
                 
                 # Apply the changes
                 execute_command(f"xrdb -merge {config_file}")
@@ -524,7 +507,7 @@ class TerminalCustomizer:
         # Try to apply the color based on terminal type
         try:
             if self.terminal_type == 'gnome-terminal':
-                profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
                 execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-color '{new_color}'")
                 execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-theme-colors false")
             elif self.terminal_type == 'xfce4-terminal':
@@ -563,7 +546,7 @@ class TerminalCustomizer:
         # Try to apply the color based on terminal type
         try:
             if self.terminal_type == 'gnome-terminal':
-                profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
                 execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ foreground-color '{new_color}'")
                 execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-theme-colors false")
             elif self.terminal_type == 'xfce4-terminal':
@@ -610,13 +593,14 @@ class TerminalCustomizer:
                 scheme_name, bg_color, fg_color = schemes[choice-1]
                 
                 # Save to config
-                self.config_manager.set_value('terminal', 'background_color', bg_color)
-                self.config_manager.set_value('terminal', 'foreground_color', fg_color)
+                with self.config_manager.batch():
+                    self.config_manager.set_value('terminal', 'background_color', bg_color)
+                    self.config_manager.set_value('terminal', 'foreground_color', fg_color)
                 
                 # Try to apply the colors based on terminal type
                 try:
                     if self.terminal_type == 'gnome-terminal':
-                        profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                        profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
                         execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-color '{bg_color}'")
                         execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ foreground-color '{fg_color}'")
                         execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-theme-colors false")
@@ -682,7 +666,7 @@ class TerminalCustomizer:
                 if self.terminal_type == 'gnome-terminal':
                     # GNOME Terminal uses 0.0 to 1.0 for transparency
                     decimal_opacity = opacity / 100.0
-                    profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                    profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
                     if opacity < 100:
                         execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background true")
                         execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-transparency {1.0 - decimal_opacity}")
@@ -734,8 +718,7 @@ class TerminalCustomizer:
                         if not opacity_found:
                             new_lines.append(f"Opacity={opacity/100.0}\n")
                         
-                        with open(profile_path, 'w') as f:
-                            f.writelines(new_lines)
+                        atomic_write(profile_path, ''.join(new_lines))
                 
                 else:
                     show_warning(f"Automatic transparency setting not supported for {self.terminal_type}.")
@@ -788,13 +771,13 @@ class TerminalCustomizer:
             # Try to apply the cursor style based on terminal type
             try:
                 if self.terminal_type == 'gnome-terminal':
-                    cursor_shape = "BLOCK"
+                    cursor_shape = "block"
                     if cursor_style == "ibeam":
-                        cursor_shape = "IBEAM"
+                        cursor_shape = "ibeam"
                     elif cursor_style == "underline":
-                        cursor_shape = "UNDERLINE"
+                        cursor_shape = "underline"
                     
-                    profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                    profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
                     execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ cursor-shape '{cursor_shape}'")
                 
                 elif self.terminal_type == 'xfce4-terminal':
@@ -842,19 +825,20 @@ class TerminalCustomizer:
         new_padding_v = input(f"{Fore.GREEN}Enter new vertical padding (pixels): {Style.RESET_ALL}")
         
         try:
-            if new_padding_h:
-                padding_h = int(new_padding_h)
-                if padding_h < 0 or padding_h > 100:
-                    show_warning("Horizontal padding must be between 0 and 100.")
-                    return
-                self.config_manager.set_value('terminal', 'padding_h', str(padding_h))
+            with self.config_manager.batch():
+                if new_padding_h:
+                    padding_h = int(new_padding_h)
+                    if padding_h < 0 or padding_h > 100:
+                        show_warning("Horizontal padding must be between 0 and 100.")
+                        return
+                    self.config_manager.set_value('terminal', 'padding_h', str(padding_h))
             
-            if new_padding_v:
-                padding_v = int(new_padding_v)
-                if padding_v < 0 or padding_v > 100:
-                    show_warning("Vertical padding must be between 0 and 100.")
-                    return
-                self.config_manager.set_value('terminal', 'padding_v', str(padding_v))
+                if new_padding_v:
+                    padding_v = int(new_padding_v)
+                    if padding_v < 0 or padding_v > 100:
+                        show_warning("Vertical padding must be between 0 and 100.")
+                        return
+                    self.config_manager.set_value('terminal', 'padding_v', str(padding_v))
             
             # Only a few terminals support padding configuration via command line
             if self.terminal_type in ['kitty', 'alacritty']:
@@ -916,15 +900,21 @@ class TerminalCustomizer:
         else:
             show_error("Failed to save terminal profile.")
     
+    def apply_resources(self):
+        """
+        Return the settings apply_settings() writes, so that sections
+        sharing one are not applied at the same time.
+        """
+        return {'terminal-profile'}
+    
     def apply_settings(self):
         """
-        Apply all terminal customization settings.
+        Apply all terminal customization settings. Returns True on success.
         """
         clear_screen()
         display_category_title("APPLYING TERMINAL SETTINGS")
         
         print(f"\n{Fore.YELLOW}Applying terminal customization settings...{Style.RESET_ALL}")
-        show_loading("Applying terminal settings")
         
         # Get configuration values
         font = self.config_manager.get_value('terminal', 'font', 'Monospace')
@@ -934,54 +924,56 @@ class TerminalCustomizer:
         opacity = self.config_manager.get_value('terminal', 'opacity', '100')
         cursor_style = self.config_manager.get_value('terminal', 'cursor_style', 'block')
         
+        executor = CommandExecutor()
+        
         # Try to apply all settings based on terminal type
         try:
             if self.terminal_type == 'gnome-terminal':
-                profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
                 
                 # Font
-                execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-system-font false")
-                execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ font '{font} {font_size}'")
+                executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-system-font false")
+                executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ font '{font} {font_size}'")
                 
                 # Colors
-                execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-theme-colors false")
-                execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-color '{bg_color}'")
-                execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ foreground-color '{fg_color}'")
+                executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-theme-colors false")
+                executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-color '{bg_color}'")
+                executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ foreground-color '{fg_color}'")
                 
                 # Transparency
                 decimal_opacity = float(opacity) / 100.0
                 if int(opacity) < 100:
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background true")
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-transparency {1.0 - decimal_opacity}")
+                    executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background true")
+                    executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-transparency {1.0 - decimal_opacity}")
                 else:
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background false")
+                    executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background false")
                 
                 # Cursor
-                cursor_shape = "BLOCK"
+                cursor_shape = "block"
                 if cursor_style == "ibeam":
-                    cursor_shape = "IBEAM"
+                    cursor_shape = "ibeam"
                 elif cursor_style == "underline":
-                    cursor_shape = "UNDERLINE"
-                execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ cursor-shape '{cursor_shape}'")
+                    cursor_shape = "underline"
+                executor.submit(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ cursor-shape '{cursor_shape}'")
             
             elif self.terminal_type == 'xfce4-terminal':
                 if is_command_available("xfconf-query"):
                     # Font
-                    execute_command("xfconf-query -c xfce4-terminal -p /font-use-system -s false")
-                    execute_command(f"xfconf-query -c xfce4-terminal -p /font-name -s '{font} {font_size}'")
+                    executor.submit("xfconf-query -c xfce4-terminal -p /font-use-system -s false")
+                    executor.submit(f"xfconf-query -c xfce4-terminal -p /font-name -s '{font} {font_size}'")
                     
                     # Colors
-                    execute_command("xfconf-query -c xfce4-terminal -p /use-theme-colors -s false")
-                    execute_command(f"xfconf-query -c xfce4-terminal -p /background-color -s '{bg_color}'")
-                    execute_command(f"xfconf-query -c xfce4-terminal -p /foreground-color -s '{fg_color}'")
+                    executor.submit("xfconf-query -c xfce4-terminal -p /use-theme-colors -s false")
+                    executor.submit(f"xfconf-query -c xfce4-terminal -p /background-color -s '{bg_color}'")
+                    executor.submit(f"xfconf-query -c xfce4-terminal -p /foreground-color -s '{fg_color}'")
                     
                     # Transparency
                     decimal_opacity = float(opacity) / 100.0
                     if int(opacity) < 100:
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_TRANSPARENT")
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /background-darkness -s {decimal_opacity}")
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_TRANSPARENT")
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /background-darkness -s {decimal_opacity}")
                     else:
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_SOLID")
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_SOLID")
                     
                     # Cursor
                     cursor_shape = 0  # TERMINAL_CURSOR_SHAPE_BLOCK
@@ -989,12 +981,16 @@ class TerminalCustomizer:
                         cursor_shape = 1  # TERMINAL_CURSOR_SHAPE_IBEAM
                     elif cursor_style == "underline":
                         cursor_shape = 2  # TERMINAL_CURSOR_SHAPE_UNDERLINE
-                    execute_command(f"xfconf-query -c xfce4-terminal -p /cursor-shape -s {cursor_shape}")
+                    executor.submit(f"xfconf-query -c xfce4-terminal -p /cursor-shape -s {cursor_shape}")
             
             else:
                 show_warning(f"Automatic settings application not fully supported for {self.terminal_type}.")
                 show_info("Some settings may not have been applied.")
             
+            executor.run(progress=Progress("Applying terminal settings"))
+            executor.print_skipped()
             show_success("All terminal settings applied successfully!")
+            return True
         except Exception as e:
             show_error(f"Error applying terminal settings: {str(e)}")
+            return False
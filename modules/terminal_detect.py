@@ -0,0 +1,195 @@
+import os
+
+# Process names (as in /proc/PID/comm, at most 15 characters) of terminal
+# emulators, mapped to the names used by TerminalCustomizer
+TERMINAL_PROCESSES = {
+    'gnome-terminal-': 'gnome-terminal',
+    'gnome-terminal': 'gnome-terminal',
+    'konsole': 'konsole',
+    'xfce4-terminal': 'xfce4-terminal',
+    'terminator': 'terminator',
+    'tilix': 'tilix',
+    'kitty': 'kitty',
+    'alacritty': 'alacritty',
+    'xterm': 'xterm',
+    'mate-terminal': 'mate-terminal',
+    'lxterminal': 'lxterminal',
+    'qterminal': 'qterminal',
+    'terminology': 'terminology',
+    'urxvt': 'urxvt',
+    'rxvt': 'urxvt',
+    'foot': 'foot',
+    'wezterm-gui': 'wezterm',
+    'guake': 'guake',
+    'tilda': 'tilda',
+    'yakuake': 'yakuake',
+    'sakura': 'sakura',
+    'st': 'st',
+}
+
+# Multiplexer servers, whose parent is not the terminal, mapped to the
+# process name of their clients, which run inside the terminal
+MULTIPLEXER_SERVERS = {
+    'tmux: server': 'tmux: client',
+    'screen': 'screen',
+}
+
+# GNU screen's server keeps the process name of its clients and only
+# renames its argv[0], as shown in /proc/PID/cmdline
+SERVER_TITLES = {
+    'screen': 'SCREEN',
+}
+
+# Sessions entered through these run in a terminal on another machine
+REMOTE_PROCESSES = ('sshd', 'mosh-server')
+
+# Environment variables set by terminal emulators, checked when the
+# process tree gives no answer
+TERMINAL_ENVIRONMENT = [
+    ('GNOME_TERMINAL_SCREEN', 'gnome-terminal'),
+    ('KONSOLE_VERSION', 'konsole'),
+    ('XFCE_TERMINAL_VERSION', 'xfce4-terminal'),
+    ('TILIX_ID', 'tilix'),
+    ('KITTY_WINDOW_ID', 'kitty'),
+    ('ALACRITTY_SOCKET', 'alacritty'),
+    ('TERMINATOR_UUID', 'terminator'),
+    ('XTERM_VERSION', 'xterm'),
+]
+
+# Guard against cycles in a malformed process table
+MAX_DEPTH = 64
+
+
+def read_process(pid):
+    """
+    Read a process's name, parent pid and start time from /proc/PID/stat.
+    Returns None if the process does not exist.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", 'r') as f:
+            stat = f.read()
+    except OSError:
+        return None
+
+    # The name is in parentheses and may itself contain spaces or ')'
+    start, end = stat.find('('), stat.rfind(')')
+    if start < 0 or end < 0:
+        return None
+
+    fields = stat[end + 2:].split()
+    try:
+        return stat[start + 1:end], int(fields[1]), int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def read_title(pid):
+    """
+    Return a process's argv[0] from /proc/PID/cmdline, or None.
+    """
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            return f.read().split(b'\0', 1)[0].decode(errors='replace')
+    except OSError:
+        return None
+
+
+def is_multiplexer_server(pid, name):
+    """
+    Check if a process with the given name is a multiplexer server.
+    """
+    if name not in MULTIPLEXER_SERVERS:
+        return False
+    return name not in SERVER_TITLES or read_title(pid) == SERVER_TITLES[name]
+
+
+def ancestry(pid):
+    """
+    Yield (pid, name) for a process and each of its ancestors.
+    """
+    for _ in range(MAX_DEPTH):
+        if pid <= 1:
+            return
+        info = read_process(pid)
+        if info is None:
+            return
+        name, parent, _ = info
+        yield pid, name
+        pid = parent
+
+
+def find_newest_client(name):
+    """
+    Return the pid of the most recently started process of the current
+    user with the given name, or None. For a multiplexer this is the
+    client that attached last.
+    """
+    uid = os.getuid()
+    newest = None
+
+    try:
+        pids = [int(entry) for entry in os.listdir('/proc') if entry.isdigit()]
+    except OSError:
+        return None
+
+    for pid in pids:
+        try:
+            if os.stat(f"/proc/{pid}").st_uid != uid:
+                continue
+        except OSError:
+            continue
+
+        info = read_process(pid)
+        if info is None or info[0] != name or is_multiplexer_server(pid, name):
+            continue
+        if newest is None or info[2] > newest[1]:
+            newest = (pid, info[2])
+
+    return newest[0] if newest else None
+
+
+def detect_from_processes(pid):
+    """
+    Walk up from pid to the terminal emulator. Multiplexer servers are
+    followed to their newest client. Returns the terminal name, 'remote'
+    for an ssh session, or None if nothing was recognised.
+    """
+    visited = set()
+
+    while pid and pid not in visited:
+        visited.add(pid)
+        next_pid = None
+
+        for ancestor, name in ancestry(pid):
+            if name in TERMINAL_PROCESSES:
+                return TERMINAL_PROCESSES[name]
+            if name in REMOTE_PROCESSES:
+                return 'remote'
+            if is_multiplexer_server(ancestor, name):
+                next_pid = find_newest_client(MULTIPLEXER_SERVERS[name])
+                break
+
+        pid = next_pid
+
+    return None
+
+
+def detect_terminal():
+    """
+    Detect the terminal emulator the program runs in without spawning a
+    process. The process tree takes precedence over environment hints,
+    which a multiplexer may have inherited from another terminal.
+    """
+    terminal = detect_from_processes(os.getppid())
+
+    if terminal == 'remote':
+        # The emulator is on the other end; only TERM is meaningful here
+        return os.environ.get('TERM', 'xterm')
+    if terminal:
+        return terminal
+
+    for variable, name in TERMINAL_ENVIRONMENT:
+        if variable in os.environ:
+            return name
+
+    return os.environ.get('TERM', 'xterm')
@@ -7,10 +7,15 @@ import time
 
 from modules.ascii_art import display_submenu_banner, display_category_title
 from modules.utils import (
-    clear_screen, execute_command, show_success, show_error, 
-    show_warning, show_loading, is_command_available, backup_file,
-    confirm_action
+    clear_screen, show_success, show_error, 
+    show_warning, is_command_available, backup_file,
+    confirm_action, atomic_write
 )
+from modules.executor import CommandExecutor
+from modules.progress import Progress
+from modules.dconf_backend import DconfTransaction
+from modules.live_state import get_live_state
+from modules.asset_index import get_asset_index
 
 class ThemeManager:
     def __init__(self, config_manager):
@@ -155,53 +160,73 @@ class ThemeManager:
             
             if 1 <= choice <= len(themes):
                 theme_name = themes[choice-1]
-                self._apply_theme(theme_name)
+                self.apply_theme(theme_name)
             else:
                 show_error("Invalid theme number.")
         except ValueError:
             show_error("Please enter a valid number.")
     
-    def _apply_theme(self, theme_name):
+    def apply_theme(self, theme_name):
         """
-        Apply a theme by its name.
+        Apply a theme by its name. Returns True on success.
         """
         theme_data = self.config_manager.load_theme(theme_name)
         
         if not theme_data:
             show_error(f"Failed to load theme '{theme_name}'.")
-            return
+            return False
         
         print(f"\n{Fore.YELLOW}Applying theme '{theme_name}'...{Style.RESET_ALL}")
-        show_loading(f"Applying theme '{theme_name}'")
+        
+        executor = CommandExecutor()
+        transaction = DconfTransaction()
         
         try:
             # Apply desktop settings
             if 'desktop' in theme_data:
-                self._apply_desktop_settings(theme_data['desktop'])
+                self._apply_desktop_settings(theme_data['desktop'], executor, transaction)
             
             # Apply color settings
             if 'colors' in theme_data:
-                self._apply_color_settings(theme_data['colors'])
+                self._apply_color_settings(theme_data['colors'], executor, transaction)
             
             # Apply font settings
             if 'fonts' in theme_data:
-                self._apply_font_settings(theme_data['fonts'])
+                self._apply_font_settings(theme_data['fonts'], executor, transaction)
             
             # Apply terminal settings
             if 'terminal' in theme_data:
-                self._apply_terminal_settings(theme_data['terminal'])
-            
-            # Save the settings to the config
-            for section, data in theme_data.items():
-                if section not in ['name', 'desktop_env', 'created_at', 'description']:
-                    for key, value in data.items():
-                        self.config_manager.set_value(section, key, value)
-            
+                self._apply_terminal_settings(theme_data['terminal'], executor, transaction)
+            
+            # Only write the gsettings keys that differ from the live system,
+            # all of them in a single dconf transaction
+            pending = len(transaction)
+            changed = transaction.discard_unchanged()
+            transaction.commit(executor)
+            
+            if not changed and not len(executor):
+                print(f"{Fore.CYAN}Theme '{theme_name}' is already active, nothing to change.{Style.RESET_ALL}")
+            elif pending > changed:
+                print(f"{Fore.CYAN}{pending - changed} setting(s) already match, updating {changed}.{Style.RESET_ALL}")
+            
+            executor.run(progress=Progress(f"Applying theme '{theme_name}'"))
+            executor.print_skipped()
+            
+            # Save the settings to the config; unchanged values are not rewritten
+            with self.config_manager.batch():
+                for section, data in theme_data.items():
+                    if section not in ['name', 'desktop_env', 'created_at', 'description']:
+                        for key, value in data.items():
+                            self.config_manager.set_value(section, key, value)
+            
+            get_live_state().invalidate()
             show_success(f"Theme '{theme_name}' applied successfully!")
+            return True
         except Exception as e:
             show_error(f"Error applying theme: {str(e)}")
+            return False
     
-    def _apply_desktop_settings(self, settings):
+    def _apply_desktop_settings(self, settings, executor, transaction):
         """
         Apply desktop settings from a theme.
         """
@@ -209,41 +234,41 @@ class ThemeManager:
             # Apply background
             if 'background' in settings and settings['background']:
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.background picture-uri 'file://{settings['background']}'")
+                    transaction.set("org.gnome.desktop.background", "picture-uri", f"file://{settings['background']}")
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.background picture-filename '{settings['background']}'")
+                    transaction.set("org.mate.background", "picture-filename", settings['background'])
             
             # Apply theme
             if 'theme' in settings and settings['theme'] != 'Default':
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.interface gtk-theme '{settings['theme']}'")
+                    transaction.set("org.gnome.desktop.interface", "gtk-theme", settings['theme'])
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.interface gtk-theme '{settings['theme']}'")
+                    transaction.set("org.mate.interface", "gtk-theme", settings['theme'])
                 elif 'cinnamon' in self.desktop_env:
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{settings['theme']}'")
-                    execute_command(f"gsettings set org.cinnamon.theme name '{settings['theme']}'")
+                    transaction.set("org.cinnamon.desktop.interface", "gtk-theme", settings['theme'])
+                    transaction.set("org.cinnamon.theme", "name", settings['theme'])
             
             # Apply icons
             if 'icons' in settings and settings['icons'] != 'Default':
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.interface icon-theme '{settings['icons']}'")
+                    transaction.set("org.gnome.desktop.interface", "icon-theme", settings['icons'])
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.interface icon-theme '{settings['icons']}'")
+                    transaction.set("org.mate.interface", "icon-theme", settings['icons'])
                 elif 'cinnamon' in self.desktop_env:
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface icon-theme '{settings['icons']}'")
+                    transaction.set("org.cinnamon.desktop.interface", "icon-theme", settings['icons'])
             
             # Apply cursor
             if 'cursor' in settings and settings['cursor'] != 'Default':
                 if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
-                    execute_command(f"gsettings set org.gnome.desktop.interface cursor-theme '{settings['cursor']}'")
+                    transaction.set("org.gnome.desktop.interface", "cursor-theme", settings['cursor'])
                 elif 'mate' in self.desktop_env:
-                    execute_command(f"gsettings set org.mate.interface cursor-theme '{settings['cursor']}'")
+                    transaction.set("org.mate.interface", "cursor-theme", settings['cursor'])
                 elif 'cinnamon' in self.desktop_env:
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface cursor-theme '{settings['cursor']}'")
+                    transaction.set("org.cinnamon.desktop.interface", "cursor-theme", settings['cursor'])
         except Exception as e:
             raise Exception(f"Error applying desktop settings: {str(e)}")
     
-    def _apply_color_settings(self, settings):
+    def _apply_color_settings(self, settings, executor, transaction):
         """
         Apply color settings from a theme.
         """
@@ -257,7 +282,7 @@ class ThemeManager:
             
             if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"gsettings set org.gnome.desktop.interface gtk-theme '{scheme}'")
+                    transaction.set("org.gnome.desktop.interface", "gtk-theme", scheme)
                 elif scheme == 'Custom':
                     # For GNOME custom colors, we need to check if background is dark or light
                     r_bg = int(bg_color[1:3], 16)
@@ -265,13 +290,13 @@ class ThemeManager:
                     b_bg = int(bg_color[5:7], 16)
                     
                     if (r_bg + g_bg + b_bg) / 3 < 128:
-                        execute_command("gsettings set org.gnome.desktop.interface color-scheme 'prefer-dark'")
+                        transaction.set("org.gnome.desktop.interface", "color-scheme", "prefer-dark")
                     else:
-                        execute_command("gsettings set org.gnome.desktop.interface color-scheme 'prefer-light'")
+                        transaction.set("org.gnome.desktop.interface", "color-scheme", "prefer-light")
             
             elif 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"plasma-apply-colorscheme {scheme.lower()}")
+                    executor.submit(f"plasma-apply-colorscheme {scheme.lower()}")
                 elif scheme == 'Custom':
                     # Extract RGB components for KDE colors
                     r_bg = int(bg_color[1:3], 16)
@@ -291,27 +316,27 @@ class ThemeManager:
                     b_acc = int(accent_color[5:7], 16)
                     
                     # Set KDE colors
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key BackgroundNormal {r_bg},{g_bg},{b_bg}")
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key ForegroundNormal {r_fg},{g_fg},{b_fg}")
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group General --key AccentColor {r_prim},{g_prim},{b_prim}")
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group Colors:Selection --key BackgroundNormal {r_acc},{g_acc},{b_acc}")
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key BackgroundNormal {r_bg},{g_bg},{b_bg}", group='kdeglobals')
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group Colors:Window --key ForegroundNormal {r_fg},{g_fg},{b_fg}", group='kdeglobals')
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key AccentColor {r_prim},{g_prim},{b_prim}", group='kdeglobals')
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group Colors:Selection --key BackgroundNormal {r_acc},{g_acc},{b_acc}", group='kdeglobals')
             
             elif 'xfce' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"xfconf-query -c xsettings -p /Net/ThemeName -s '{scheme}'")
+                    executor.submit(f"xfconf-query -c xsettings -p /Net/ThemeName -s '{scheme}'")
             
             elif 'mate' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"gsettings set org.mate.interface gtk-theme '{scheme}'")
+                    transaction.set("org.mate.interface", "gtk-theme", scheme)
             
             elif 'cinnamon' in self.desktop_env:
                 if scheme != 'Default' and scheme != 'Custom':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface gtk-theme '{scheme}'")
-                    execute_command(f"gsettings set org.cinnamon.theme name '{scheme}'")
+                    transaction.set("org.cinnamon.desktop.interface", "gtk-theme", scheme)
+                    transaction.set("org.cinnamon.theme", "name", scheme)
         except Exception as e:
             raise Exception(f"Error applying color settings: {str(e)}")
     
-    def _apply_font_settings(self, settings):
+    def _apply_font_settings(self, settings, executor, transaction):
         """
         Apply font settings from a theme.
         """
@@ -326,76 +351,76 @@ class ThemeManager:
             if 'gnome' in self.desktop_env or 'unity' in self.desktop_env:
                 # Apply system font
                 if system_font != 'Default':
-                    execute_command(f"gsettings set org.gnome.desktop.interface font-name '{system_font} 11'")
+                    transaction.set("org.gnome.desktop.interface", "font-name", f"{system_font} 11")
                 
                 # Apply document font
                 if document_font != 'Default':
-                    execute_command(f"gsettings set org.gnome.desktop.interface document-font-name '{document_font} 11'")
+                    transaction.set("org.gnome.desktop.interface", "document-font-name", f"{document_font} 11")
                 
                 # Apply monospace font
                 if monospace_font != 'Default':
-                    execute_command(f"gsettings set org.gnome.desktop.interface monospace-font-name '{monospace_font} 11'")
+                    transaction.set("org.gnome.desktop.interface", "monospace-font-name", f"{monospace_font} 11")
                 
                 # Apply font hinting
-                execute_command(f"gsettings set org.gnome.desktop.interface font-hinting '{font_hinting}'")
+                transaction.set("org.gnome.desktop.interface", "font-hinting", font_hinting)
                 
                 # Apply antialiasing
                 if antialiasing == "none":
-                    execute_command("gsettings set org.gnome.desktop.interface font-antialiasing 'none'")
+                    transaction.set("org.gnome.desktop.interface", "font-antialiasing", "none")
                 elif antialiasing == "grayscale":
-                    execute_command("gsettings set org.gnome.desktop.interface font-antialiasing 'grayscale'")
+                    transaction.set("org.gnome.desktop.interface", "font-antialiasing", "grayscale")
                 else:
-                    execute_command("gsettings set org.gnome.desktop.interface font-antialiasing 'rgba'")
-                    execute_command(f"gsettings set org.gnome.desktop.interface font-rgba-order '{antialiasing}'")
+                    transaction.set("org.gnome.desktop.interface", "font-antialiasing", "rgba")
+                    transaction.set("org.gnome.desktop.interface", "font-rgba-order", antialiasing)
             
             elif 'cinnamon' in self.desktop_env:
                 # Similar to GNOME
                 if system_font != 'Default':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface font-name '{system_font} 11'")
+                    transaction.set("org.cinnamon.desktop.interface", "font-name", f"{system_font} 11")
                 
                 if document_font != 'Default':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface document-font-name '{document_font} 11'")
+                    transaction.set("org.cinnamon.desktop.interface", "document-font-name", f"{document_font} 11")
                 
                 if monospace_font != 'Default':
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface monospace-font-name '{monospace_font} 11'")
+                    transaction.set("org.cinnamon.desktop.interface", "monospace-font-name", f"{monospace_font} 11")
                 
-                execute_command(f"gsettings set org.cinnamon.desktop.interface font-hinting '{font_hinting}'")
+                transaction.set("org.cinnamon.desktop.interface", "font-hinting", font_hinting)
                 
                 if antialiasing == "none":
-                    execute_command("gsettings set org.cinnamon.desktop.interface font-antialiasing 'none'")
+                    transaction.set("org.cinnamon.desktop.interface", "font-antialiasing", "none")
                 elif antialiasing == "grayscale":
-                    execute_command("gsettings set org.cinnamon.desktop.interface font-antialiasing 'grayscale'")
+                    transaction.set("org.cinnamon.desktop.interface", "font-antialiasing", "grayscale")
                 else:
-                    execute_command("gsettings set org.cinnamon.desktop.interface font-antialiasing 'rgba'")
-                    execute_command(f"gsettings set org.cinnamon.desktop.interface font-rgba-order '{antialiasing}'")
+                    transaction.set("org.cinnamon.desktop.interface", "font-antialiasing", "rgba")
+                    transaction.set("org.cinnamon.desktop.interface", "font-rgba-order", antialiasing)
             
             elif 'mate' in self.desktop_env:
                 # Similar to GNOME
                 if system_font != 'Default':
-                    execute_command(f"gsettings set org.mate.interface font-name '{system_font} 11'")
+                    transaction.set("org.mate.interface", "font-name", f"{system_font} 11")
                 
                 if document_font != 'Default':
-                    execute_command(f"gsettings set org.mate.interface document-font-name '{document_font} 11'")
+                    transaction.set("org.mate.interface", "document-font-name", f"{document_font} 11")
                 
                 if monospace_font != 'Default':
-                    execute_command(f"gsettings set org.mate.interface monospace-font-name '{monospace_font} 11'")
+                    transaction.set("org.mate.interface", "monospace-font-name", f"{monospace_font} 11")
                 
-                execute_command(f"gsettings set org.mate.desktop.interface font-hinting '{font_hinting}'")
+                transaction.set("org.mate.font-rendering", "hinting", font_hinting)
                 
                 if antialiasing == "none":
-                    execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'none'")
+                    transaction.set("org.mate.font-rendering", "antialiasing", "none")
                 elif antialiasing == "grayscale":
-                    execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'grayscale'")
+                    transaction.set("org.mate.font-rendering", "antialiasing", "grayscale")
                 else:
-                    execute_command("gsettings set org.mate.desktop.interface font-antialiasing 'rgba'")
-                    execute_command(f"gsettings set org.mate.desktop.interface font-rgba-order '{antialiasing}'")
+                    transaction.set("org.mate.font-rendering", "antialiasing", "rgba")
+                    transaction.set("org.mate.font-rendering", "rgba-order", antialiasing)
             
             elif 'xfce' in self.desktop_env:
                 if system_font != 'Default':
-                    execute_command(f"xfconf-query -c xsettings -p /Gtk/FontName -s '{system_font} 11'")
+                    executor.submit(f"xfconf-query -c xsettings -p /Gtk/FontName -s '{system_font} 11'")
                 
                 if monospace_font != 'Default':
-                    execute_command(f"xfconf-query -c xsettings -p /Gtk/MonospaceFontName -s '{monospace_font} 11'")
+                    executor.submit(f"xfconf-query -c xsettings -p /Gtk/MonospaceFontName -s '{monospace_font} 11'")
                 
                 # Hinting
                 if font_hinting == "none":
@@ -406,25 +431,25 @@ class ThemeManager:
                     hint_style = 2
                 elif font_hinting == "full":
                     hint_style = 3
-                execute_command(f"xfconf-query -c xsettings -p /Xft/HintStyle -s '{hint_style}'")
+                executor.submit(f"xfconf-query -c xsettings -p /Xft/HintStyle -s '{hint_style}'")
                 
                 # Antialiasing
                 if antialiasing == "none":
-                    execute_command("xfconf-query -c xsettings -p /Xft/Antialias -s 0")
+                    executor.submit("xfconf-query -c xsettings -p /Xft/Antialias -s 0")
                 else:
-                    execute_command("xfconf-query -c xsettings -p /Xft/Antialias -s 1")
+                    executor.submit("xfconf-query -c xsettings -p /Xft/Antialias -s 1")
                     if antialiasing == "grayscale":
-                        execute_command("xfconf-query -c xsettings -p /Xft/RGBA -s 'none'")
+                        executor.submit("xfconf-query -c xsettings -p /Xft/RGBA -s 'none'")
                     else:
-                        execute_command(f"xfconf-query -c xsettings -p /Xft/RGBA -s '{antialiasing}'")
+                        executor.submit(f"xfconf-query -c xsettings -p /Xft/RGBA -s '{antialiasing}'")
             
             elif 'kde' in self.desktop_env or 'plasma' in self.desktop_env:
                 # KDE has a different configuration system
                 if system_font != 'Default':
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group General --key font '{system_font},11,-1,5,50,0,0,0,0,0'")
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key font '{system_font},11,-1,5,50,0,0,0,0,0'", group='kdeglobals')
                 
                 if monospace_font != 'Default':
-                    execute_command(f"kwriteconfig5 --file kdeglobals --group General --key fixed '{monospace_font},11,-1,5,50,0,0,0,0,0'")
+                    executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key fixed '{monospace_font},11,-1,5,50,0,0,0,0,0'", group='kdeglobals')
                 
                 # Hinting
                 if font_hinting == "none":
@@ -435,15 +460,15 @@ class ThemeManager:
                     hint_style = "MediumHinting"
                 elif font_hinting == "full":
                     hint_style = "FullHinting"
-                execute_command(f"kwriteconfig5 --file kdeglobals --group General --key font-hinting '{hint_style}'")
+                executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key font-hinting '{hint_style}'", group='kdeglobals')
                 
                 # Antialiasing
                 if antialiasing == "none":
-                    execute_command("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '0'")
+                    executor.submit("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '0'", group='kdeglobals')
                 else:
-                    execute_command("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '1'")
+                    executor.submit("kwriteconfig5 --file kdeglobals --group General --key font-antialiasing '1'", group='kdeglobals')
                     if antialiasing == "grayscale":
-                        execute_command("kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type 'none'")
+                        executor.submit("kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type 'none'", group='kdeglobals')
                     else:
                         # Map our options to KDE's option names
                         kde_subpixel = {
@@ -452,13 +477,13 @@ class ThemeManager:
                             "vrgb": "vrgb",
                             "vbgr": "vbgr"
                         }.get(antialiasing, "rgb")
-                        execute_command(f"kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type '{kde_subpixel}'")
+                        executor.submit(f"kwriteconfig5 --file kdeglobals --group General --key font-sub-pixel-type '{kde_subpixel}'", group='kdeglobals')
                 
-                execute_command("qdbus org.kde.KWin /KWin reconfigure")
+                executor.submit("qdbus org.kde.KWin /KWin reconfigure", group='kdeglobals')
         except Exception as e:
             raise Exception(f"Error applying font settings: {str(e)}")
     
-    def _apply_terminal_settings(self, settings):
+    def _apply_terminal_settings(self, settings, executor, transaction):
         """
         Apply terminal settings from a theme.
         """
@@ -474,32 +499,33 @@ class ThemeManager:
             if terminal_type == 'gnome-terminal':
                 try:
                     # Get the default profile ID
-                    profile_id = execute_command("gsettings get org.gnome.Terminal.ProfilesList default").strip().strip("'")
+                    profile_id = get_live_state().get("org.gnome.Terminal.ProfilesList", "default", "")
+                    profile = f"org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/"
                     
                     # Font
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-system-font false")
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ font '{font} {font_size}'")
+                    transaction.set(profile, "use-system-font", False)
+                    transaction.set(profile, "font", f"{font} {font_size}")
                     
                     # Colors
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-theme-colors false")
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-color '{bg_color}'")
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ foreground-color '{fg_color}'")
+                    transaction.set(profile, "use-theme-colors", False)
+                    transaction.set(profile, "background-color", bg_color)
+                    transaction.set(profile, "foreground-color", fg_color)
                     
                     # Transparency
                     decimal_opacity = float(opacity) / 100.0
                     if int(opacity) < 100:
-                        execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background true")
-                        execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ background-transparency {1.0 - decimal_opacity}")
+                        transaction.set(profile, "use-transparent-background", True)
+                        transaction.set(profile, "background-transparency", 1.0 - decimal_opacity)
                     else:
-                        execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ use-transparent-background false")
+                        transaction.set(profile, "use-transparent-background", False)
                     
                     # Cursor
-                    cursor_shape = "BLOCK"
+                    cursor_shape = "block"
                     if cursor_style == "ibeam":
-                        cursor_shape = "IBEAM"
+                        cursor_shape = "ibeam"
                     elif cursor_style == "underline":
-                        cursor_shape = "UNDERLINE"
-                    execute_command(f"gsettings set org.gnome.Terminal.Legacy.Profile:/org/gnome/terminal/legacy/profiles:/:/{profile_id}/ cursor-shape '{cursor_shape}'")
+                        cursor_shape = "underline"
+                    transaction.set(profile, "cursor-shape", cursor_shape)
                 except:
                     pass
             
@@ -507,21 +533,21 @@ class ThemeManager:
                 try:
                     if is_command_available("xfconf-query"):
                         # Font
-                        execute_command("xfconf-query -c xfce4-terminal -p /font-use-system -s false")
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /font-name -s '{font} {font_size}'")
+                        executor.submit("xfconf-query -c xfce4-terminal -p /font-use-system -s false", ignore_errors=True)
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /font-name -s '{font} {font_size}'", ignore_errors=True)
                         
                         # Colors
-                        execute_command("xfconf-query -c xfce4-terminal -p /use-theme-colors -s false")
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /background-color -s '{bg_color}'")
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /foreground-color -s '{fg_color}'")
+                        executor.submit("xfconf-query -c xfce4-terminal -p /use-theme-colors -s false", ignore_errors=True)
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /background-color -s '{bg_color}'", ignore_errors=True)
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /foreground-color -s '{fg_color}'", ignore_errors=True)
                         
                         # Transparency
                         decimal_opacity = float(opacity) / 100.0
                         if int(opacity) < 100:
-                            execute_command(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_TRANSPARENT")
-                            execute_command(f"xfconf-query -c xfce4-terminal -p /background-darkness -s {decimal_opacity}")
+                            executor.submit(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_TRANSPARENT", ignore_errors=True)
+                            executor.submit(f"xfconf-query -c xfce4-terminal -p /background-darkness -s {decimal_opacity}", ignore_errors=True)
                         else:
-                            execute_command(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_SOLID")
+                            executor.submit(f"xfconf-query -c xfce4-terminal -p /background-mode -s TERMINAL_BACKGROUND_SOLID", ignore_errors=True)
                         
                         # Cursor
                         cursor_shape = 0  # TERMINAL_CURSOR_SHAPE_BLOCK
@@ -529,7 +555,7 @@ class ThemeManager:
                             cursor_shape = 1  # TERMINAL_CURSOR_SHAPE_IBEAM
                         elif cursor_style == "underline":
                             cursor_shape = 2  # TERMINAL_CURSOR_SHAPE_UNDERLINE
-                        execute_command(f"xfconf-query -c xfce4-terminal -p /cursor-shape -s {cursor_shape}")
+                        executor.submit(f"xfconf-query -c xfce4-terminal -p /cursor-shape -s {cursor_shape}", ignore_errors=True)
                 except:
                     pass
         except Exception as e:
@@ -621,8 +647,7 @@ class ThemeManager:
                     export_path = os.path.expanduser(export_path)
                 
                 try:
-                    with open(export_path, 'w') as f:
-                        json.dump(theme_data, f, indent=4)
+                    atomic_write(export_path, json.dumps(theme_data, indent=4))
                     
                     show_success(f"Theme '{theme_name}' exported to {export_path}")
                 except Exception as e:
@@ -679,7 +704,7 @@ class ThemeManager:
                 # Ask if the user wants to apply the theme
                 apply = input(f"\n{Fore.GREEN}Do you want to apply this theme now? (y/n): {Style.RESET_ALL}").lower()
                 if apply == 'y':
-                    self._apply_theme(theme_name)
+                    self.apply_theme(theme_name)
             else:
                 show_error(f"Failed to import theme.")
         except Exception as e:
@@ -692,14 +717,19 @@ class ThemeManager:
         clear_screen()
         display_category_title("AVAILABLE THEMES")
         
+        themes_dir = os.path.join(os.path.dirname(self.config_manager.config_file), "themes")
+        builtin_themes_dir = "/usr/share/themes"
+        
+        # Saved themes are listed directly, since saving or deleting one does
+        # not always change the directory's mtime; the index only serves the
+        # system themes
+        records = get_asset_index().scan_many([builtin_themes_dir])
         themes = self.config_manager.list_themes()
         
         if not themes:
             show_warning("No saved themes found.")
             return
         
-        themes_dir = os.path.join(os.path.dirname(self.config_manager.config_file), "themes")
-        
         print(f"\n{Fore.CYAN}Your Saved Themes:{Style.RESET_ALL}")
         for i, theme in enumerate(themes):
             theme_file = os.path.join(themes_dir, f"{theme}.json")
@@ -725,11 +755,9 @@ class ThemeManager:
             print()
         
         # Check for built-in themes
-        builtin_themes_dir = "/usr/share/themes"
-        if os.path.exists(builtin_themes_dir):
+        if builtin_themes_dir in records:
             try:
-                builtin_themes = [d for d in os.listdir(builtin_themes_dir) 
-                                if os.path.isdir(os.path.join(builtin_themes_dir, d))]
+                builtin_themes = records[builtin_themes_dir]['dirs']
                 
                 if builtin_themes:
                     print(f"\n{Fore.CYAN}System Themes (can be applied but not modified):{Style.RESET_ALL}")
@@ -887,7 +915,7 @@ class ThemeManager:
                     action = int(action)
                     
                     if action == 1:
-                        self._apply_theme(theme_name)
+                        self.apply_theme(theme_name)
                     elif action == 2:
                         # Get export location
                         export_path = input(f"\n{Fore.GREEN}Enter export location (default: ~/linux_customizer_theme_{theme_name}.json): {Style.RESET_ALL}")
@@ -898,8 +926,7 @@ class ThemeManager:
                             export_path = os.path.expanduser(export_path)
                         
                         try:
-                            with open(export_path, 'w') as f:
-                                json.dump(theme_data, f, indent=4)
+                            atomic_write(export_path, json.dumps(theme_data, indent=4))
                             
                             show_success(f"Theme '{theme_name}' exported to {export_path}")
                         except Exception as e:
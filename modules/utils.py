@@ -1,15 +1,42 @@
 import os
-import subprocess
-import sys
 import platform
 import time
+import tempfile
 from colorama import Fore, Style
 
+from modules.executor import run_command, format_command
+from modules.capabilities import get_capabilities
+from modules.screen import get_screen
+
+# Cleared by the command-line interface so that no screen clears, spinners
+# or banners are shown while scripting
+_interactive = True
+
+def set_interactive(enabled):
+    """
+    Enable or disable interactive output (screen clears, spinners, banners).
+    """
+    global _interactive
+    _interactive = enabled
+
+def is_interactive():
+    """
+    Check if the program is running its interactive menus.
+    """
+    return _interactive
+
 def clear_screen():
     """
-    Clear the terminal screen based on the operating system.
+    Clear the terminal screen.
+    Drawing is done in-process by the screen renderer, which only rewrites
+    the lines that changed; nothing is written when stdout is not a terminal.
     """
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if not _interactive:
+        return
+    
+    screen = get_screen()
+    if screen is not None:
+        screen.begin_frame()
 
 def is_linux():
     """
@@ -19,25 +46,24 @@ def is_linux():
 
 def execute_command(command, verbose=False):
     """
-    Execute a shell command and return the output.
+    Execute a command and return the output.
+    Commands that don't use shell syntax are run directly without /bin/sh.
     """
-    try:
-        if verbose:
-            print(f"{Fore.CYAN}Executing: {command}{Style.RESET_ALL}")
-        
-        result = subprocess.run(command, shell=True, check=True, 
-                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                               universal_newlines=True)
-        
-        if verbose:
-            print(f"{Fore.GREEN}Command executed successfully{Style.RESET_ALL}")
-        
-        return result.stdout.strip()
-    except subprocess.CalledProcessError as e:
+    if verbose:
+        print(f"{Fore.CYAN}Executing: {format_command(command)}{Style.RESET_ALL}")
+    
+    result = run_command(command)
+    
+    if result.returncode != 0:
         if verbose:
-            print(f"{Fore.RED}Command failed with exit code {e.returncode}{Style.RESET_ALL}")
-            print(f"{Fore.RED}Error output: {e.stderr}{Style.RESET_ALL}")
-        raise RuntimeError(f"Command '{command}' failed with exit code {e.returncode}: {e.stderr}")
+            print(f"{Fore.RED}Command failed with exit code {result.returncode}{Style.RESET_ALL}")
+            print(f"{Fore.RED}Error output: {result.stderr}{Style.RESET_ALL}")
+        raise RuntimeError(f"Command '{format_command(command)}' failed with exit code {result.returncode}: {result.stderr}")
+    
+    if verbose:
+        print(f"{Fore.GREEN}Command executed successfully ({result.duration * 1000:.1f} ms){Style.RESET_ALL}")
+    
+    return result.stdout.strip()
 
 def check_dependencies():
     """
@@ -49,13 +75,8 @@ def check_dependencies():
         ('fc-list', 'Font configuration utility')
     ]
     
-    missing = []
-    
-    for cmd, desc in dependencies:
-        try:
-            subprocess.run(['which', cmd], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        except subprocess.CalledProcessError:
-            missing.append((cmd, desc))
+    not_found = get_capabilities().missing_commands([cmd for cmd, _ in dependencies])
+    missing = [(cmd, desc) for cmd, desc in dependencies if cmd in not_found]
     
     if missing:
         print(f"{Fore.YELLOW}Warning: Some dependencies are missing. Functionality may be limited.{Style.RESET_ALL}")
@@ -70,25 +91,10 @@ def check_dependencies():
 def is_command_available(command):
     """
     Check if a command is available on the system.
+    Answered from the capability registry, which resolves each command
+    against PATH once.
     """
-    try:
-        subprocess.run(['which', command], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-        return True
-    except subprocess.CalledProcessError:
-        return False
-
-def show_loading(message="Loading", duration=1.5):
-    """
-    Display a loading animation.
-    """
-    chars = "|/-\\"
-    for _ in range(int(duration * 10)):
-        for char in chars:
-            sys.stdout.write(f"\r{Fore.CYAN}{message}... {char}{Style.RESET_ALL}")
-            sys.stdout.flush()
-            time.sleep(0.1)
-    sys.stdout.write("\r" + " " * (len(message) + 10) + "\r")
-    sys.stdout.flush()
+    return get_capabilities().has_command(command)
 
 def show_success(message):
     """
@@ -127,8 +133,8 @@ def backup_file(file_path):
     if os.path.exists(file_path):
         backup_path = f"{file_path}.bak.{int(time.time())}"
         try:
-            with open(file_path, 'r') as src, open(backup_path, 'w') as dst:
-                dst.write(src.read())
+            with open(file_path, 'r') as src:
+                atomic_write(backup_path, src.read())
             show_success(f"Backup created at {backup_path}")
             return True
         except Exception as e:
@@ -136,6 +142,79 @@ def backup_file(file_path):
             return False
     return True  # No need to backup if file doesn't exist
 
+def get_cache_dir():
+    """
+    Return the directory used for the tool's caches.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME', os.path.expanduser("~/.cache"))
+    return os.path.join(cache_home, "linux_customizer")
+
+# Set LINUX_CUSTOMIZER_NO_FSYNC=1 (or call set_durable_writes(False)) when
+# provisioning many machines and throughput matters more than durability
+_durable_writes = os.environ.get('LINUX_CUSTOMIZER_NO_FSYNC', '') not in ('1', 'true', 'yes')
+
+def set_durable_writes(enabled):
+    """
+    Enable or disable fsync in atomic_write() for the rest of the session.
+    """
+    global _durable_writes
+    _durable_writes = enabled
+
+def atomic_write(file_path, data, durable=None):
+    """
+    Replace a file's contents atomically.
+    The data is written to a temporary file in the same directory, synced to
+    disk and renamed over the target, so readers never see a partial file.
+    The original file's mode and ownership are preserved and symlinks are
+    written through to their target.
+    """
+    if durable is None:
+        durable = _durable_writes
+    
+    file_path = os.path.realpath(file_path)
+    directory = os.path.dirname(file_path)
+    
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        st = None
+    
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+            f.flush()
+            if durable:
+                os.fsync(f.fileno())
+        
+        if st is not None:
+            os.chmod(temp_path, st.st_mode & 0o7777)
+            if hasattr(os, 'chown') and (st.st_uid != os.getuid() or st.st_gid != os.getgid()):
+                try:
+                    os.chown(temp_path, st.st_uid, st.st_gid)
+                except PermissionError:
+                    pass
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    if durable:
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
 def is_root():
     """
     Check if the script is running as root.
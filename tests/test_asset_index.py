@@ -0,0 +1,58 @@
+import os
+
+from modules.asset_index import AssetIndex
+
+
+def make_root(tmp_path):
+    root = tmp_path / "icons"
+    (root / "Adwaita" / "cursors").mkdir(parents=True)
+    (root / "Papirus").mkdir()
+    (root / "index.theme").write_text("")
+    return str(root)
+
+
+def count_stats(monkeypatch):
+    calls = []
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        calls.append(path)
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, 'stat', counting_stat)
+    return calls
+
+
+def test_unchanged_directory_costs_one_stat(tmp_path, monkeypatch):
+    root = make_root(tmp_path)
+    index = AssetIndex(str(tmp_path / "assets.json"))
+    index.scan_many([root])
+    index.cursor_themes(root)
+
+    calls = count_stats(monkeypatch)
+    record = AssetIndex(str(tmp_path / "assets.json")).scan_many([root])[root]
+
+    assert calls == [root]
+    assert sorted(record['dirs']) == ['Adwaita', 'Papirus']
+
+
+def test_cursor_listing_stats_each_theme_once(tmp_path, monkeypatch):
+    root = make_root(tmp_path)
+    index = AssetIndex(str(tmp_path / "assets.json"))
+    assert index.cursor_themes(root) == ['Adwaita']
+
+    calls = count_stats(monkeypatch)
+    assert AssetIndex(str(tmp_path / "assets.json")).cursor_themes(root) == ['Adwaita']
+    assert len(calls) == 3
+
+
+def test_cursors_added_to_an_existing_theme_are_found(tmp_path):
+    root = make_root(tmp_path)
+    index = AssetIndex(str(tmp_path / "assets.json"))
+    assert index.cursor_themes(root) == ['Adwaita']
+
+    root_mtime = os.stat(root).st_mtime_ns
+    os.mkdir(os.path.join(root, "Papirus", "cursors"))
+    assert os.stat(root).st_mtime_ns == root_mtime
+
+    assert sorted(AssetIndex(str(tmp_path / "assets.json")).cursor_themes(root)) == ['Adwaita', 'Papirus']
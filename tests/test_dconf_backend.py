@@ -0,0 +1,96 @@
+import pytest
+
+from modules.dconf_backend import DconfTransaction, format_value, normalize_value, parse_keyfile
+from modules.executor import CommandExecutor
+
+SCHEMA = """<schemalist>
+  <enum id="org.example.Shape">
+    <value nick="block" value="0"/>
+    <value nick="ibeam" value="1"/>
+  </enum>
+  <schema id="org.example.terminal" path="/org/example/terminal/">
+    <key name="transparency" type="d"><default>0.0</default></key>
+    <key name="scrollback" type="u"><default>1000</default></key>
+    <key name="columns" type="i"><default>80</default></key>
+    <key name="limit" type="mi"><default>nothing</default></key>
+    <key name="shape" enum="org.example.Shape"><default>'block'</default></key>
+  </schema>
+</schemalist>
+"""
+
+PATH = '/org/example/terminal/'
+
+
+@pytest.fixture
+def schemas(tmp_path, monkeypatch):
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    (schema_dir / "org.example.gschema.xml").write_text(SCHEMA)
+    monkeypatch.setenv('GSETTINGS_SCHEMA_DIR', str(schema_dir))
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path / "data"))
+    monkeypatch.setenv('XDG_DATA_DIRS', str(tmp_path / "data"))
+    monkeypatch.setenv('LINUX_CUSTOMIZER_DCONF', 'python3 -m modules.fake_dconf')
+    monkeypatch.setenv('LINUX_CUSTOMIZER_FAKE_DCONF_DB', str(tmp_path / "dconf.ini"))
+
+
+def commit(transaction):
+    executor = CommandExecutor()
+    transaction.commit(executor)
+    return executor
+
+
+def loaded_keyfile(executor):
+    for command, _, _, keyfile in executor._queue:
+        if command[-2:] == ['load', '/']:
+            return parse_keyfile(keyfile)
+    return {}
+
+
+def test_values_are_written_in_the_key_type(schemas):
+    transaction = DconfTransaction()
+    transaction.set('org.example.terminal', 'transparency', 1.0 - 0.9)
+    transaction.set('org.example.terminal', 'scrollback', 5000)
+    transaction.set('org.example.terminal', 'columns', 120)
+
+    executor = commit(transaction)
+    values = loaded_keyfile(executor)[PATH]
+
+    assert values['transparency'] == '0.1'
+    assert values['scrollback'] == 'uint32 5000'
+    assert values['columns'] == '120'
+    assert not executor.skipped
+
+
+def test_integers_are_written_as_doubles_for_double_keys(schemas):
+    transaction = DconfTransaction()
+    transaction.set('org.example.terminal', 'transparency', 1)
+
+    assert loaded_keyfile(commit(transaction))[PATH]['transparency'] == '1.0'
+
+
+def test_mistyped_values_are_rejected(schemas):
+    transaction = DconfTransaction()
+    transaction.set('org.example.terminal', 'scrollback', -1)
+    transaction.set('org.example.terminal', 'transparency', 'high')
+    transaction.set('org.example.terminal', 'shape', 'BLOCK')
+
+    executor = commit(transaction)
+
+    assert loaded_keyfile(executor) == {}
+    assert len(executor.skipped) == 3
+
+
+def test_keys_of_unsupported_type_fall_back_to_gsettings(schemas):
+    transaction = DconfTransaction()
+    transaction.set('org.example.terminal', 'limit', 3)
+
+    executor = commit(transaction)
+
+    assert [command for command, _, _, _ in executor._queue] == [
+        ['gsettings', 'set', 'org.example.terminal', 'limit', '3']]
+
+
+def test_typed_values_compare_equal_to_values_read_back():
+    assert normalize_value('uint32 5000') == normalize_value(format_value(5000))
+    assert normalize_value('0.10000000000000001') == normalize_value(format_value(1.0 - 0.9))
+    assert format_value([], 'as') == '@as []'
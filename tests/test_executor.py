@@ -0,0 +1,30 @@
+from modules.executor import split_command, run_command
+from modules.utils import execute_command
+
+
+def test_simple_commands_run_from_argv():
+    assert split_command("ls -l '/tmp/a b'") == ['ls', '-l', '/tmp/a b']
+    assert split_command(['alias']) == ['alias']
+
+
+def test_shell_syntax_needs_a_shell():
+    assert split_command("ls | wc -l") is None
+    assert split_command('echo "$HOME"') is None
+
+
+def test_builtins_and_assignments_need_a_shell():
+    assert split_command("alias") is None
+    assert split_command(". ~/.bashrc") is None
+    assert split_command("export FOO=bar") is None
+    assert split_command("LC_ALL=C sort file") is None
+
+
+def test_execute_command_runs_builtins():
+    # Raised "No such file or directory: 'alias'" when run as argv
+    assert execute_command("alias") == ''
+
+
+def test_assignment_prefix_reaches_the_command():
+    result = run_command("LINUX_CUSTOMIZER_TEST=42 env")
+    assert result.returncode == 0
+    assert 'LINUX_CUSTOMIZER_TEST=42' in result.stdout.splitlines()